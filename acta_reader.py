@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import re
+import logging
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# Team rows of the acta: names in row 2, then touchdowns, cash, fans and
+# attendants in rows 4-7. Column B is the home team, column C the away team.
+FIRST_ROW = 2
+TEAM_LAST_ROW = 7
+
+# Player rows: each cell holds the number of a player who made the play.
+# Lesionados and Bajas both count as casualties.
+PLAYER_EVENT_ROWS = (
+    ("touchdown", 10, 13),
+    ("casualty", 14, 21),
+    ("completion", 22, 25),
+    ("interception", 26, 28),
+    ("mvp", 29, 30),
+)
+LAST_ROW = 30
+
+class ActaRecord(NamedTuple):
+    """Team-level data and player plays read from a match report.
+    
+    players_b/players_c hold (event, player number) pairs, one per play.
+    """
+    team_b: Optional[str]
+    team_c: Optional[str]
+    touchdowns_b: Optional[float]
+    touchdowns_c: Optional[float]
+    cash_b: float = 0
+    cash_c: float = 0
+    fans_b: float = 0
+    fans_c: float = 0
+    attendants_b: float = 0
+    attendants_c: float = 0
+    players_b: tuple = ()
+    players_c: tuple = ()
+
+def _is_empty(value):
+    """Check for an empty cell (None, NaN or blank string)."""
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:
+        return True
+    return isinstance(value, str) and value.strip() == ''
+
+def _to_number(value, default=None):
+    """Convert a cell value to int/float, or default when empty."""
+    if _is_empty(value):
+        return default
+    if hasattr(value, "item"):
+        value = value.item()  # numpy scalar from pandas
+    if isinstance(value, str):
+        text = value.strip().replace(',', '.')
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _to_amount(value, label):
+    """Convert an economy cell (cash, fans, attendants) to a number, or 0 when empty.
+
+    Unlike touchdowns these never reject the acta: text that is not a plain
+    number, or that looks like a thousands group ("50.000"), is kept as it
+    is with a warning.
+    """
+    if isinstance(value, str) and not _is_empty(value):
+        text = value.strip()
+        if not re.fullmatch(r"[+-]?\d+([.,]\d+)?", text) or re.fullmatch(r"[+-]?\d+[.,]\d{3}", text):
+            logging.warning(f"Non-numeric {label} cell '{text}' kept as text")
+            return text
+    return _to_number(value, 0)
+
+def _to_team(value):
+    """Convert a cell value to a team name, or None when empty."""
+    return None if _is_empty(value) else str(value).strip()
+
+def _to_players(value):
+    """Convert a player cell to a list of player numbers.
+    
+    A cell may list several plays separated by commas, semicolons, slashes
+    or spaces.
+    """
+    if _is_empty(value):
+        return []
+    value = _to_number(value) if not isinstance(value, str) else value
+    tokens = re.split(r"[,;/\s]+", value.strip()) if isinstance(value, str) else [value]
+    players = []
+    for token in tokens:
+        if token == "":
+            continue
+        try:
+            number = _to_number(token)
+        except ValueError:
+            number = token
+        players.append(str(number))
+    return players
+
+def _build_players(rows, col):
+    """Collect (event, player) pairs of one team from the player rows."""
+    return tuple(
+        (event, player)
+        for event, first, last in PLAYER_EVENT_ROWS
+        for row in rows[first - FIRST_ROW:last - FIRST_ROW + 1]
+        for player in _to_players(row[col])
+    )
+
+def _build_record(rows):
+    """Build an ActaRecord from the B/C values of rows 2-30."""
+    rows = list(rows) + [(None, None)] * (LAST_ROW - FIRST_ROW + 1 - len(rows))
+    names, _, touchdowns, cash, fans, attendants = rows[:TEAM_LAST_ROW - FIRST_ROW + 1]
+    return ActaRecord(
+        team_b=_to_team(names[0]),
+        team_c=_to_team(names[1]),
+        touchdowns_b=_to_number(touchdowns[0]),
+        touchdowns_c=_to_number(touchdowns[1]),
+        cash_b=_to_amount(cash[0], "cash"),
+        cash_c=_to_amount(cash[1], "cash"),
+        fans_b=_to_amount(fans[0], "fans"),
+        fans_c=_to_amount(fans[1], "fans"),
+        attendants_b=_to_amount(attendants[0], "attendants"),
+        attendants_c=_to_amount(attendants[1], "attendants"),
+        players_b=_build_players(rows, 0),
+        players_c=_build_players(rows, 1)
+    )
+
+def read_acta_openpyxl(file_path):
+    """Read the B2:C30 team and player rows with a streaming, read-only workbook."""
+    import openpyxl  # deferred so importing this module stays cheap
+    
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        rows = [tuple(row) + (None,) * (2 - len(row)) for row in ws.iter_rows(
+            min_row=FIRST_ROW, max_row=LAST_ROW, min_col=2, max_col=3, values_only=True)]
+    finally:
+        wb.close()
+    return _build_record(rows)
+
+def read_acta_pandas(file_path):
+    """Read the B2:C30 team and player rows by loading the whole sheet with pandas."""
+    import pandas as pd  # only needed for the fallback reader
+    
+    df = pd.read_excel(file_path, header=None)
+
+    def cell(row, col):
+        return df.iloc[row, col] if len(df) > row and len(df.columns) > col else None
+
+    rows = [(cell(row - 1, 1), cell(row - 1, 2)) for row in range(FIRST_ROW, LAST_ROW + 1)]
+    return _build_record(rows)
+
+def read_acta(file_path):
+    """Read a match report, falling back to pandas if openpyxl cannot open it."""
+    if Path(file_path).suffix.lower() == ".xlsx":
+        try:
+            return read_acta_openpyxl(file_path)
+        except Exception as e:
+            logging.debug(f"Fast reader failed for {Path(file_path).name}, using pandas: {e}")
+    return read_acta_pandas(file_path)
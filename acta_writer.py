@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import re
+import zipfile
+import posixpath
+from xml.sax.saxutils import escape
+from xml.etree import ElementTree
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Cells holding the home and away team names
+TEAM_CELLS = ("B2", "C2")
+
+def _active_sheet_path(members):
+    """Return the zip path of the workbook's active worksheet."""
+    workbook = ElementTree.fromstring(members["xl/workbook.xml"])
+    view = workbook.find(f"{MAIN_NS}bookViews/{MAIN_NS}workbookView")
+    active = int(view.get("activeTab", 0)) if view is not None else 0
+    sheet = workbook.findall(f"{MAIN_NS}sheets/{MAIN_NS}sheet")[active]
+    rel_id = sheet.get(f"{REL_NS}id")
+
+    rels = ElementTree.fromstring(members["xl/_rels/workbook.xml.rels"])
+    for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError(f"Worksheet relationship {rel_id} not found")
+
+class ActaTemplate:
+    """Acta template held in memory to stamp out per-match files.
+
+    The template is read and split once; each match file is produced by
+    writing values into the chosen cells of the worksheet XML (by default
+    the B2/C2 team names) and re-zipping the parts, without an openpyxl
+    load/save. `cells` must be listed in sheet order.
+    """
+
+    def __init__(self, template_path, cells=TEAM_CELLS):
+        with zipfile.ZipFile(template_path) as zf:
+            self.infos = zf.infolist()
+            members = {info.filename: zf.read(info) for info in self.infos}
+        self.members = members
+        self.sheet_path = _active_sheet_path(members)
+
+        # Split the sheet XML around the cells: parts alternate between
+        # static text and the attributes of each replaced cell
+        self.cells = tuple(cells)
+        sheet = members[self.sheet_path].decode("utf-8")
+        self.parts = []
+        self.cell_attrs = []
+        position = 0
+        for ref in self.cells:
+            match = re.compile(rf'<c r="{ref}"([^>]*?)(/>|>.*?</c>)', re.S).search(sheet, position)
+            if match is None:
+                raise ValueError(f"Cell {ref} not found in {self.sheet_path}")
+            self.parts.append(sheet[position:match.start()])
+            self.cell_attrs.append(re.sub(r'\s+t="[^"]*"', '', match.group(1)))
+            position = match.end()
+        self.parts.append(sheet[position:])
+
+    def render_sheet(self, *values):
+        """Return the worksheet XML with one value per cell filled in.
+
+        Strings are written as inline strings, numbers as plain values and
+        None leaves the cell empty.
+        """
+        xml = []
+        for ref, static, attrs, value in zip(self.cells, self.parts, self.cell_attrs, values):
+            xml.append(static)
+            if value is None:
+                xml.append(f'<c r="{ref}"{attrs}/>')
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                xml.append(f'<c r="{ref}"{attrs}><v>{value}</v></c>')
+            else:
+                xml.append(f'<c r="{ref}"{attrs} t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>')
+        xml.append(self.parts[-1])
+        return "".join(xml).encode("utf-8")
+
+    def write(self, match_file, *values):
+        """Write a match acta with one value per cell (home and away team names by default)."""
+        sheet = self.render_sheet(*values)
+        with zipfile.ZipFile(match_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            for info in self.infos:
+                data = sheet if info.filename == self.sheet_path else self.members[info.filename]
+                zf.writestr(zipfile.ZipInfo(info.filename, info.date_time), data, compress_type=zipfile.ZIP_DEFLATED)
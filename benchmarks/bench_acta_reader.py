@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Compare per-file latency of the openpyxl and pandas acta readers.
+
+Usage: python benchmarks/bench_acta_reader.py [--repeat N] [acta.xlsx]
+"""
+import sys
+import os
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acta_reader import read_acta_openpyxl, read_acta_pandas
+
+DEFAULT_ACTA = "samples/clean/Hoja limpia Acta.xlsx"
+
+def time_reader(reader, file_path, repeat):
+    """Return per-call latencies in milliseconds."""
+    reader(file_path)  # warm up imports and file cache
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        reader(file_path)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def main(argv):
+    repeat = 50
+    if "--repeat" in argv:
+        idx = argv.index("--repeat")
+        repeat = int(argv[idx + 1])
+        argv = argv[:idx] + argv[idx + 2:]
+    file_path = argv[0] if argv else DEFAULT_ACTA
+
+    print(f"Acta: {file_path} ({repeat} reads per reader)\n")
+    print("| Reader | Mean (ms) | Median (ms) | Min (ms) |")
+    print("|--------|-----------|-------------|----------|")
+    results = {}
+    for name, reader in (("openpyxl read-only", read_acta_openpyxl), ("pandas read_excel", read_acta_pandas)):
+        latencies = time_reader(reader, file_path, repeat)
+        results[name] = statistics.mean(latencies)
+        print(f"| {name} | {statistics.mean(latencies):.2f} | {statistics.median(latencies):.2f} | {min(latencies):.2f} |")
+
+    print(f"\nSpeedup: {results['pandas read_excel'] / results['openpyxl read-only']:.1f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Measure CLI startup cost: module import times and `kwbb --help`.
+
+Usage: python benchmarks/bench_import_time.py [--repeat N]
+
+Each case runs in a fresh interpreter so nothing is cached between runs.
+"""
+import sys
+import os
+import time
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = (
+    ("python (baseline)", ["-c", "pass"]),
+    ("import kwbb", ["-c", "import kwbb"]),
+    ("kwbb --help", ["kwbb.py", "--help"]),
+    ("kwbb (bad arguments)", ["kwbb.py", "classify"]),
+    ("import generate_league", ["-c", "import generate_league"]),
+    ("import update_classification", ["-c", "import update_classification"]),
+)
+
+def time_command(args, repeat):
+    """Return wall-clock times in milliseconds of running the interpreter with args."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main(argv):
+    repeat = 10
+    if "--repeat" in argv:
+        repeat = int(argv[argv.index("--repeat") + 1])
+
+    print(f"Startup times over {repeat} fresh interpreters\n")
+    print("| Case | Median (ms) | Min (ms) |")
+    print("|------|-------------|----------|")
+    for name, args in CASES:
+        timings = time_command(args, repeat)
+        print(f"| {name} | {statistics.median(timings):.1f} | {min(timings):.1f} |")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Time the hot paths of league generation and classification.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--teams N] [--divisions N] [--rounds N]
+        [--played F] [--repeat N] [--jobs N] [--output results.json]
+        [--baseline baseline.json] [--threshold F]
+
+Results are printed as a table and written as JSON. With --baseline, each
+stage is compared against a previous results file and the script exits
+with status 1 if any stage is slower than baseline by more than the
+threshold (default: 0.2 = 20%).
+"""
+import io
+import sys
+import os
+import json
+import contextlib
+import time
+import shutil
+import logging
+import platform
+import tempfile
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_league import make_synthetic_league, write_rosters, CLEAN_ACTA
+import generate_league
+from update_classification import (read_excel_files, build_match_index, build_division_data, index_teams,
+                                   generate_classification_table, generate_overall_classification, load_settings)
+from standings import aggregate_league, rank_standings
+
+def time_stage(func, repeat, setup=None):
+    """Run func `repeat` times and return wall-clock timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run_benchmarks(teams, divisions, rounds, played, repeat, jobs):
+    """Build a synthetic league and time each stage; return the results dict."""
+    work_dir = Path(tempfile.mkdtemp(prefix="kwbb_bench_"))
+    try:
+        league = work_dir / "league"
+        filled = make_synthetic_league(league, teams, divisions, rounds, played, jobs)
+        fixtures = league / "Fixtures"
+        actas = len(list(fixtures.rglob("*.xlsx")))
+
+        # generate_league runs on its own copy of the rosters so the filled
+        # actas of the benchmark league are left untouched
+        gen_league = work_dir / "gen"
+        write_rosters(gen_league, teams, divisions)
+        generate_league.TEMPLATE_PATH = str(CLEAN_ACTA)
+
+        settings = load_settings()
+        has_divisions, match_index = build_match_index(fixtures, jobs)
+        if has_divisions:
+            league_data = {name: build_division_data(fixtures / name, index, settings) for name, index in match_index.items()}
+            first_division = next(iter(league_data))
+            table_data = league_data[first_division]
+            table_teams = index_teams(match_index[first_division])
+        else:
+            league_data = build_division_data(fixtures, match_index[None], settings)
+            table_data = league_data
+            table_teams = index_teams(match_index[None])
+        division_data = league_data if has_divisions else {"": league_data}
+        table_output = work_dir / "table"
+        table_output.mkdir()
+
+        stages = {
+            "generate_league": time_stage(lambda: generate_league.generate_league(str(gen_league), jobs=jobs), repeat),
+            "read_excel_files": time_stage(lambda: read_excel_files(str(league), jobs, use_cache=False), repeat),
+            "read_excel_files_cached": time_stage(lambda: read_excel_files(str(league), jobs), repeat,
+                                                  setup=lambda: read_excel_files(str(league), jobs)),
+            "build_match_index": time_stage(lambda: build_match_index(fixtures, jobs), repeat),
+            "standings": time_stage(lambda: rank_standings(aggregate_league(division_data, {}), settings), repeat),
+            "generate_classification_table": time_stage(
+                lambda: generate_classification_table(table_data, table_output, teams=table_teams), repeat),
+        }
+        if has_divisions:
+            stages["generate_overall_classification"] = time_stage(
+                lambda: generate_overall_classification(league_data, table_output, fixtures, match_index), repeat)
+
+        return {
+            "config": {"teams": teams, "divisions": divisions, "rounds": rounds, "played": played,
+                       "repeat": repeat, "jobs": jobs, "actas": actas, "played_actas": filled},
+            "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count()},
+            "results": {
+                name: {"median_s": statistics.median(t), "min_s": min(t), "runs": t}
+                for name, t in stages.items()
+            }
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def compare(results, baseline, threshold):
+    """Print a comparison table and return the stages that regressed."""
+    print("\n| Stage | Baseline (s) | Current (s) | Ratio |")
+    print("|-------|--------------|-------------|-------|")
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"| {name} | - | {current['median_s']:.4f} | new |")
+            continue
+        ratio = current["median_s"] / previous["median_s"] if previous["median_s"] else float("inf")
+        flag = " REGRESSION" if ratio > 1 + threshold else ""
+        print(f"| {name} | {previous['median_s']:.4f} | {current['median_s']:.4f} | {ratio:.2f}x{flag} |")
+        if flag:
+            regressions.append(name)
+    if baseline.get("config") != results["config"]:
+        print("\nWarning: baseline was recorded with a different configuration.")
+    return regressions
+
+def parse_args(argv):
+    """Parse --option value pairs into a dict of typed settings."""
+    options = {"teams": 16, "divisions": 2, "rounds": None, "played": 0.5, "repeat": 3,
+               "jobs": 1, "output": "benchmark_results.json", "baseline": None, "threshold": 0.2}
+    types = {"teams": int, "divisions": int, "rounds": int, "played": float, "repeat": int,
+             "jobs": int, "output": str, "baseline": str, "threshold": float}
+    args = list(argv)
+    while args:
+        option = args.pop(0)
+        name = option[2:] if option.startswith("--") else None
+        if name not in types or not args:
+            raise SystemExit(__doc__)
+        options[name] = types[name](args.pop(0))
+    return options
+
+def main(argv):
+    options = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    # Silence the "Data saved to" lines printed by each classification run
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run_benchmarks(options["teams"], options["divisions"], options["rounds"],
+                                 options["played"], options["repeat"], options["jobs"])
+
+    config = results["config"]
+    print(f"League: {config['teams']} teams, {config['divisions']} divisions, "
+          f"{config['actas']} actas ({config['played_actas']} played), jobs={config['jobs']}\n")
+    print("| Stage | Median (s) | Min (s) |")
+    print("|-------|------------|---------|")
+    for name, result in results["results"].items():
+        print(f"| {name} | {result['median_s']:.4f} | {result['min_s']:.4f} |")
+
+    with open(options["output"], 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {options['output']}")
+
+    if options["baseline"]:
+        with open(options["baseline"], 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options["threshold"])
+        if regressions:
+            print(f"\nRegressions beyond {options['threshold']:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
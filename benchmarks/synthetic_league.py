@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Build synthetic leagues from the real acta template for benchmarking."""
+import sys
+import os
+import random
+from pathlib import Path
+
+REPO_ROOT = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, str(REPO_ROOT))
+
+import generate_league
+from acta_writer import ActaTemplate
+
+CLEAN_ACTA = REPO_ROOT / "samples" / "clean" / "Hoja limpia Acta.xlsx"
+
+# Cells of a played acta: team names, touchdowns and cash
+RESULT_CELLS = ("B2", "C2", "B4", "C4", "B5", "C5")
+
+def write_rosters(league_folder, teams, divisions):
+    """Create Rosters/<division>/<team>.pdf placeholders."""
+    rosters = Path(league_folder) / "Rosters"
+    teams_per_division = teams // divisions
+    for d in range(divisions):
+        division_folder = rosters / f"Division {d + 1}" if divisions > 1 else rosters
+        division_folder.mkdir(parents=True, exist_ok=True)
+        for t in range(teams_per_division):
+            (division_folder / f"Team{d + 1:02d}_{t + 1:03d}.pdf").touch()
+
+def trim_rounds(league_folder, rounds):
+    """Keep only the first `rounds` matchdays of every division."""
+    fixtures = Path(league_folder) / "Fixtures"
+    for date_folder in fixtures.rglob("J*"):
+        if date_folder.is_dir() and int(date_folder.name[1:]) > rounds:
+            for acta in date_folder.iterdir():
+                acta.unlink()
+            date_folder.rmdir()
+
+def fill_results(league_folder, played, seed=0):
+    """Write random results into the first `played` fraction of actas, earliest rounds first.
+
+    Returns the number of actas filled in.
+    """
+    rng = random.Random(seed)
+    template = ActaTemplate(CLEAN_ACTA, RESULT_CELLS)
+    fixtures = Path(league_folder) / "Fixtures"
+    actas = sorted(fixtures.rglob("*.xlsx"), key=lambda p: (int(p.parent.name[1:]), str(p)))
+    filled = actas[:round(len(actas) * played)]
+    for acta in filled:
+        # Match_<i>_<home>_vs_<away>.xlsx
+        home, away = acta.stem.split("_", 2)[2].split("_vs_")
+        template.write(acta, home, away, rng.randint(0, 4), rng.randint(0, 4),
+                       rng.randrange(0, 100000, 10000), rng.randrange(0, 100000, 10000))
+    return len(filled)
+
+def make_synthetic_league(league_folder, teams=16, divisions=2, rounds=None, played=0.5, jobs=1, seed=0):
+    """Generate a league with generate_league and fill part of its actas.
+
+    `teams` must be divisible by `divisions`. `rounds` caps the number of
+    matchdays kept per division (default: full round-robin).
+    """
+    if teams % divisions != 0:
+        raise ValueError(f"Cannot split {teams} teams evenly into {divisions} divisions.")
+    generate_league.TEMPLATE_PATH = str(CLEAN_ACTA)
+    write_rosters(league_folder, teams, divisions)
+    generate_league.generate_league(str(league_folder), jobs=jobs)
+    if rounds is not None:
+        trim_rounds(league_folder, rounds)
+    return fill_results(league_folder, played, seed)
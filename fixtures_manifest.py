@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+import os
+import re
+import json
+import logging
+from pathlib import Path
+from typing import NamedTuple, Dict, List, Optional, Tuple
+
+MANIFEST_FILE = "fixtures_manifest.json"
+FIXTURES_FILE = "fixtures.json"
+MANIFEST_VERSION = 1
+
+# Acta file names written by generate_league.py
+MATCH_FILE_PATTERN = re.compile(r"Match_(\d+)_(.+)_vs_(.+)\.xlsx")
+
+class ActaEntry(NamedTuple):
+    """A match report found in the Fixtures tree."""
+    path: str
+    size: int
+    mtime_ns: int
+
+class FixturesManifest(NamedTuple):
+    """Layout of a Fixtures tree: division (None without divisions) -> round -> actas."""
+    has_divisions: bool
+    divisions: Dict[Optional[str], Dict[str, List[ActaEntry]]]
+
+    def entries(self):
+        """Yield every ActaEntry in division, round and file name order."""
+        for rounds in self.divisions.values():
+            for actas in rounds.values():
+                yield from actas
+
+class FixtureChanges(NamedTuple):
+    """File operations that bring a Fixtures tree in line with new pairings."""
+    keep: List[Path]
+    moves: List[Tuple[Path, Path]]
+    creates: List[Tuple[Path, str, str]]
+    removes: List[Path]
+
+def _is_acta(name):
+    """Check a file name is a match report (and not an Excel lock file)."""
+    return name.endswith((".xlsx", ".xls")) and not name.startswith("~$")
+
+def _list_dir(path):
+    """List a directory once, returning (subfolders, acta entries) sorted by name."""
+    folders, actas = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                folders.append(entry)
+            elif _is_acta(entry.name) and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed while listing
+                actas.append(ActaEntry(entry.path, stat.st_size, stat.st_mtime_ns))
+    folders.sort(key=lambda e: e.name)
+    actas.sort(key=lambda a: os.path.basename(a.path))
+    return folders, actas
+
+def list_actas(folder):
+    """List the match reports directly inside one folder."""
+    return _list_dir(folder)[1]
+
+def scan_fixtures(folder):
+    """Build the manifest of a Fixtures folder with one os.scandir per directory.
+
+    Division folders are recognised by having J* subfolders; otherwise the
+    top-level folders are the rounds (legacy layout). File sizes and mtimes
+    come from the same walk, so later stages need no extra stat calls.
+    """
+    top_folders, _ = _list_dir(folder)
+    listings = {entry.name: _list_dir(entry.path) for entry in top_folders}
+    has_divisions = any(sub.name.startswith('J') for subfolders, _ in listings.values() for sub in subfolders)
+
+    divisions = {}
+    if has_divisions:
+        for division_name, (subfolders, _) in listings.items():
+            divisions[division_name] = {sub.name: _list_dir(sub.path)[1] for sub in subfolders}
+    else:
+        divisions[None] = {round_name: actas for round_name, (_, actas) in listings.items()}
+    return FixturesManifest(has_divisions, divisions)
+
+def save_manifest(manifest, manifest_file):
+    """Persist a manifest as JSON."""
+    with open(manifest_file, 'w') as f:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "has_divisions": manifest.has_divisions,
+            "divisions": [
+                {"name": name, "rounds": {round_name: [entry._asdict() for entry in actas]
+                                          for round_name, actas in rounds.items()}}
+                for name, rounds in manifest.divisions.items()
+            ]
+        }, f, indent=2)
+    logging.info(f"Fixtures manifest saved to: {manifest_file}")
+
+def load_manifest(manifest_file):
+    """Load a persisted manifest, or None if missing or from another version."""
+    try:
+        with open(manifest_file, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    divisions = {
+        division["name"]: {round_name: [ActaEntry(**entry) for entry in actas]
+                           for round_name, actas in division["rounds"].items()}
+        for division in data["divisions"]
+    }
+    return FixturesManifest(data["has_divisions"], divisions)
+
+def _is_round(name):
+    """Check a fixtures.json key is a matchday (J1, J2, ...)."""
+    return re.fullmatch(r"J\d+", name) is not None
+
+def load_fixtures(fixtures_file):
+    """Load fixtures.json as (has_divisions, {division: {round: [(home, away)]}}).
+
+    Accepts the three layouts written by generate_league.py: generated
+    leagues ({division: {round: [match]}}), a single league without
+    divisions ({round: [match]}, returned under the division "") and
+    manual pairings ({round: {division: [match]}}).
+    """
+    with open(fixtures_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    def pairs(matches):
+        return [(match["home"], match["away"]) for match in matches]
+
+    if all(isinstance(matches, list) for matches in data.values()):
+        return False, {"": {round_name: pairs(matches) for round_name, matches in data.items()}}
+
+    fixtures = {}
+    if data and all(_is_round(name) for name in data):
+        for round_name, divisions in data.items():
+            for division_name, matches in divisions.items():
+                fixtures.setdefault(division_name, {})[round_name] = pairs(matches)
+    else:
+        for division_name, rounds in data.items():
+            fixtures[division_name] = {round_name: pairs(matches) for round_name, matches in rounds.items()}
+    return True, fixtures
+
+def save_fixtures(fixtures, has_divisions, fixtures_file):
+    """Write {division: {round: [(home, away)]}} as fixtures.json in the generated layout."""
+    data = {
+        division_name: {round_name: [{"home": home, "away": away} for home, away in matches]
+                        for round_name, matches in rounds.items()}
+        for division_name, rounds in fixtures.items()
+    }
+    with open(fixtures_file, 'w', encoding='utf-8') as f:
+        json.dump(data if has_divisions else data.get("", {}), f, indent=2, ensure_ascii=False)
+
+def match_file_name(index, home, away):
+    """File name of the index-th acta of a round."""
+    return f"Match_{index}_{home}_vs_{away}.xlsx"
+
+def plan_fixture_changes(fixtures_dir, fixtures, old_fixtures, manifest):
+    """Diff new pairings against the actas on disk.
+
+    `fixtures` and `old_fixtures` are {division: {round: [(home, away)]}}
+    (the new pairings and the current fixtures.json) and `manifest` the
+    scanned Fixtures tree. Actas already at their target path are kept.
+    An acta whose pairing moved to another slot or round is moved there,
+    so its results survive. Missing pairings get a new acta, and actas
+    whose pairing is gone are removed. The old fixtures identify each file;
+    names they do not cover are parsed. A pairing with swapped venues needs
+    a new acta, since the teams' columns change.
+    """
+    fixtures_dir = Path(fixtures_dir)
+
+    def folder(division_name, round_name):
+        return fixtures_dir / division_name / round_name if division_name else fixtures_dir / round_name
+
+    existing = {}
+    for division_name, rounds in manifest.divisions.items():
+        division_name = division_name or ""
+        for round_name, actas in rounds.items():
+            old_matches = old_fixtures.get(division_name, {}).get(round_name, [])
+            known = {match_file_name(i, home, away): (home, away) for i, (home, away) in enumerate(old_matches, 1)}
+            for entry in actas:
+                name = os.path.basename(entry.path)
+                pairing = known.get(name)
+                if pairing is None:
+                    match = MATCH_FILE_PATTERN.fullmatch(name)
+                    pairing = (match.group(2), match.group(3)) if match else None
+                existing[Path(entry.path)] = (division_name, round_name, pairing)
+
+    wanted = [(folder(division_name, round_name) / match_file_name(i, home, away), division_name, round_name, home, away)
+              for division_name, rounds in fixtures.items()
+              for round_name, matches in rounds.items()
+              for i, (home, away) in enumerate(matches, 1)]
+    keep = [path for path, *_ in wanted if path in existing]
+    kept = set(keep)
+    unclaimed = {path: info for path, info in existing.items() if path not in kept}
+
+    # Actas not at a wanted path, by (division, pairing), in case the pairing just moved
+    spare = {}
+    for path, (division_name, round_name, pairing) in unclaimed.items():
+        if pairing is not None:
+            spare.setdefault((division_name, pairing), []).append((round_name, path))
+
+    moves, creates = [], []
+    for path, division_name, round_name, home, away in wanted:
+        if path in existing:
+            continue
+        candidates = spare.get((division_name, (home, away)))
+        if candidates:
+            # Prefer an acta from the same round
+            i = next((k for k, (candidate_round, _) in enumerate(candidates) if candidate_round == round_name), 0)
+            source = candidates.pop(i)[1]
+            del unclaimed[source]
+            moves.append((source, path))
+        else:
+            creates.append((path, home, away))
+    return FixtureChanges(keep, moves, creates, list(unclaimed))
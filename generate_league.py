@@ -1,31 +1,97 @@
 #!/usr/bin/env python3
+import os
 import sys
 import shutil
 import json
 import logging
 from pathlib import Path
 from itertools import combinations
-import openpyxl
 import random
+from concurrent.futures import ThreadPoolExecutor
+from acta_writer import ActaTemplate
+from profiling import PROFILER
+from log_setup import SUMMARY, configure_logging
+from fixtures_manifest import (FIXTURES_FILE, load_fixtures, save_fixtures, scan_fixtures, list_actas, match_file_name,
+                               plan_fixture_changes)
+from pairings import round_robin, swiss_round, pairing_history
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('generate_league.log'),
-        logging.StreamHandler()
-    ]
-)
+TEMPLATE_PATH = "samples/clean/Hoja Limpia Acta.xlsx"
 
-def generate_league(roosters_folder, num_divisions=None, pairings_file=None):
-    """Generate league pairings and create match templates."""
+def load_acta_template(template_path):
+    """Load the acta template for bulk writing, or None to fall back to openpyxl."""
+    try:
+        return ActaTemplate(template_path)
+    except Exception as e:
+        logging.warning(f"Bulk acta writer unavailable for {template_path} ({e}); using openpyxl.")
+        return None
+
+def create_match_acta(template, template_path, match_file, team1, team2):
+    """Create a match acta with the team names filled in."""
+    if template is not None:
+        template.write(match_file, team1, team2)
+        return
+    
+    import openpyxl  # only needed when the bulk writer is unavailable
+    
+    shutil.copy2(template_path, match_file)
+    wb = openpyxl.load_workbook(match_file)
+    ws = wb.active
+    ws.cell(row=2, column=2, value=team1)
+    ws.cell(row=2, column=3, value=team2)
+    wb.save(match_file)
+
+def write_match_actas(pending, template_path, jobs=1):
+    """Write queued (match_file, team1, team2) actas, optionally over a thread pool.
+    
+    Folders must already exist; file names are fixed when the match is
+    queued, so the result does not depend on the order of the writes.
+    """
+    if not pending:
+        return
+    template = load_acta_template(template_path)
+    PROFILER.count_read(template_path)
+    
+    def write(task):
+        match_file, team1, team2 = task
+        division = match_file.parent.parent.name
+        with SUMMARY.timed(division):
+            create_match_acta(template, template_path, match_file, team1, team2)
+        SUMMARY.event(division, "actas written", f"Created: {match_file}", logging.DEBUG)
+    
+    jobs = min(jobs or 1, len(pending))
+    with PROFILER.stage("acta write"):
+        if jobs > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                # Consume the iterator so worker exceptions are raised here
+                list(executor.map(write, pending))
+        else:
+            for task in pending:
+                write(task)
+    
+    for match_file, _, _ in pending:
+        PROFILER.count_write(match_file)
+    SUMMARY.flush("Generated")
+
+def generate_league(roosters_folder, num_divisions=None, pairings_file=None, jobs=1, double=False, balanced=False,
+                    swiss=False, keep_actas=False, lazy=False):
+    """Generate league pairings and create match templates.
+    
+    Folders are prepared for every division first; the actas are then written
+    together using `jobs` worker threads and fixtures.json is saved last.
+    With `double` every pairing is played twice with venues swapped, and
+    with `balanced` home games alternate. With `swiss`, only the next round
+    is paired from the current standings and added to the existing fixtures.
+    With `keep_actas`, manual pairings only touch the actas that changed.
+    With `lazy`, only the first round's actas are written; fixtures.json
+    holds the rest of the season until materialize_rounds writes it.
+    """
     roosters_path = Path(roosters_folder)
     fixtures_data = {}
+    pending = []
     
     # If pairings file provided, use manual pairings
     if pairings_file:
-        generate_from_pairings(roosters_folder, pairings_file)
+        generate_from_pairings(roosters_folder, pairings_file, jobs, keep_actas)
         return
     
     # If path is a directory, look for Rosters subfolder
@@ -39,7 +105,12 @@ def generate_league(roosters_folder, num_divisions=None, pairings_file=None):
         return
     
     # Check for division subfolders
-    division_folders = [d for d in roosters_path.iterdir() if d.is_dir()]
+    with PROFILER.stage("directory scan"):
+        division_folders = [d for d in roosters_path.iterdir() if d.is_dir()]
+    
+    if swiss:
+        generate_swiss_round(roosters_path, division_folders, jobs)
+        return
     
     if division_folders:
         # Process each division separately
@@ -48,17 +119,41 @@ def generate_league(roosters_folder, num_divisions=None, pairings_file=None):
             teams = [f.stem for f in division_folder.glob("*.pdf")]
             if len(teams) >= 2:
                 logging.info(f"Processing division: {division_name}")
-                division_fixtures = generate_division_league(teams, roosters_path.parent, division_name)
+                division_fixtures = generate_division_league(teams, roosters_path.parent, division_name, pending,
+                                                             double, balanced, lazy)
                 if division_fixtures:
                     fixtures_data[division_name] = division_fixtures
-        return
+        
+        if not fixtures_data:
+            logging.error("Need at least 2 teams to generate a league.")
+            return
     
-    # No divisions, process as single league or split into divisions
-    teams = [f.stem for f in roosters_path.glob("*.pdf")]
+    else:
+        # No divisions, process as single league or split into divisions
+        teams = [f.stem for f in roosters_path.glob("*.pdf")]
+        
+        if len(teams) < 2:
+            logging.error("Need at least 2 teams to generate a league.")
+            return
+        
+        fixtures_data = _generate_split_league(teams, roosters_path.parent, num_divisions, pending, double, balanced,
+                                               lazy)
+        if not fixtures_data:
+            return
     
-    if len(teams) < 2:
-        logging.error("Need at least 2 teams to generate a league.")
-        return
+    write_match_actas(pending, Path(TEMPLATE_PATH), jobs)
+    
+    # Save fixtures to JSON
+    fixtures_file = roosters_path.parent / "Fixtures" / "fixtures.json"
+    with PROFILER.stage("file writes"):
+        with open(fixtures_file, 'w', encoding='utf-8') as f:
+            json.dump(fixtures_data, f, indent=2, ensure_ascii=False)
+    PROFILER.count_write(fixtures_file)
+    logging.info(f"Fixtures saved to: {fixtures_file}")
+
+def _generate_split_league(teams, parent_dir, num_divisions, pending, double=False, balanced=False, lazy=False):
+    """Schedule a single league, or split teams randomly into divisions."""
+    fixtures_data = {}
     
     # If num_divisions specified, split teams randomly
     if num_divisions and num_divisions > 1:
@@ -74,48 +169,41 @@ def generate_league(roosters_folder, num_divisions=None, pairings_file=None):
             division_name = f"Division {i + 1}"
             division_teams = teams[i * teams_per_division:(i + 1) * teams_per_division]
             logging.info(f"Processing division: {division_name}")
-            division_fixtures = generate_division_league(division_teams, roosters_path.parent, division_name)
+            division_fixtures = generate_division_league(division_teams, parent_dir, division_name, pending,
+                                                         double, balanced, lazy)
             if division_fixtures:
                 fixtures_data[division_name] = division_fixtures
     else:
-        fixtures_data = generate_division_league(teams, roosters_path.parent, None)
+        fixtures_data = generate_division_league(teams, parent_dir, None, pending, double, balanced, lazy)
     
-    # Save fixtures to JSON
-    fixtures_file = roosters_path.parent / "Fixtures" / "fixtures.json"
-    with open(fixtures_file, 'w', encoding='utf-8') as f:
-        json.dump(fixtures_data, f, indent=2, ensure_ascii=False)
-    logging.info(f"Fixtures saved to: {fixtures_file}")
+    return fixtures_data
 
-def generate_division_league(teams, parent_dir, division_name=None):
-    """Generate league schedule for a division."""
-    # Generate round-robin schedule (each team plays once per date)
-    n = len(teams)
-    if n % 2 == 1:
-        teams.append("BYE")  # Add bye for odd number of teams
-        n += 1
+def generate_division_league(teams, parent_dir, division_name=None, pending=None, double=False, balanced=False,
+                             lazy=False):
+    """Generate league schedule for a division.
     
-    schedule = []
+    Match actas are appended to `pending` as (match_file, team1, team2) for
+    the caller to write; without it they are written before returning. With
+    `lazy`, only the first round gets a folder and actas.
+    """
     fixtures_json = {}
     
-    for round_num in range(n - 1):
-        round_matches = []
-        for i in range(n // 2):
-            team1 = teams[i]
-            team2 = teams[n - 1 - i]
-            if team1 != "BYE" and team2 != "BYE":
-                round_matches.append((team1, team2))
-        schedule.append(round_matches)
-        # Rotate teams (keep first team fixed)
-        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    # Generate round-robin schedule (each team plays once per date)
+    with PROFILER.stage("scheduling"):
+        schedule = round_robin(teams, double, balanced)
     
     total_dates = len(schedule)
     
-    template_path = Path("samples/clean/Hoja Limpia Acta.xlsx")
+    template_path = Path(TEMPLATE_PATH)
     
     if not template_path.exists():
         logging.error(f"Template file not found: {template_path}")
         return
     
+    write_now = pending is None
+    if write_now:
+        pending = []
+    
     # Create date folders under Fixtures folder
     fixtures_dir = parent_dir / "Fixtures"
     fixtures_dir.mkdir(exist_ok=True)
@@ -127,48 +215,110 @@ def generate_division_league(teams, parent_dir, division_name=None):
         base_dir = fixtures_dir
     
     # Wipe previous date folders
-    for existing_folder in base_dir.glob("J*"):
-        if existing_folder.is_dir():
-            shutil.rmtree(existing_folder)
-            logging.info(f"Removed: {existing_folder}")
+    with PROFILER.stage("wipe"):
+        for existing_folder in base_dir.glob("J*"):
+            if existing_folder.is_dir():
+                shutil.rmtree(existing_folder)
+                SUMMARY.event(base_dir.name, "folders removed", f"Removed: {existing_folder}")
     
     for date_num, round_matches in enumerate(schedule, 1):
-        date_folder = base_dir / f"J{date_num}"
-        date_folder.mkdir(exist_ok=True)
-        
         date_key = f"J{date_num}"
-        fixtures_json[date_key] = []
+        fixtures_json[date_key] = [{"home": team1, "away": team2} for team1, team2 in round_matches]
+        if lazy and date_num > 1:
+            continue
         
+        date_folder = base_dir / date_key
+        date_folder.mkdir(exist_ok=True)
         for i, (team1, team2) in enumerate(round_matches, 1):
             match_file = date_folder / f"Match_{i}_{team1}_vs_{team2}.xlsx"
-            shutil.copy2(template_path, match_file)
-            
-            # Update team names in Excel file
-            wb = openpyxl.load_workbook(match_file)
-            ws = wb.active
-            ws.cell(row=2, column=2, value=team1)
-            ws.cell(row=2, column=3, value=team2)
-            wb.save(match_file)
-            
-            # Add to fixtures JSON
-            fixtures_json[date_key].append({
-                "home": team1,
-                "away": team2
-            })
-            
-            logging.debug(f"Created: {match_file}")
+            pending.append((match_file, team1, team2))
+    
+    if write_now:
+        write_match_actas(pending, template_path)
     
     total_matches = sum(len(round_matches) for round_matches in schedule)
     logging.info(f"League generated with {len([t for t in teams if t != 'BYE'])} teams, {total_matches} matches across {total_dates} dates.")
     
     return fixtures_json
 
-def generate_from_pairings(league_folder, pairings_file):
-    """Generate fixtures from manual pairings JSON file."""
+def generate_swiss_round(roosters_path, division_folders, jobs=1):
+    """Pair the next Swiss round of every division and add it to fixtures.json.
+    
+    Teams are ranked by the standings in Classification/league_data.json
+    (roster order before any result) and paired with swiss_round, avoiding
+    the pairings already in fixtures.json. Existing J* folders are kept;
+    only the new round's actas are written.
+    """
+    # The standings engine needs pandas, so it is only imported for Swiss rounds
+    from standings import aggregate_league, rank_standings, round_key
+    from update_classification import load_settings
+    
+    if division_folders:
+        rosters = {d.name: sorted(f.stem for f in d.glob("*.pdf")) for d in division_folders}
+    else:
+        rosters = {"": sorted(f.stem for f in roosters_path.glob("*.pdf"))}
+    rosters = {name: teams for name, teams in rosters.items() if len(teams) >= 2}
+    if not rosters:
+        logging.error("Need at least 2 teams to generate a league.")
+        return
+    
+    template_path = Path(TEMPLATE_PATH)
+    if not template_path.exists():
+        logging.error(f"Template file not found: {template_path}")
+        return
+    
+    league_path = roosters_path.parent
+    fixtures_dir = league_path / "Fixtures"
+    fixtures_dir.mkdir(exist_ok=True)
+    fixtures_file = fixtures_dir / FIXTURES_FILE
+    fixtures = load_fixtures(fixtures_file)[1] if fixtures_file.exists() else {}
+    
+    has_divisions = bool(division_folders)
+    league_data = {}
+    data_file = league_path / "Classification" / "league_data.json"
+    if data_file.exists():
+        with open(data_file, 'r') as f:
+            league_data = json.load(f)
+    divisions = {name: league_data.get(name, {}) if has_divisions else league_data for name in rosters}
+    ranked = rank_standings(aggregate_league(divisions, rosters), load_settings(), divisions)
+    
+    pending = []
+    with PROFILER.stage("scheduling"):
+        for name, teams in rosters.items():
+            rounds = fixtures.setdefault(name, {})
+            history = pairing_history([rounds[r] for r in sorted(rounds, key=round_key)], teams)
+            standings = [(team, stats) for team, stats in ranked[name] if team in teams]
+            matches, bye = swiss_round([team for team, _ in standings], *history,
+                                       scores={team: stats["points"] for team, stats in standings})
+            
+            round_number = max((round_key(r)[1] for r in rounds if round_key(r)[0] == 0), default=0) + 1
+            round_name = f"J{round_number}"
+            rounds[round_name] = matches
+            date_folder = fixtures_dir / name / round_name if name else fixtures_dir / round_name
+            date_folder.mkdir(parents=True, exist_ok=True)
+            for i, (team1, team2) in enumerate(matches, 1):
+                pending.append((date_folder / f"Match_{i}_{team1}_vs_{team2}.xlsx", team1, team2))
+            logging.info(f"Swiss round {round_name} for {name or 'league'}: {len(matches)} matches"
+                         + (f", bye: {bye}" if bye else ""))
+    
+    write_match_actas(pending, template_path, jobs)
+    
+    with PROFILER.stage("file writes"):
+        save_fixtures(fixtures, has_divisions, fixtures_file)
+    PROFILER.count_write(fixtures_file)
+    logging.info(f"Fixtures saved to: {fixtures_file}")
+
+def generate_from_pairings(league_folder, pairings_file, jobs=1, keep_actas=False):
+    """Generate fixtures from manual pairings JSON file.
+    
+    By default every acta is rebuilt. With `keep_actas`, the pairings are
+    diffed against fixtures.json and the actas on disk instead, and only
+    the matches that changed are created, moved or removed.
+    """
     with open(pairings_file, 'r', encoding='utf-8') as f:
         pairings = json.load(f)
     
-    template_path = Path("samples/clean/Hoja Limpia Acta.xlsx")
+    template_path = Path(TEMPLATE_PATH)
     if not template_path.exists():
         logging.error(f"Template file not found: {template_path}")
         return
@@ -177,47 +327,163 @@ def generate_from_pairings(league_folder, pairings_file):
     fixtures_dir = league_path / "Fixtures"
     fixtures_dir.mkdir(exist_ok=True)
     
-    # Wipe previous fixtures
-    if fixtures_dir.exists():
-        for item in fixtures_dir.iterdir():
-            if item.is_dir():
-                shutil.rmtree(item)
-    
-    # Process each round (J1, J2, etc.)
-    for round_name, divisions in pairings.items():
-        for division_name, matches in divisions.items():
-            division_folder = fixtures_dir / division_name / round_name
-            division_folder.mkdir(parents=True, exist_ok=True)
-            
-            for i, match in enumerate(matches, 1):
-                team1 = match['home']
-                team2 = match['away']
-                
-                match_file = division_folder / f"Match_{i}_{team1}_vs_{team2}.xlsx"
-                shutil.copy2(template_path, match_file)
-                
-                wb = openpyxl.load_workbook(match_file)
-                ws = wb.active
-                ws.cell(row=2, column=2, value=team1)
-                ws.cell(row=2, column=3, value=team2)
-                wb.save(match_file)
+    if keep_actas:
+        update_from_pairings(fixtures_dir, load_fixtures(pairings_file)[1], template_path, jobs)
+    else:
+        # Wipe previous fixtures
+        with PROFILER.stage("wipe"):
+            if fixtures_dir.exists():
+                for item in fixtures_dir.iterdir():
+                    if item.is_dir():
+                        shutil.rmtree(item)
+        
+        # Process each round (J1, J2, etc.)
+        pending = []
+        for round_name, divisions in pairings.items():
+            for division_name, matches in divisions.items():
+                division_folder = fixtures_dir / division_name / round_name
+                division_folder.mkdir(parents=True, exist_ok=True)
                 
-                logging.debug(f"Created: {match_file}")
+                for i, match in enumerate(matches, 1):
+                    team1 = match['home']
+                    team2 = match['away']
+                    
+                    match_file = division_folder / f"Match_{i}_{team1}_vs_{team2}.xlsx"
+                    pending.append((match_file, team1, team2))
+        
+        write_match_actas(pending, template_path, jobs)
     
     # Save pairings as fixtures.json
     fixtures_file = fixtures_dir / "fixtures.json"
-    with open(fixtures_file, 'w', encoding='utf-8') as f:
-        json.dump(pairings, f, indent=2, ensure_ascii=False)
+    with PROFILER.stage("file writes"):
+        with open(fixtures_file, 'w', encoding='utf-8') as f:
+            json.dump(pairings, f, indent=2, ensure_ascii=False)
+    PROFILER.count_write(fixtures_file)
     logging.info(f"Fixtures saved to: {fixtures_file}")
 
+def update_from_pairings(fixtures_dir, fixtures, template_path, jobs=1):
+    """Apply new pairings ({division: {round: [(home, away)]}}) to an existing Fixtures tree.
+    
+    Actas whose pairing is unchanged are left untouched, results included;
+    see plan_fixture_changes for how moved, new and dropped matches are
+    found. Round and division folders left empty are removed.
+    """
+    fixtures_file = fixtures_dir / FIXTURES_FILE
+    old_fixtures = load_fixtures(fixtures_file)[1] if fixtures_file.exists() else {}
+    with PROFILER.stage("fixture scan"):
+        changes = plan_fixture_changes(fixtures_dir, fixtures, old_fixtures, scan_fixtures(fixtures_dir))
+    
+    emptied = set()
+    with PROFILER.stage("wipe"):
+        for path in changes.removes:
+            path.unlink()
+            emptied.add(path.parent)
+            SUMMARY.event(path.parent.parent.name, "actas removed", f"Removed: {path}", logging.WARNING)
+    with PROFILER.stage("file moves"):
+        for source, target in changes.moves:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+            emptied.add(source.parent)
+            SUMMARY.event(target.parent.parent.name, "actas moved", f"Moved: {source} -> {target}")
+    for match_file, _, _ in changes.creates:
+        match_file.parent.mkdir(parents=True, exist_ok=True)
+    write_match_actas(changes.creates, template_path, jobs)
+    # write_match_actas only flushes when it has actas to write
+    SUMMARY.flush("Updated")
+    
+    # Drop emptied round folders, then their division folders
+    for folder in sorted(emptied, key=lambda folder: len(folder.parts), reverse=True):
+        while folder != fixtures_dir and folder.is_dir() and not any(folder.iterdir()):
+            folder.rmdir()
+            folder = folder.parent
+    
+    logging.info(f"Pairings applied: {len(changes.keep)} actas kept, {len(changes.moves)} moved, "
+                 f"{len(changes.creates)} created, {len(changes.removes)} removed")
+
+def round_closed(date_folder):
+    """Check every acta of a round folder has a result; an unreadable acta leaves it open."""
+    from acta_reader import read_acta
+    
+    for entry in list_actas(date_folder):
+        try:
+            acta = read_acta(entry.path)
+        except Exception as e:
+            logging.error(f"Error reading {entry.path}: {e}")
+            return False
+        PROFILER.count_read(entry.path, entry.size)
+        if acta.touchdowns_b is None and acta.touchdowns_c is None:
+            return False
+    return True
+
+def next_round(base_dir, rounds):
+    """First scheduled round without a folder, once the round before it is closed; else None."""
+    from standings import round_key
+    
+    previous = None
+    for round_name in sorted(rounds, key=round_key):
+        if not (base_dir / round_name).is_dir():
+            if previous is None or round_closed(base_dir / previous):
+                return round_name
+            return None
+        previous = round_name
+    return None
+
+def materialize_rounds(league_folder, round_name="auto", jobs=1):
+    """Write the actas of one round of fixtures.json that are not on disk yet.
+    
+    `round_name` (e.g. "J5") is materialized in every division that has
+    it. With "auto", each division gets its first round without a folder,
+    provided every acta of the round before it has a result. Existing actas
+    are never overwritten.
+    """
+    template_path = Path(TEMPLATE_PATH)
+    if not template_path.exists():
+        logging.error(f"Template file not found: {template_path}")
+        return
+    
+    fixtures_dir = Path(league_folder) / "Fixtures"
+    fixtures_file = fixtures_dir / FIXTURES_FILE
+    if not fixtures_file.exists():
+        logging.error(f"Fixtures file not found: {fixtures_file}")
+        return
+    _, fixtures = load_fixtures(fixtures_file)
+    
+    pending = []
+    for division_name, rounds in fixtures.items():
+        base_dir = fixtures_dir / division_name if division_name else fixtures_dir
+        target = next_round(base_dir, rounds) if round_name == "auto" else round_name
+        if target not in rounds:
+            logging.info(f"No round to materialize for {division_name or 'league'}")
+            continue
+        
+        date_folder = base_dir / target
+        date_folder.mkdir(parents=True, exist_ok=True)
+        matches = [(date_folder / match_file_name(i, team1, team2), team1, team2)
+                   for i, (team1, team2) in enumerate(rounds[target], 1)]
+        missing = [match for match in matches if not match[0].exists()]
+        pending += missing
+        logging.info(f"Materializing {target} for {division_name or 'league'}: {len(missing)} of {len(matches)} actas")
+    
+    write_match_actas(pending, template_path, jobs)
+
 if __name__ == "__main__":
+    configure_logging('generate_league.log', summary="--log-summary" in sys.argv)
     if len(sys.argv) < 2:
-        print("Usage: python generate_league.py <league_folder_path> [--divisions N] [--pairings <json_file>]")
+        print("Usage: python generate_league.py <league_folder_path> [--divisions N] [--pairings <json_file>] [--double] [--balanced] [--swiss] [--keep-actas] [--lazy] [--materialize ROUND|auto] [--jobs N] [--log-summary] [--profile [--profile-out FILE]]")
         sys.exit(1)
     
     roosters_folder = sys.argv[1]
     num_divisions = None
     pairings_file = None
+    jobs = os.cpu_count() or 1
+    double = "--double" in sys.argv
+    balanced = "--balanced" in sys.argv
+    swiss = "--swiss" in sys.argv
+    keep_actas = "--keep-actas" in sys.argv
+    lazy = "--lazy" in sys.argv
+    materialize = None
+    profile = "--profile" in sys.argv
+    profile_out = None
     
     # Parse --divisions parameter
     if "--divisions" in sys.argv:
@@ -238,4 +504,46 @@ if __name__ == "__main__":
         if idx + 1 < len(sys.argv):
             pairings_file = sys.argv[idx + 1]
     
-    generate_league(roosters_folder, num_divisions, pairings_file)
+    # Parse --materialize parameter
+    if "--materialize" in sys.argv:
+        idx = sys.argv.index("--materialize")
+        if idx + 1 < len(sys.argv):
+            materialize = sys.argv[idx + 1]
+        else:
+            logging.error("materialize needs a round name (e.g. J5) or auto.")
+            sys.exit(1)
+    
+    # Parse --jobs parameter
+    if "--jobs" in sys.argv:
+        idx = sys.argv.index("--jobs")
+        try:
+            jobs = int(sys.argv[idx + 1])
+            if jobs <= 0:
+                raise ValueError
+        except (IndexError, ValueError):
+            logging.error("jobs must be a positive integer.")
+            sys.exit(1)
+    
+    # Parse --profile-out parameter
+    if "--profile-out" in sys.argv:
+        idx = sys.argv.index("--profile-out")
+        if idx + 1 < len(sys.argv):
+            profile_out = sys.argv[idx + 1]
+            profile = True
+    
+    if profile:
+        PROFILER.start(profile_out)
+    
+    if materialize:
+        materialize_rounds(roosters_folder, materialize, jobs)
+    else:
+        generate_league(roosters_folder, num_divisions, pairings_file, jobs, double, balanced, swiss, keep_actas, lazy)
+    
+    if profile:
+        PROFILER.stop()
+        print("\n" + PROFILER.summary())
+        # metrics.json goes next to fixtures.json
+        for fixtures_dir in (Path(roosters_folder) / "Fixtures", Path(roosters_folder).parent / "Fixtures"):
+            if fixtures_dir.exists():
+                PROFILER.save(fixtures_dir / "metrics.json")
+                break
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Single entry point for league generation and classification.
+
+Usage:
+    python kwbb.py generate <league_folder_path> [options]
+    python kwbb.py classify <league_folder_path> [options]
+    python kwbb.py all <league_folder_path> [options]
+    python kwbb.py project <league_folder_path> [options]
+
+Heavy modules (pandas, numpy, openpyxl) are imported only once a command
+runs, so --help and argument errors return immediately. `all` generates
+the fixtures and classifies them in one process; `project` simulates the
+remaining fixtures of a classified league.
+"""
+import os
+import sys
+import argparse
+from pathlib import Path
+
+def positive_int(value):
+    """argparse type for strictly positive integers."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value}")
+    return number
+
+def positive_float(value):
+    """argparse type for a strictly positive number of seconds."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number of seconds: {value}")
+    return number
+
+def non_negative_float(value):
+    """argparse type for a non-negative number of seconds."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative number of seconds: {value}")
+    return number
+
+def add_common_options(parser):
+    parser.add_argument("league_folder", help="league folder (containing Rosters/ and Fixtures/)")
+    parser.add_argument("--jobs", type=positive_int, default=os.cpu_count() or 1,
+                        help="worker threads/processes (default: CPU count)")
+    parser.add_argument("--log-summary", action="store_true", help="log one line per division instead of per file")
+    parser.add_argument("--profile", action="store_true", help="print per-stage timings and save metrics.json")
+    parser.add_argument("--profile-out", metavar="FILE", help="also dump cProfile stats to FILE (implies --profile)")
+
+def add_generate_options(parser):
+    parser.add_argument("--divisions", type=positive_int, help="split teams randomly into N divisions")
+    parser.add_argument("--pairings", metavar="JSON_FILE", help="use manual pairings instead of a round-robin")
+    parser.add_argument("--double", action="store_true", help="double round-robin, venues swapped in the second half")
+    parser.add_argument("--balanced", action="store_true", help="alternate home and away games")
+    parser.add_argument("--swiss", action="store_true", help="pair the next Swiss round from the current standings")
+    parser.add_argument("--keep-actas", action="store_true",
+                        help="with --pairings, only create, move or remove the actas that changed")
+    parser.add_argument("--lazy", action="store_true", help="write only the first round's actas; see --materialize")
+    parser.add_argument("--materialize", metavar="ROUND",
+                        help="write the actas of ROUND (e.g. J5) from fixtures.json, or 'auto' for the next round "
+                             "once the previous one is played")
+
+def add_classify_options(parser):
+    parser.add_argument("--cache-dir", metavar="DIR", help="parse cache folder (default: Classification/)")
+    parser.add_argument("--cache-size", type=positive_int, help="maximum number of cached actas")
+    parser.add_argument("--no-cache", action="store_true", help="parse every acta from scratch")
+    parser.add_argument("--incremental", action="store_true", help="apply only changed results to the standings")
+    parser.add_argument("--history", action="store_true", help="also write the table after every round")
+    parser.add_argument("--sqlite", action="store_true", help="also sync the results into Classification/league.db")
+    parser.add_argument("--manifest", action="store_true", help="save Classification/fixtures_manifest.json")
+    parser.add_argument("--watch", action="store_true", help="keep running and re-classify on acta changes")
+    parser.add_argument("--interval", type=positive_float, default=1.0, help="--watch polling interval (s)")
+    parser.add_argument("--debounce", type=non_negative_float, default=2.0, help="--watch quiet period (s)")
+
+def add_project_options(parser):
+    parser.add_argument("--simulations", type=positive_int, default=100000,
+                        help="number of simulated seasons (default: 100000)")
+    parser.add_argument("--seed", type=int, help="random seed, for reproducible projections")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="kwbb", description="KW Blood Bowl league helper")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="generate fixtures and match reports")
+    add_common_options(generate)
+    add_generate_options(generate)
+
+    classify = commands.add_parser("classify", help="process match reports into classification tables")
+    add_common_options(classify)
+    add_classify_options(classify)
+
+    run_all = commands.add_parser("all", help="generate, then classify, in one process")
+    add_common_options(run_all)
+    add_generate_options(run_all)
+    add_classify_options(run_all)
+
+    project = commands.add_parser("project", help="simulate the remaining fixtures into position probabilities")
+    add_common_options(project)
+    add_project_options(project)
+    return parser
+
+def run_generate(args):
+    from generate_league import generate_league, materialize_rounds
+
+    if args.materialize:
+        materialize_rounds(args.league_folder, args.materialize, args.jobs)
+    else:
+        generate_league(args.league_folder, args.divisions, args.pairings, args.jobs, args.double, args.balanced,
+                        args.swiss, args.keep_actas, args.lazy)
+
+def run_classify(args):
+    from update_classification import read_excel_files, watch_league
+    from parse_cache import DEFAULT_MAX_ENTRIES
+
+    cache_size = args.cache_size or DEFAULT_MAX_ENTRIES
+    if args.watch:
+        watch_league(args.league_folder, args.interval, args.debounce, args.jobs, args.cache_dir, cache_size,
+                     args.history, args.sqlite, args.manifest)
+    else:
+        read_excel_files(args.league_folder, args.jobs, not args.no_cache, args.cache_dir, cache_size,
+                         args.incremental, args.history, args.sqlite, args.manifest)
+
+def run_project(args):
+    from projection import project_season
+
+    project_season(args.league_folder, args.simulations, args.seed, args.jobs)
+
+def metrics_folder(args):
+    """Folder for metrics.json: Classification/ after classifying, else next to fixtures.json."""
+    league = Path(args.league_folder)
+    candidates = [league / "Fixtures", league.parent / "Fixtures"]
+    if args.command != "generate":
+        candidates.insert(0, league / "Classification")
+    return next((folder for folder in candidates if folder.exists()), None)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from log_setup import configure_logging
+    from profiling import PROFILER
+
+    configure_logging("kwbb.log", summary=args.log_summary)
+    profile = args.profile or args.profile_out is not None
+    if profile:
+        PROFILER.start(args.profile_out)
+
+    if args.command in ("generate", "all"):
+        run_generate(args)
+    if args.command in ("classify", "all"):
+        run_classify(args)
+    if args.command == "project":
+        run_project(args)
+
+    if profile:
+        PROFILER.stop()
+        print("\n" + PROFILER.summary())
+        folder = metrics_folder(args)
+        if folder is not None:
+            PROFILER.save(folder / "metrics.json")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import os
+import json
+import logging
+from pathlib import Path
+from standings import round_key
+from profiling import PROFILER
+
+LINES_FILE = "league_data.jsonl"
+INDEX_FILE = "league_data.idx.json"
+INDEX_VERSION = 1
+
+def _match_records(division_data):
+    """Group {round: {team: data}} into one record per match, in round order."""
+    for round_name in sorted(division_data, key=round_key):
+        round_data = division_data[round_name]
+        seen = set()
+        for team, data in round_data.items():
+            if team in seen:
+                continue
+            teams = {team: data}
+            rival = data.get("rival")
+            if rival in round_data and rival not in seen and round_data[rival].get("rival") == team:
+                teams[rival] = round_data[rival]
+            seen.update(teams)
+            yield round_name, teams
+
+def write_league_lines(league_data, output_folder, has_divisions):
+    """Write league_data.jsonl (one match per line) and its offset index.
+
+    Lines are grouped by division and round, so the index only stores the
+    byte range of each (division, round). Both files are replaced
+    atomically, data first.
+    """
+    divisions = league_data if has_divisions else {"": league_data}
+    lines_file = Path(output_folder) / LINES_FILE
+    index_file = Path(output_folder) / INDEX_FILE
+
+    index = {}
+    offset = 0
+    with PROFILER.stage("file writes"):
+        with open(f"{lines_file}.tmp", 'wb') as f:
+            for division_name, division_data in divisions.items():
+                rounds = index.setdefault(division_name, {})
+                for round_name, teams in _match_records(division_data):
+                    line = json.dumps({"division": division_name, "round": round_name, "teams": teams},
+                                      separators=(",", ":")).encode("utf-8") + b"\n"
+                    f.write(line)
+                    start, _ = rounds.get(round_name, (offset, offset))
+                    offset += len(line)
+                    rounds[round_name] = (start, offset)
+                # Rounds without results still get an (empty) entry
+                for round_name in division_data:
+                    rounds.setdefault(round_name, (offset, offset))
+        os.replace(f"{lines_file}.tmp", lines_file)
+
+        with open(f"{index_file}.tmp", 'w') as f:
+            json.dump({"version": INDEX_VERSION, "has_divisions": has_divisions, "size": offset,
+                       "divisions": index}, f)
+        os.replace(f"{index_file}.tmp", index_file)
+        PROFILER.count_write(lines_file)
+        PROFILER.count_write(index_file)
+
+    logging.info(f"League data lines saved to: {lines_file}")
+
+class LeagueDataReader:
+    """Read parts of league_data.jsonl without loading the whole file.
+
+    Only the small offset index is loaded up front; divisions and rounds are
+    read by seeking to their byte range. Use "" as the division name for a
+    league without divisions.
+    """
+
+    def __init__(self, output_folder):
+        self.lines_file = Path(output_folder) / LINES_FILE
+        with open(Path(output_folder) / INDEX_FILE, 'r') as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version in {INDEX_FILE}: {index.get('version')}")
+        if os.path.getsize(self.lines_file) != index["size"]:
+            raise ValueError(f"{LINES_FILE} does not match {INDEX_FILE}; re-run update_classification.py")
+        self.has_divisions = index["has_divisions"]
+        self.index = index["divisions"]
+
+    def divisions(self):
+        """Return the division names in file order."""
+        return list(self.index)
+
+    def rounds(self, division=""):
+        """Return the round names of a division in round order."""
+        return sorted(self.index[division], key=round_key)
+
+    def _read_range(self, start, end):
+        """Yield the match records stored in a byte range, one line at a time."""
+        with open(self.lines_file, 'rb') as f:
+            f.seek(start)
+            position = start
+            while position < end:
+                line = f.readline()
+                position += len(line)
+                yield json.loads(line)
+
+    def iter_matches(self, division="", round_name=None):
+        """Yield the match records of a division, or of one of its rounds.
+
+        Each record is {"division", "round", "teams": {team: data}}.
+        """
+        rounds = self.index[division]
+        if round_name is not None:
+            yield from self._read_range(*rounds[round_name])
+            return
+        ranges = [r for r in rounds.values() if r[0] != r[1]]
+        if ranges:
+            yield from self._read_range(min(r[0] for r in ranges), max(r[1] for r in ranges))
+
+    def read_round(self, division, round_name):
+        """Return {team: data} for one round, as in league_data.json."""
+        round_data = {}
+        for record in self.iter_matches(division, round_name):
+            round_data.update(record["teams"])
+        return round_data
+
+    def read_division(self, division=""):
+        """Return {round: {team: data}} for one division in round order, as in league_data.json."""
+        division_data = {round_name: {} for round_name in self.rounds(division)}
+        for record in self.iter_matches(division):
+            division_data[record["round"]].update(record["teams"])
+        return division_data
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+import sqlite3
+import logging
+from standings import round_key, DEFAULT_SORTING_CRITERIA
+
+LEAGUE_DB = "league.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS divisions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    division_id INTEGER NOT NULL REFERENCES divisions(id),
+    name TEXT NOT NULL,
+    UNIQUE (division_id, name)
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    division_id INTEGER NOT NULL REFERENCES divisions(id),
+    name TEXT NOT NULL,
+    number INTEGER,
+    UNIQUE (division_id, name)
+);
+-- One row per acta; NULL touchdowns on both sides means not played
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    round_id INTEGER NOT NULL REFERENCES rounds(id),
+    acta TEXT NOT NULL,
+    home_team_id INTEGER REFERENCES teams(id),
+    away_team_id INTEGER REFERENCES teams(id),
+    home_td INTEGER,
+    away_td INTEGER,
+    home_cash REAL,
+    away_cash REAL,
+    home_fans REAL,
+    away_fans REAL,
+    home_attendants REAL,
+    away_attendants REAL,
+    -- Also serves as the index for per-round lookups
+    UNIQUE (round_id, acta)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_home_team ON matches (home_team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_away_team ON matches (away_team_id);
+CREATE TABLE IF NOT EXISTS league_points (
+    result TEXT PRIMARY KEY,
+    points INTEGER NOT NULL
+);
+
+-- Views are recreated on every open, so existing databases pick up changed definitions
+DROP VIEW IF EXISTS round_results;
+DROP VIEW IF EXISTS standings;
+DROP VIEW IF EXISTS team_history;
+
+-- Each played match seen from both teams; one empty touchdown field counts as 0
+CREATE VIEW team_history AS
+WITH sides AS (
+    SELECT m.id AS match_id, m.round_id, m.home_team_id AS team_id, m.away_team_id AS rival_id, 'home' AS venue,
+           COALESCE(m.home_td, 0) AS td_for, COALESCE(m.away_td, 0) AS td_against
+    FROM matches m WHERE m.home_td IS NOT NULL OR m.away_td IS NOT NULL
+    UNION ALL
+    SELECT m.id, m.round_id, m.away_team_id, m.home_team_id, 'away',
+           COALESCE(m.away_td, 0), COALESCE(m.home_td, 0)
+    FROM matches m WHERE m.home_td IS NOT NULL OR m.away_td IS NOT NULL
+), results AS (
+    SELECT s.*, CASE WHEN td_for > td_against THEN 'win' WHEN td_for < td_against THEN 'lose' ELSE 'draw' END AS result
+    FROM sides s WHERE s.team_id IS NOT NULL
+)
+SELECT d.name AS division, r.name AS round, r.number AS round_number, t.name AS team, o.name AS rival,
+       res.venue, res.td_for, res.td_against, res.result, COALESCE(lp.points, 0) AS points
+FROM results res
+JOIN teams t ON t.id = res.team_id
+LEFT JOIN teams o ON o.id = res.rival_id
+JOIN rounds r ON r.id = res.round_id
+JOIN divisions d ON d.id = r.division_id
+LEFT JOIN league_points lp ON lp.result = res.result;
+
+CREATE VIEW standings AS
+SELECT d.name AS division, t.name AS team,
+       COUNT(h.result) AS played,
+       COALESCE(SUM(h.points), 0) AS points,
+       COALESCE(SUM(h.result = 'win'), 0) AS wins,
+       COALESCE(SUM(h.result = 'draw'), 0) AS draws,
+       COALESCE(SUM(h.result = 'lose'), 0) AS losses,
+       COALESCE(SUM(h.td_for), 0) AS touchdowns,
+       COALESCE(SUM(h.td_against), 0) AS td_against,
+       COALESCE(SUM(h.td_for - h.td_against), 0) AS td_diff
+FROM teams t
+JOIN divisions d ON d.id = t.division_id
+LEFT JOIN team_history h ON h.division = d.name AND h.team = t.name
+GROUP BY t.id;
+
+CREATE VIEW round_results AS
+SELECT d.name AS division, r.name AS round, r.number AS round_number, m.acta,
+       ht.name AS home, at.name AS away, m.home_td, m.away_td,
+       (m.home_td IS NOT NULL OR m.away_td IS NOT NULL) AS played
+FROM matches m
+JOIN rounds r ON r.id = m.round_id
+JOIN divisions d ON d.id = r.division_id
+LEFT JOIN teams ht ON ht.id = m.home_team_id
+LEFT JOIN teams at ON at.id = m.away_team_id;
+"""
+
+# Sortable columns of the standings view
+STANDINGS_COLUMNS = ("played", "points", "wins", "draws", "losses", "touchdowns", "td_against", "td_diff")
+
+# Acta fields stored in matches, in column order after the team ids
+MATCH_FIELDS = ("touchdowns_b", "touchdowns_c", "cash_b", "cash_c", "fans_b", "fans_c", "attendants_b", "attendants_c")
+MATCH_COLUMNS = ("home_td", "away_td", "home_cash", "away_cash", "home_fans", "away_fans",
+                 "home_attendants", "away_attendants")
+
+class LeagueStore:
+    """SQLite store of divisions, teams, rounds and matches.
+
+    sync() mirrors the parsed actas into the database writing only the
+    matches that changed, all in one transaction. Standings, team history
+    and round results are SQL views, so readers can query a single team
+    or division without loading the whole season.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _ids(self, table, division_id=None):
+        """Return {name: id} for divisions, or for the teams/rounds of one division."""
+        if division_id is None:
+            rows = self.conn.execute(f"SELECT name, id FROM {table}")
+        else:
+            rows = self.conn.execute(f"SELECT name, id FROM {table} WHERE division_id = ?", (division_id,))
+        return {name: row_id for name, row_id in rows}
+
+    def sync(self, match_index, settings):
+        """Upsert the parsed actas of {division|None: {round: {acta: ActaRecord}}}.
+
+        Matches whose acta disappeared or could not be read are deleted.
+        Returns the number of matches inserted, updated or deleted.
+        """
+        changed = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM league_points")
+            self.conn.executemany("INSERT INTO league_points (result, points) VALUES (?, ?)",
+                                  settings["league_points"].items())
+
+            self.conn.executemany("INSERT OR IGNORE INTO divisions (name) VALUES (?)",
+                                  [(name or "",) for name in match_index])
+            division_ids = self._ids("divisions")
+            for division_name, division_index in match_index.items():
+                division_id = division_ids.pop(division_name or "")
+                changed += self._sync_division(division_id, division_index)
+
+            # Divisions that are no longer in the fixtures
+            for division_id in division_ids.values():
+                changed += self.conn.execute(
+                    "DELETE FROM matches WHERE round_id IN (SELECT id FROM rounds WHERE division_id = ?)",
+                    (division_id,)).rowcount
+                for table in ("rounds", "teams"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE division_id = ?", (division_id,))
+                self.conn.execute("DELETE FROM divisions WHERE id = ?", (division_id,))
+        return changed
+
+    def _sync_division(self, division_id, division_index):
+        """Write the changed matches of one division; returns how many changed."""
+        actas = [acta for round_actas in division_index.values() for acta in round_actas.values() if acta is not None]
+        teams = {name for acta in actas for name in (acta.team_b, acta.team_c) if name is not None}
+        self.conn.executemany("INSERT OR IGNORE INTO teams (division_id, name) VALUES (?, ?)",
+                              [(division_id, team) for team in sorted(teams)])
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO rounds (division_id, name, number) VALUES (?, ?, ?)",
+            [(division_id, name, round_key(name)[1] if round_key(name)[0] == 0 else None) for name in division_index])
+        team_ids = self._ids("teams", division_id)
+        round_ids = self._ids("rounds", division_id)
+
+        existing = {
+            (row["round_id"], row["acta"]): (row["id"], tuple(row)[3:])
+            for row in self.conn.execute(
+                f"SELECT m.id, m.round_id, m.acta, m.home_team_id, m.away_team_id, {', '.join(MATCH_COLUMNS)} "
+                "FROM matches m JOIN rounds r ON r.id = m.round_id WHERE r.division_id = ?", (division_id,))
+        }
+
+        upserts = []
+        for round_name, round_actas in division_index.items():
+            for acta_name, acta in round_actas.items():
+                if acta is None:
+                    continue
+                key = (round_ids[round_name], acta_name)
+                values = (team_ids.get(acta.team_b), team_ids.get(acta.team_c),
+                          *(getattr(acta, field) for field in MATCH_FIELDS))
+                previous = existing.pop(key, None)
+                if previous is None or previous[1] != values:
+                    upserts.append((*key, *values))
+
+        columns = ("round_id", "acta", "home_team_id", "away_team_id") + MATCH_COLUMNS
+        self.conn.executemany(
+            f"INSERT INTO matches ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (round_id, acta) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in columns[2:]),
+            upserts)
+        self.conn.executemany("DELETE FROM matches WHERE id = ?", [(match_id,) for match_id, _ in existing.values()])
+
+        # Drop teams and rounds that left the fixtures
+        self.conn.executemany("DELETE FROM teams WHERE id = ?",
+                              [(team_id,) for name, team_id in team_ids.items() if name not in teams])
+        self.conn.executemany("DELETE FROM rounds WHERE id = ?",
+                              [(round_id,) for name, round_id in round_ids.items() if name not in division_index])
+        return len(upserts) + len(existing)
+
+    def standings(self, division="", sorting_criteria=None):
+        """Return the standings rows of one division ("" without divisions).
+
+        Rows are ordered by the aggregate fields of `sorting_criteria`.
+        """
+        order = [f"{c['field']} {'ASC' if c.get('order', 'desc') == 'asc' else 'DESC'}"
+                 for c in sorting_criteria or DEFAULT_SORTING_CRITERIA if c["field"] in STANDINGS_COLUMNS]
+        return [dict(row) for row in self.conn.execute(
+            f"SELECT * FROM standings WHERE division = ? ORDER BY {', '.join(order + ['team'])}", (division,))]
+
+    def team_history(self, team, division=None):
+        """Return the played matches of one team in round order."""
+        query = "SELECT * FROM team_history WHERE team = ?"
+        params = [team]
+        if division is not None:
+            query += " AND division = ?"
+            params.append(division)
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY division, round_number, round", params)]
+
+    def round_results(self, division, round_name):
+        """Return the matches of one round of a division."""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT * FROM round_results WHERE division = ? AND round = ? ORDER BY acta", (division, round_name))]
+
+def save_league_store(db_path, match_index, settings):
+    """Sync the parsed actas into the SQLite store at db_path."""
+    store = LeagueStore(db_path)
+    try:
+        changed = store.sync(match_index, settings)
+    finally:
+        store.close()
+    logging.info(f"League database saved to: {db_path} ({changed} matches changed)")
+    return changed
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import time
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Failed file names listed in a summary line before it is truncated
+SUMMARY_MAX_ERRORS = 5
+
+_listener = None
+
+def configure_logging(log_file, level=logging.INFO, queued=True, summary=False):
+    """Log to `log_file` and the console.
+
+    Called by the command line entry points at startup rather than at
+    import time, so importing a module never opens a log file. With
+    `queued`, records are put on an in-memory queue and a background
+    thread does the file and console writes, so per-file log calls in the
+    hot loops never wait on I/O. With `summary`, per-file messages are
+    folded into one line per division (see LogSummary).
+    """
+    global _listener
+    # A second call replaces the root handlers (force) and the previous background writer
+    stop_logging()
+    handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+    SUMMARY.enabled = summary
+    if not queued:
+        logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers, force=True)
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    # The queue handler only merges args into the message; the listener's handlers add LOG_FORMAT
+    logging.basicConfig(level=level, format='%(message)s', handlers=[QueueHandler(log_queue)], force=True)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Write out any queued records and stop the background log writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+class LogSummary:
+    """Per-file log messages, either logged as they happen or summarised.
+
+    Disabled (the default), every event is logged immediately. Enabled,
+    events are only counted per division folder together with the failed
+    file names and the time spent, and flush() logs one line per division.
+    Safe to use from worker threads.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._divisions = {}
+
+    def _division(self, division):
+        return self._divisions.setdefault(division, {"counts": {}, "errors": [], "seconds": 0.0})
+
+    def event(self, division, kind, message=None, level=logging.INFO):
+        """Record one per-file event of `kind` (e.g. "actas processed")."""
+        if not self.enabled:
+            if message is not None:
+                logging.log(level, message)
+            return
+        with self._lock:
+            counts = self._division(division)["counts"]
+            counts[kind] = counts.get(kind, 0) + 1
+
+    def error(self, division, file_name, message):
+        """Record a failed file; summarised errors keep their detail at DEBUG level."""
+        if not self.enabled:
+            logging.error(message)
+            return
+        with self._lock:
+            self._division(division)["errors"].append(file_name)
+        logging.debug(message)
+
+    def add_time(self, division, seconds):
+        """Add time spent on a division's files."""
+        if self.enabled:
+            with self._lock:
+                self._division(division)["seconds"] += seconds
+
+    @contextmanager
+    def timed(self, division):
+        """Time a block of work on a division."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(division, time.perf_counter() - start)
+
+    def flush(self, action):
+        """Log one line per division ("<action> <division>: ...") and reset the counters."""
+        with self._lock:
+            divisions, self._divisions = self._divisions, {}
+        for division, summary in divisions.items():
+            counts = ", ".join(f"{count} {kind}" for kind, count in summary["counts"].items()) or "no files"
+            errors = summary["errors"]
+            line = f"{action} {division}: {counts}, {len(errors)} errors"
+            if errors:
+                shown = ", ".join(errors[:SUMMARY_MAX_ERRORS])
+                line += f" ({shown}{', ...' if len(errors) > SUMMARY_MAX_ERRORS else ''})"
+            logging.info(f"{line} in {summary['seconds']:.2f}s")
+
+# Shared instance used by the per-file loops
+SUMMARY = LogSummary()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""Maximum-weight matching in general graphs (Edmonds' blossom algorithm).
+
+Pure Python port of the O(n^3) primal-dual method described by Galil,
+"Efficient algorithms for finding maximum matching in graphs" (1986),
+following Joris van Rantwijk's reference implementation.
+"""
+
+def max_weight_matching(edges, max_cardinality=False):
+    """Compute a maximum-weight matching of an undirected graph.
+
+    `edges` lists (i, j, weight) with vertices numbered from 0 and integer
+    weights. With `max_cardinality`, only maximum-cardinality matchings are
+    considered, and the heaviest of those is returned. Returns `mate`, where
+    mate[v] is the vertex matched to v, or -1 if v is single.
+    """
+    if not edges:
+        return []
+
+    num_edges = len(edges)
+    num_vertices = 1 + max(max(i, j) for i, j, _ in edges)
+    max_weight = max(0, max(weight for _, _, weight in edges))
+
+    # Edge k has endpoints 2k and 2k + 1; endpoint[p] is the vertex of endpoint p
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * num_edges)]
+    # neighbour_ends[v] lists the remote endpoints of the edges incident to v
+    neighbour_ends = [[] for _ in range(num_vertices)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbour_ends[i].append(2 * k + 1)
+        neighbour_ends[j].append(2 * k)
+
+    # mate[v] is the remote endpoint of v's matched edge, or -1
+    mate = [-1] * num_vertices
+    # Top-level blossom labels: 0 free, 1 S (outer), 2 T (inner); 5 marks a scanned S-blossom
+    label = [0] * (2 * num_vertices)
+    # Endpoint through which a labelled blossom got its label, or -1
+    label_end = [-1] * (2 * num_vertices)
+    # Top-level blossom containing each vertex
+    in_blossom = list(range(num_vertices))
+    # Blossoms are numbered from num_vertices; vertices are trivial blossoms
+    blossom_parent = [-1] * (2 * num_vertices)
+    blossom_children = [None] * (2 * num_vertices)
+    blossom_base = list(range(num_vertices)) + [-1] * num_vertices
+    # blossom_ends[b][i] joins blossom_children[b][i] and blossom_children[b][i + 1]
+    blossom_ends = [None] * (2 * num_vertices)
+    # Least-slack edge to a different S-blossom, per vertex or blossom
+    best_edge = [-1] * (2 * num_vertices)
+    # Per non-trivial top-level S-blossom, its least-slack edges to other S-blossoms
+    blossom_best_edges = [None] * (2 * num_vertices)
+    unused_blossoms = list(range(num_vertices, 2 * num_vertices))
+    # Vertex duals start at the max weight, blossom duals at 0
+    dual = [max_weight] * num_vertices + [0] * num_vertices
+    # Edges known to have zero slack
+    allowed = [False] * num_edges
+    queue = []
+
+    def slack(k):
+        i, j, weight = edges[k]
+        return dual[i] + dual[j] - 2 * weight
+
+    def leaves(b):
+        if b < num_vertices:
+            yield b
+        else:
+            for child in blossom_children[b]:
+                if child < num_vertices:
+                    yield child
+                else:
+                    yield from leaves(child)
+
+    def assign_label(w, t, p):
+        # Label w's blossom t (1 = S, 2 = T) through endpoint p; an S label queues its vertices
+        b = in_blossom[w]
+        label[w] = label[b] = t
+        label_end[w] = label_end[b] = p
+        best_edge[w] = best_edge[b] = -1
+        if t == 1:
+            queue.extend(leaves(b))
+        elif t == 2:
+            base = blossom_base[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        # Trace back from v and w to find a new blossom's base, or -1 for an augmenting path
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = in_blossom[v]
+            if label[b] & 4:
+                base = blossom_base[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if label_end[b] == -1:
+                v = -1
+            else:
+                v = endpoint[label_end[b]]
+                b = in_blossom[v]
+                v = endpoint[label_end[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        # Shrink the odd cycle closed by edge k, rooted at base, into a new S-blossom
+        v, w, _ = edges[k]
+        bb, bv, bw = in_blossom[base], in_blossom[v], in_blossom[w]
+        b = unused_blossoms.pop()
+        blossom_base[b] = base
+        blossom_parent[b] = -1
+        blossom_parent[bb] = b
+        blossom_children[b] = path = []
+        blossom_ends[b] = ends = []
+        while bv != bb:
+            blossom_parent[bv] = b
+            path.append(bv)
+            ends.append(label_end[bv])
+            v = endpoint[label_end[bv]]
+            bv = in_blossom[v]
+        path.append(bb)
+        path.reverse()
+        ends.reverse()
+        ends.append(2 * k)
+        while bw != bb:
+            blossom_parent[bw] = b
+            path.append(bw)
+            ends.append(label_end[bw] ^ 1)
+            w = endpoint[label_end[bw]]
+            bw = in_blossom[w]
+        label[b] = 1
+        label_end[b] = label_end[bb]
+        dual[b] = 0
+        for leaf in leaves(b):
+            if label[in_blossom[leaf]] == 2:
+                # Former T-vertices become S-vertices
+                queue.append(leaf)
+            in_blossom[leaf] = b
+
+        # Keep the least-slack edge from the new blossom to each other S-blossom
+        best_to = [-1] * (2 * num_vertices)
+        for child in path:
+            if blossom_best_edges[child] is None:
+                edge_lists = [[p // 2 for p in neighbour_ends[leaf]] for leaf in leaves(child)]
+            else:
+                edge_lists = [blossom_best_edges[child]]
+            for edge_list in edge_lists:
+                for e in edge_list:
+                    i, j, _ = edges[e]
+                    if in_blossom[j] == b:
+                        i, j = j, i
+                    bj = in_blossom[j]
+                    if bj != b and label[bj] == 1 and (best_to[bj] == -1 or slack(e) < slack(best_to[bj])):
+                        best_to[bj] = e
+            blossom_best_edges[child] = None
+            best_edge[child] = -1
+        blossom_best_edges[b] = [e for e in best_to if e != -1]
+        best_edge[b] = -1
+        for e in blossom_best_edges[b]:
+            if best_edge[b] == -1 or slack(e) < slack(best_edge[b]):
+                best_edge[b] = e
+
+    def expand_blossom(b, end_stage):
+        # Turn the children of blossom b back into top-level blossoms
+        for child in blossom_children[b]:
+            blossom_parent[child] = -1
+            if child < num_vertices:
+                in_blossom[child] = child
+            elif end_stage and dual[child] == 0:
+                expand_blossom(child, end_stage)
+            else:
+                for leaf in leaves(child):
+                    in_blossom[leaf] = child
+
+        if not end_stage and label[b] == 2:
+            # Relabel the children on the even path from the entry child to the base
+            entry_child = in_blossom[endpoint[label_end[b] ^ 1]]
+            j = blossom_children[b].index(entry_child)
+            if j & 1:
+                j -= len(blossom_children[b])
+                step, end_trick = 1, 0
+            else:
+                step, end_trick = -1, 1
+            p = label_end[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossom_ends[b][j - end_trick] ^ end_trick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowed[blossom_ends[b][j - end_trick] // 2] = True
+                j += step
+                p = blossom_ends[b][j - end_trick] ^ end_trick
+                allowed[p // 2] = True
+                j += step
+            bv = blossom_children[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            label_end[endpoint[p ^ 1]] = label_end[bv] = p
+            best_edge[bv] = -1
+            j += step
+            # Children off the path may be reachable from outside through a T-vertex
+            while blossom_children[b][j] != entry_child:
+                bv = blossom_children[b][j]
+                if label[bv] == 1:
+                    j += step
+                    continue
+                leaf = None
+                for leaf in leaves(bv):
+                    if label[leaf] != 0:
+                        break
+                if label[leaf] != 0:
+                    label[leaf] = 0
+                    label[endpoint[mate[blossom_base[bv]]]] = 0
+                    assign_label(leaf, 2, label_end[leaf])
+                j += step
+
+        label[b] = label_end[b] = -1
+        blossom_children[b] = blossom_ends[b] = None
+        blossom_base[b] = -1
+        blossom_best_edges[b] = None
+        best_edge[b] = -1
+        unused_blossoms.append(b)
+
+    def augment_blossom(b, v):
+        # Flip the matched edges on the even path from vertex v to the base of blossom b
+        t = v
+        while blossom_parent[t] != b:
+            t = blossom_parent[t]
+        if t >= num_vertices:
+            augment_blossom(t, v)
+        i = j = blossom_children[b].index(t)
+        if i & 1:
+            j -= len(blossom_children[b])
+            step, end_trick = 1, 0
+        else:
+            step, end_trick = -1, 1
+        while j != 0:
+            j += step
+            t = blossom_children[b][j]
+            p = blossom_ends[b][j - end_trick] ^ end_trick
+            if t >= num_vertices:
+                augment_blossom(t, endpoint[p])
+            j += step
+            t = blossom_children[b][j]
+            if t >= num_vertices:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        # v's child becomes the new base
+        blossom_children[b] = blossom_children[b][i:] + blossom_children[b][:i]
+        blossom_ends[b] = blossom_ends[b][i:] + blossom_ends[b][:i]
+        blossom_base[b] = blossom_base[blossom_children[b][0]]
+
+    def augment_matching(k):
+        # Flip the augmenting path through edge k, back to the two roots
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = in_blossom[s]
+                if bs >= num_vertices:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if label_end[bs] == -1:
+                    break
+                t = endpoint[label_end[bs]]
+                bt = in_blossom[t]
+                s = endpoint[label_end[bt]]
+                j = endpoint[label_end[bt] ^ 1]
+                if bt >= num_vertices:
+                    augment_blossom(bt, j)
+                mate[j] = label_end[bt]
+                p = label_end[bt] ^ 1
+
+    # Each stage grows alternating trees from the single vertices until one augmentation
+    for _ in range(num_vertices):
+        label[:] = [0] * (2 * num_vertices)
+        best_edge[:] = [-1] * (2 * num_vertices)
+        blossom_best_edges[num_vertices:] = [None] * num_vertices
+        allowed[:] = [False] * num_edges
+        queue[:] = []
+        for v in range(num_vertices):
+            if mate[v] == -1 and label[in_blossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbour_ends[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if in_blossom[v] == in_blossom[w]:
+                        continue
+                    if not allowed[k]:
+                        k_slack = slack(k)
+                        if k_slack <= 0:
+                            allowed[k] = True
+                    if allowed[k]:
+                        if label[in_blossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[in_blossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            # w is in a T-blossom but not yet reached itself
+                            label[w] = 2
+                            label_end[w] = p ^ 1
+                    elif label[in_blossom[w]] == 1:
+                        b = in_blossom[v]
+                        if best_edge[b] == -1 or k_slack < slack(best_edge[b]):
+                            best_edge[b] = k
+                    elif label[w] == 0:
+                        if best_edge[w] == -1 or k_slack < slack(best_edge[w]):
+                            best_edge[w] = k
+            if augmented:
+                break
+
+            # No tight edge left: find the largest dual change that keeps every slack >= 0
+            delta_type, delta, delta_edge, delta_blossom = -1, None, None, None
+            if not max_cardinality:
+                delta_type, delta = 1, min(dual[:num_vertices])
+            for v in range(num_vertices):
+                if label[in_blossom[v]] == 0 and best_edge[v] != -1:
+                    d = slack(best_edge[v])
+                    if delta_type == -1 or d < delta:
+                        delta_type, delta, delta_edge = 2, d, best_edge[v]
+            for b in range(2 * num_vertices):
+                if blossom_parent[b] == -1 and label[b] == 1 and best_edge[b] != -1:
+                    # Integer weights keep the slack between two S-blossoms even
+                    d = slack(best_edge[b]) // 2
+                    if delta_type == -1 or d < delta:
+                        delta_type, delta, delta_edge = 3, d, best_edge[b]
+            for b in range(num_vertices, 2 * num_vertices):
+                if (blossom_base[b] >= 0 and blossom_parent[b] == -1 and label[b] == 2
+                        and (delta_type == -1 or dual[b] < delta)):
+                    delta_type, delta, delta_blossom = 4, dual[b], b
+            if delta_type == -1:
+                # Only with max_cardinality: no further improvement is possible
+                delta_type, delta = 1, max(0, min(dual[:num_vertices]))
+
+            for v in range(num_vertices):
+                if label[in_blossom[v]] == 1:
+                    dual[v] -= delta
+                elif label[in_blossom[v]] == 2:
+                    dual[v] += delta
+            for b in range(num_vertices, 2 * num_vertices):
+                if blossom_base[b] >= 0 and blossom_parent[b] == -1:
+                    if label[b] == 1:
+                        dual[b] += delta
+                    elif label[b] == 2:
+                        dual[b] -= delta
+
+            if delta_type == 1:
+                break
+            if delta_type == 2:
+                allowed[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                if label[in_blossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif delta_type == 3:
+                allowed[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                queue.append(i)
+            else:
+                expand_blossom(delta_blossom, False)
+
+        if not augmented:
+            break
+
+        # Expand the S-blossoms whose dual reached zero
+        for b in range(num_vertices, 2 * num_vertices):
+            if blossom_parent[b] == -1 and blossom_base[b] >= 0 and label[b] == 1 and dual[b] == 0:
+                expand_blossom(b, True)
+
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
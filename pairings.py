@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import logging
+from matching import max_weight_matching
+
+BYE = "BYE"
+
+# Closest-ranked unplayed rivals linked to each team, tried in turn before allowing rematches
+PAIRING_WINDOWS = (8, 32)
+
+def round_robin(teams, double=False, balanced=False):
+    """Schedule a round-robin with the circle method: [[(home, away)] per round].
+
+    The first team stays fixed and the others rotate one position per
+    round; each round's slots are computed directly from the round number.
+    An odd number of teams gets a BYE, whose matches are left out. With
+    `balanced`, venues alternate so home games differ by at most one per
+    team; otherwise the upper half of the circle plays at home. A balanced
+    BYE takes the fixed slot, so with an odd number of teams everyone
+    alternates strictly. With `double`, a second half repeats the rounds
+    with venues swapped.
+    """
+    teams = list(teams)
+    if len(teams) % 2 == 1:
+        teams = [BYE] + teams if balanced else teams + [BYE]
+    n = len(teams)
+
+    schedule = []
+    for round_num in range(n - 1):
+        round_matches = []
+        for i in range(n // 2):
+            home = teams[0] if i == 0 else teams[(i - 1 - round_num) % (n - 1) + 1]
+            away = teams[(n - 2 - i - round_num) % (n - 1) + 1]
+            if balanced and (round_num % 2 == 1 if i == 0 else i % 2 == 1):
+                home, away = away, home
+            if home != BYE and away != BYE:
+                round_matches.append((home, away))
+        schedule.append(round_matches)
+
+    if double:
+        schedule += [[(away, home) for home, away in round_matches] for round_matches in schedule]
+    return schedule
+
+def _pair_ranked(teams, played, pair_cost, window=None):
+    """Pair teams (in rank order) with a minimum-cost perfect matching.
+
+    Each team is linked to the `window` closest-ranked teams it has not
+    played, or to every team when `window` is None, rematches included at
+    a cost above any pairing without them. `pair_cost(i, j)` prices the
+    pair of ranks i < j. Returns [(team, rival)], or None if the linked
+    pairs leave a team unpaired.
+    """
+    n = len(teams)
+    costs = {}
+    for i in range(n):
+        linked = 0
+        for distance in range(1, n):
+            for j in (i - distance, i + distance):
+                if 0 <= j < n and (window is None or frozenset((teams[i], teams[j])) not in played):
+                    costs[min(i, j), max(i, j)] = pair_cost(min(i, j), max(i, j))
+                    linked += 1
+            if window is not None and linked >= window:
+                break
+
+    rematch_cost = (n // 2 + 1) * max(costs.values(), default=0)
+    edges = [(i, j, -cost - (rematch_cost if frozenset((teams[i], teams[j])) in played else 0))
+             for (i, j), cost in costs.items()]
+    # Among the matchings pairing the most teams, the one with the lowest total cost
+    mate = max_weight_matching(edges, max_cardinality=True)
+    if len(mate) < n or -1 in mate:
+        return None
+    return [(teams[i], teams[j]) for i, j in enumerate(mate) if i < j]
+
+def swiss_round(ranked, played=(), home_balance=None, last_home=None, byes=(), scores=None):
+    """Pair one Swiss round: returns ([(home, away)], bye team or None).
+
+    `ranked` lists the teams best first, `played` holds frozenset pairs of
+    teams that already met, `home_balance` (home minus away games) and
+    `last_home` ({team: True/False}) describe venues so far and `byes` the
+    teams that already had one. With an odd number of teams, the lowest-ranked team
+    without a bye sits out. The round is the maximum-weight matching that,
+    in order of priority, avoids rematches, keeps rivals on close `scores`
+    ({team: points}), pairs rivals due different venues and keeps rank
+    distances small (summed squared). Only rivals close in rank are tried
+    first; if no pairing avoids every rematch, the fewest rematches are
+    made. The team with the lower home balance (then the one that was away
+    last) plays at home.
+    """
+    teams = list(ranked)
+    played = set(played)
+    home_balance = home_balance or {}
+    last_home = last_home or {}
+    bye = None
+    if len(teams) % 2 == 1:
+        bye = next((team for team in reversed(teams) if team not in byes), teams[-1])
+        teams.remove(bye)
+
+    def home_priority(name):
+        # Lower plays at home: fewer home than away games, then away last time
+        return (home_balance.get(name, 0), last_home.get(name, False))
+
+    # Scores are compared by score group, so fractional points weigh the same
+    points = scores or {}
+    groups = {score: g for g, score in enumerate(sorted({points.get(team, 0) for team in teams}, reverse=True))}
+    group = [groups[points.get(team, 0)] for team in teams]
+    priority = [home_priority(team) for team in teams]
+
+    # Integer costs, each term outweighing any sum of the terms after it
+    n = len(teams)
+    clash_unit = n ** 3
+    score_unit = clash_unit * (n + 1)
+
+    def pair_cost(i, j):
+        cost = (j - i) ** 2
+        if scores is not None:
+            cost += (group[i] - group[j]) ** 2 * score_unit + (priority[i] == priority[j]) * clash_unit
+        return cost
+
+    pairs = None
+    for window in PAIRING_WINDOWS:
+        pairs = _pair_ranked(teams, played, pair_cost, window)
+        if pairs is not None:
+            break
+    if pairs is None:
+        logging.warning("No Swiss pairing avoids every rematch; making as few as possible.")
+        pairs = _pair_ranked(teams, played, pair_cost, None)
+
+    # The better-ranked team breaks ties
+    return [(rival, team) if home_priority(rival) < home_priority(team) else (team, rival) for team, rival in pairs], bye
+
+def pairing_history(rounds, teams):
+    """Summarise scheduled rounds ([(home, away)] per round, in order) for swiss_round.
+
+    Returns (played, home_balance, last_home, byes); teams of `teams`
+    missing from a round are counted as having had a bye.
+    """
+    played, home_balance, last_home, byes = set(), {}, {}, set()
+    for matches in rounds:
+        scheduled = set()
+        for home, away in matches:
+            played.add(frozenset((home, away)))
+            home_balance[home] = home_balance.get(home, 0) + 1
+            home_balance[away] = home_balance.get(away, 0) - 1
+            last_home[home], last_home[away] = True, False
+            scheduled.update((home, away))
+        byes.update(team for team in teams if team not in scheduled)
+    return played, home_balance, last_home, byes
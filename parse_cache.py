@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from acta_reader import ActaRecord
+
+CACHE_VERSION = 1
+CACHE_FILE = "acta_cache.json"
+DEFAULT_MAX_ENTRIES = 10000
+
+def file_hash(file_path):
+    """Return the SHA-1 hex digest of a file's contents."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ParseCache:
+    """On-disk cache of parsed actas keyed by file path.
+
+    An entry is reused when the file's size and mtime are unchanged. If only
+    the mtime moved (e.g. the file was re-saved or copied), the content hash
+    decides. The cache is invalidated as a whole when the record layout or
+    cache version changes, and the least recently used entries are evicted
+    beyond `max_entries`.
+    """
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(cache_dir) / CACHE_FILE
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.now = time.time()
+        self.load()
+
+    def load(self):
+        """Load cache entries from disk, discarding incompatible caches."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION or data.get("fields") != list(ActaRecord._fields):
+            logging.info(f"Discarding outdated parse cache: {self.path}")
+            return
+        self.entries = data.get("entries", {})
+
+    def lookup(self, file_path, size=None, mtime_ns=None):
+        """Return the cached ActaRecord for a file, or None if it must be parsed.
+
+        The file is stat'ed unless its size and mtime_ns are given.
+        """
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if size is None or mtime_ns is None:
+            stat = os.stat(file_path)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        if size != entry["size"]:
+            del self.entries[key]
+            self.misses += 1
+            return None
+        if mtime_ns != entry["mtime_ns"]:
+            # Touched but possibly unchanged: let the content decide
+            if file_hash(file_path) != entry["hash"]:
+                del self.entries[key]
+                self.misses += 1
+                return None
+            entry["mtime_ns"] = mtime_ns
+
+        entry["used"] = self.now
+        self.hits += 1
+        # JSON turns the (event, player) tuples into lists
+        return ActaRecord(**{field: tuple(map(tuple, value)) if isinstance(value, list) else value
+                             for field, value in entry["record"].items()})
+
+    def store(self, file_path, record, size=None, mtime_ns=None):
+        """Store a freshly parsed ActaRecord for a file (stat'ed unless size and mtime_ns are given)."""
+        if size is None or mtime_ns is None:
+            stat = os.stat(file_path)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        self.entries[os.path.abspath(file_path)] = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "hash": file_hash(file_path),
+            "used": self.now,
+            "record": record._asdict()
+        }
+
+    def save(self):
+        """Evict least recently used entries and write the cache to disk."""
+        if len(self.entries) > self.max_entries:
+            keep = sorted(self.entries, key=lambda key: self.entries[key]["used"], reverse=True)[:self.max_entries]
+            self.entries = {key: self.entries[key] for key in keep}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "fields": list(ActaRecord._fields),
+                "entries": self.entries
+            }, f)
+        logging.info(f"Parse cache: {self.hits} hits, {self.misses} misses ({len(self.entries)} entries)")
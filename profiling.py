@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import cProfile
+import logging
+import threading
+from contextlib import contextmanager
+
+class Profiler:
+    """Per-stage wall/CPU timing and I/O counters for the CLIs.
+
+    Disabled by default so instrumented code pays almost nothing; enable it
+    with start(). CPU time includes finished child processes, so actas parsed
+    in a process pool are accounted for.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded stages and counters."""
+        self.stages = {}
+        self.counters = {"files_read": 0, "bytes_read": 0, "files_written": 0, "bytes_written": 0}
+        self.started = None
+        self.total = (0.0, 0.0)
+        self.profile = None
+        self.pstats_file = None
+        # Per-thread stack of open stages, each with the [wall, cpu] time of its nested stages
+        self._open = threading.local()
+
+    def start(self, pstats_file=None):
+        """Enable recording, optionally under cProfile dumping to pstats_file."""
+        self.reset()
+        self.enabled = True
+        self.started = (time.perf_counter(), self._cpu_time())
+        if pstats_file:
+            self.pstats_file = pstats_file
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self):
+        """Stop recording and write the pstats file if requested."""
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.pstats_file)
+            logging.info(f"cProfile stats saved to: {self.pstats_file}")
+        self.total = (time.perf_counter() - self.started[0], self._cpu_time() - self.started[1])
+        self.enabled = False
+
+    @staticmethod
+    def _cpu_time():
+        children = os.times()
+        return time.process_time() + children.children_user + children.children_system
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block and add it to the named stage.
+
+        Time spent in a stage opened inside the block counts only for that
+        inner stage, so the stage totals never add up to more than the run.
+        """
+        if not self.enabled:
+            yield
+            return
+        stack = self._open.__dict__.setdefault("stack", [])
+        nested = [0.0, 0.0]
+        stack.append(nested)
+        wall, cpu = time.perf_counter(), self._cpu_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, self._cpu_time() - cpu
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            record = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            record["wall_s"] += wall - nested[0]
+            record["cpu_s"] += cpu - nested[1]
+            record["calls"] += 1
+
+    def count_read(self, path, size=None):
+        """Count a file read (size is taken from disk when not given)."""
+        if self.enabled:
+            self.counters["files_read"] += 1
+            self.counters["bytes_read"] += os.path.getsize(path) if size is None else size
+
+    def count_write(self, path):
+        """Count a file that was just written."""
+        if self.enabled:
+            self.counters["files_written"] += 1
+            self.counters["bytes_written"] += os.path.getsize(path)
+
+    def metrics(self):
+        """Return the recorded stages, counters and totals as a dict."""
+        wall, cpu = self.total
+        return {"stages": self.stages, "counters": self.counters, "total": {"wall_s": wall, "cpu_s": cpu}}
+
+    def summary(self):
+        """Return a markdown summary table of the recorded stages."""
+        lines = ["| Stage | Calls | Wall (s) | CPU (s) |", "|-------|-------|----------|---------|"]
+        for name, record in self.stages.items():
+            lines.append(f"| {name} | {record['calls']} | {record['wall_s']:.4f} | {record['cpu_s']:.4f} |")
+        wall, cpu = self.total
+        lines.append(f"| total | - | {wall:.4f} | {cpu:.4f} |")
+        c = self.counters
+        lines.append("")
+        lines.append(f"Read {c['files_read']} files ({c['bytes_read']} bytes), "
+                     f"wrote {c['files_written']} files ({c['bytes_written']} bytes)")
+        return "\n".join(lines)
+
+    def save(self, metrics_file):
+        """Write the metrics as JSON."""
+        with open(metrics_file, 'w') as f:
+            json.dump(self.metrics(), f, indent=2)
+        logging.info(f"Metrics saved to: {metrics_file}")
+
+# Shared profiler used by update_classification and generate_league
+PROFILER = Profiler()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, List, Optional
+import numpy as np
+import pandas as pd
+from fixtures_manifest import FIXTURES_FILE, load_fixtures
+from profiling import PROFILER
+from update_classification import load_settings
+from standings import (DEFAULT_SORTING_CRITERIA, STAT_FIELDS, HEAD_TO_HEAD_FIELDS, aggregate_league,
+                       head_to_head_matrices)
+
+DEFAULT_SIMULATIONS = 100000
+PROJECTION_FILE = "projection.json"
+
+# Simulated seasons per batch; batches are the unit of work for the process pool
+CHUNK_SIZE = 10000
+
+# Upper bound on (season, match) cells per batch, so big divisions get smaller batches
+CHUNK_CELLS = 2000000
+
+# Touchdowns per team and match assumed before any match has been played
+DEFAULT_TD_RATE = 1.5
+
+# Matches of league-average play mixed into each team's scoring rates
+PRIOR_GAMES = 3
+
+BYE = "BYE"
+
+class DivisionModel(NamedTuple):
+    """Everything needed to simulate the rest of one division's season."""
+    teams: List[str]
+    base: np.ndarray            # (team, STAT_FIELDS) stats from the played matches
+    home: np.ndarray            # team index of the home side of each remaining match
+    away: np.ndarray
+    home_rate: np.ndarray       # expected touchdowns of each side
+    away_rate: np.ndarray
+    head_to_head: Optional[dict]  # {"points" | "td_diff": (team, team) results so far}
+
+def remaining_matches(division_fixtures, division_data):
+    """List the (round, home, away) fixtures that have no result yet.
+
+    A fixture counts as played when either team has a result against the
+    other in that round of the league data; byes are skipped.
+    """
+    remaining = []
+    for round_name, matches in division_fixtures.items():
+        round_data = division_data.get(round_name, {})
+        for home, away in matches:
+            if BYE in (home, away):
+                continue
+            if (round_data.get(home) or {}).get("rival") == away or (round_data.get(away) or {}).get("rival") == home:
+                continue
+            remaining.append((round_name, home, away))
+    return remaining
+
+def scoring_rates(base, home, away):
+    """Expected touchdowns of each side from the teams' scoring so far.
+
+    Each team's attack and defence are its touchdowns for and against per
+    match, shrunk towards the league average by PRIOR_GAMES matches; the
+    rate of a side is its attack times the rival's defence over the average.
+    """
+    games = base[:, STAT_FIELDS.index("wins")] + base[:, STAT_FIELDS.index("draws")] + base[:, STAT_FIELDS.index("losses")]
+    scored = base[:, STAT_FIELDS.index("touchdowns")]
+    conceded = base[:, STAT_FIELDS.index("td_against")]
+    average = scored.sum() / games.sum() if games.sum() else DEFAULT_TD_RATE
+    if average == 0:
+        return np.zeros(len(home)), np.zeros(len(away))
+    attack = (scored + PRIOR_GAMES * average) / (games + PRIOR_GAMES)
+    defence = (conceded + PRIOR_GAMES * average) / (games + PRIOR_GAMES)
+    return attack[home] * defence[away] / average, attack[away] * defence[home] / average
+
+def build_models(fixtures, divisions, settings):
+    """Build a DivisionModel per division of {division: {round: [(home, away)]}}.
+
+    `divisions` holds the played results ({division: {round: {team: data}}});
+    teams are listed in fixtures order, then any others with results.
+    """
+    divisions = {name: divisions.get(name, {}) for name in fixtures}
+    seeds = {name: list(dict.fromkeys(team for matches in rounds.values() for match in matches
+                                      for team in match if team != BYE))
+             for name, rounds in fixtures.items()}
+    standings = aggregate_league(divisions, seeds)
+    sorting_criteria = settings.get("sorting_criteria", DEFAULT_SORTING_CRITERIA)
+    matrices = None
+    if any(c["field"] in HEAD_TO_HEAD_FIELDS for c in sorting_criteria):
+        matrices = head_to_head_matrices(divisions, standings)
+
+    models = {}
+    for name, teams_stats in standings.items():
+        teams = list(teams_stats)
+        position = {team: i for i, team in enumerate(teams)}
+        base = np.array([[stats[field] for field in STAT_FIELDS] for stats in teams_stats.values()],
+                        dtype=np.float64).reshape(len(teams), len(STAT_FIELDS))
+        remaining = remaining_matches(fixtures[name], divisions[name])
+        home = np.array([position[home] for _, home, _ in remaining], dtype=np.int64)
+        away = np.array([position[away] for _, _, away in remaining], dtype=np.int64)
+        home_rate, away_rate = scoring_rates(base, home, away)
+        models[name] = DivisionModel(teams, base, home, away, home_rate, away_rate,
+                                     matrices[name] if matrices is not None else None)
+    return models
+
+def simulate_chunk(model, settings, size, seed):
+    """Play the remaining matches `size` times and count final positions.
+
+    Touchdowns are drawn from Poisson distributions over a (simulation,
+    match) array and every per-team stat is accumulated with one bincount
+    over the match sides; each simulated table is then ranked with one
+    lexsort along the team axis. Head-to-head criteria are evaluated among
+    the teams tied on the previous criteria, as in rank_standings, by
+    adding up only the results between teams of the same tie group, so the
+    cost grows with the matches rather than with teams squared. Teams tied
+    on every criterion are ordered at random. Returns (counts, points)
+    where counts[team, position] is the number of finishes and points the
+    sum of final points per team.
+    """
+    rng = np.random.default_rng(seed)
+    num_teams, num_matches = len(model.teams), len(model.home)
+    league_points = settings["league_points"]
+    sorting_criteria = settings.get("sorting_criteria", DEFAULT_SORTING_CRITERIA)
+
+    td_home = rng.poisson(model.home_rate, size=(size, num_matches)).astype(np.float64)
+    td_away = rng.poisson(model.away_rate, size=(size, num_matches)).astype(np.float64)
+    won, lost = td_home > td_away, td_home < td_away
+
+    # Per-team totals are bincounts over flat (simulation, team) indices
+    offsets = np.arange(size)[:, None] * num_teams
+    home_index, away_index = (offsets + model.home).ravel(), (offsets + model.away).ravel()
+
+    def accumulate(index, values):
+        return np.bincount(index, np.ravel(values), size * num_teams).reshape(size, num_teams)
+
+    def per_team(home_values, away_values):
+        return accumulate(home_index, home_values) + accumulate(away_index, away_values)
+
+    # Draws and points follow from wins and losses, since every team's remaining matches are known
+    matches_left = np.bincount(np.concatenate([model.home, model.away]), minlength=num_teams)
+    wins, losses = per_team(won, lost), per_team(lost, won)
+    draws = matches_left - wins - losses
+    stats = dict(zip(STAT_FIELDS, model.base.T))
+    stats = {
+        "points": stats["points"] + wins * league_points["win"] + draws * league_points["draw"]
+                  + losses * league_points["lose"],
+        "wins": stats["wins"] + wins,
+        "draws": stats["draws"] + draws,
+        "losses": stats["losses"] + losses,
+        "touchdowns": stats["touchdowns"] + per_team(td_home, td_away),
+        "td_against": stats["td_against"] + per_team(td_away, td_home),
+    }
+    stats["td_diff"] = stats["touchdowns"] - stats["td_against"]
+
+    def match_results(field):
+        # Each simulated match's result for the home and the away side
+        if field == "points":
+            points = [league_points["win"], league_points["lose"]]
+            return (np.select([won, lost], points, league_points["draw"]),
+                    np.select([lost, won], points, league_points["draw"]))
+        return td_home - td_away, td_away - td_home
+
+    def head_to_head(field, keys):
+        # Sum each team's results against the teams tied with it on every previous key,
+        # from the simulated matches and the (team, rival) results so far
+        group = tie_groups(keys, size, num_teams)
+        home_values, away_values = match_results(field)
+        same = group[:, model.home] == group[:, model.away]
+        team, rival = np.nonzero(model.head_to_head[field])
+        played = model.head_to_head[field][team, rival] * (group[:, team] == group[:, rival])
+        return per_team(home_values * same, away_values * same) + accumulate((offsets + team).ravel(), played)
+
+    keys = []
+    for criterion in sorting_criteria:
+        field = criterion["field"]
+        if field in HEAD_TO_HEAD_FIELDS:
+            if model.head_to_head is None:
+                values = np.zeros((size, num_teams))
+            else:
+                values = head_to_head(HEAD_TO_HEAD_FIELDS[field], keys)
+        else:
+            values = stats.get(field, np.zeros((size, num_teams)))
+        keys.append(-values if criterion.get("order", "desc") == "desc" else values)
+    keys.append(rng.random((size, num_teams)))
+
+    # np.lexsort sorts by the last key first; order[s, p] is the team finishing p-th in simulation s
+    order = np.lexsort(keys[::-1], axis=-1)
+    counts = np.bincount((order * num_teams + np.arange(num_teams)).ravel(), minlength=num_teams * num_teams)
+    return counts.reshape(num_teams, num_teams), stats["points"].sum(axis=0)
+
+def tie_groups(keys, size, num_teams):
+    """Label teams equal on every key with the same group id, per simulation: (size, team)."""
+    if not keys:
+        return np.zeros((size, num_teams), dtype=np.int64)
+    order = np.lexsort(keys[::-1], axis=-1)
+    ranked = [np.take_along_axis(key, order, axis=-1) for key in keys]
+    new_group = np.zeros((size, num_teams), dtype=bool)
+    for key in ranked:
+        new_group[:, 1:] |= key[:, 1:] != key[:, :-1]
+    group = np.empty((size, num_teams), dtype=np.int64)
+    np.put_along_axis(group, order, np.cumsum(new_group, axis=-1), axis=-1)
+    return group
+
+def chunk_sizes(simulations, num_matches):
+    """Split `simulations` into batches of at most CHUNK_SIZE and CHUNK_CELLS (season, match) cells."""
+    chunk = max(1, min(CHUNK_SIZE, CHUNK_CELLS // max(num_matches, 1)))
+    sizes = [chunk] * (simulations // chunk)
+    if simulations % chunk:
+        sizes.append(simulations % chunk)
+    return sizes
+
+def _simulate_task(task):
+    """Process pool entry point for one (division, chunk) batch."""
+    name, model, settings, size, seed = task
+    return name, simulate_chunk(model, settings, size, seed)
+
+def project_league(fixtures, divisions, settings, simulations=DEFAULT_SIMULATIONS, seed=None, jobs=1):
+    """Simulate the rest of the season and return finishing probabilities.
+
+    `fixtures` is {division: {round: [(home, away)]}} (see load_fixtures)
+    and `divisions` the played results. Simulations run in batches (see
+    chunk_sizes), each with its own child of the `seed` SeedSequence, so the
+    result for a given seed is the same for any number of `jobs`. Returns
+    {division: DataFrame} indexed by team with the expected points and one
+    column per final position holding its probability, sorted by expected
+    position.
+    """
+    with PROFILER.stage("aggregation"):
+        models = build_models(fixtures, divisions, settings)
+
+    division_seeds = np.random.SeedSequence(seed).spawn(len(models))
+    tasks = []
+    for (name, model), division_seed in zip(models.items(), division_seeds):
+        sizes = chunk_sizes(simulations, len(model.home))
+        tasks += [(name, model, settings, size, chunk_seed)
+                  for size, chunk_seed in zip(sizes, division_seed.spawn(len(sizes)))]
+
+    totals = {name: (np.zeros((len(model.teams),) * 2, dtype=np.int64), np.zeros(len(model.teams)))
+              for name, model in models.items()}
+    jobs = min(jobs or 1, len(tasks))
+    with PROFILER.stage("simulation"):
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_simulate_task, tasks))
+        else:
+            results = [_simulate_task(task) for task in tasks]
+    for name, (counts, points) in results:
+        totals[name][0][...] += counts
+        totals[name][1][...] += points
+
+    projections = {}
+    for name, model in models.items():
+        counts, points = totals[name]
+        positions = np.arange(1, len(model.teams) + 1)
+        frame = pd.DataFrame(counts / max(simulations, 1), index=pd.Index(model.teams, name="team"), columns=positions)
+        frame.insert(0, "expected_points", points / max(simulations, 1))
+        expected_position = frame[positions].to_numpy() @ positions
+        projections[name] = frame.iloc[np.argsort(expected_position, kind="stable")]
+        logging.info(f"Projected {name or 'league'}: {len(model.home)} matches left, {simulations} simulations")
+    return projections
+
+def render_projection(projections, has_divisions, simulations):
+    """Render projection.md with one probability table per division."""
+    lines = ["# Season Projection", "",
+             f"Probability of finishing in each position over {simulations} simulated seasons.", ""]
+    for name, frame in projections.items():
+        if has_divisions:
+            lines += [f"## {name}", ""]
+        positions = [column for column in frame.columns if column != "expected_points"]
+        lines.append(f"| Team | Exp. Pts | {' | '.join(str(p) for p in positions)} |")
+        lines.append(f"|------|----------|{'|'.join('-' * (len(str(p)) + 2) for p in positions)}|")
+        for team, row in frame.iterrows():
+            cells = " | ".join(f"{row[p]:.1%}" for p in positions)
+            lines.append(f"| {team} | {row['expected_points']:.1f} | {cells} |")
+        lines.append("")
+    return "\n".join(lines)
+
+def write_projection(projections, output_folder, has_divisions, simulations, seed=None):
+    """Write projection.md and projection.json to the Classification folder."""
+    markdown_file = output_folder / "projection.md"
+    json_file = output_folder / PROJECTION_FILE
+    with PROFILER.stage("markdown render"):
+        markdown = render_projection(projections, has_divisions, simulations)
+    with PROFILER.stage("file writes"):
+        with open(markdown_file, 'w') as f:
+            f.write(markdown)
+        with open(json_file, 'w') as f:
+            json.dump({
+                "simulations": simulations,
+                "seed": seed,
+                "has_divisions": has_divisions,
+                "divisions": {
+                    name: [{"team": team, "expected_points": round(float(row["expected_points"]), 3),
+                            "positions": [round(float(p), 5) for p in row.iloc[1:]]}
+                           for team, row in frame.iterrows()]
+                    for name, frame in projections.items()
+                }
+            }, f, indent=2, ensure_ascii=False)
+        PROFILER.count_write(markdown_file)
+        PROFILER.count_write(json_file)
+    logging.info(f"Season projection saved to: {markdown_file}")
+
+def project_season(folder_path, simulations=DEFAULT_SIMULATIONS, seed=None, jobs=1, settings=None):
+    """Project the league in `folder_path` from fixtures.json and league_data.json.
+
+    Run update_classification.py first so league_data.json is current.
+    Returns the projections, or None if an input file is missing.
+    """
+    folder = Path(folder_path)
+    fixtures_folder = folder / "Fixtures" if (folder / "Fixtures").exists() else folder
+    output_folder = folder / "Classification"
+    try:
+        has_divisions, fixtures = load_fixtures(fixtures_folder / FIXTURES_FILE)
+    except FileNotFoundError:
+        logging.error(f"No {FIXTURES_FILE} in '{fixtures_folder}'; generate the league first.")
+        return None
+    try:
+        with open(output_folder / "league_data.json", 'r') as f:
+            league_data = json.load(f)
+    except FileNotFoundError:
+        logging.error(f"No league_data.json in '{output_folder}'; run the classification first.")
+        return None
+
+    if settings is None:
+        settings = load_settings()
+    divisions = league_data if has_divisions else {"": league_data}
+    projections = project_league(fixtures, divisions, settings, simulations, seed, jobs)
+    write_projection(projections, output_folder, has_divisions, simulations, seed)
+    return projections
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+import json
+import logging
+import numpy as np
+from profiling import PROFILER
+from standings import round_key
+
+RATINGS_FILE = "ratings.json"
+DEFAULT_RATINGS_CONFIG = {"initial": 1500, "k_factor": 20, "margin_weight": 1.0}
+
+def load_ratings_config(config_file="ratings_cfg.json"):
+    """Load the Elo parameters, falling back to the defaults."""
+    try:
+        with open(config_file, 'r') as f:
+            config = json.load(f)["ratings"]
+    except (FileNotFoundError, KeyError, ValueError):
+        return dict(DEFAULT_RATINGS_CONFIG)
+    return {key: config.get(key, default) for key, default in DEFAULT_RATINGS_CONFIG.items()}
+
+def match_list(divisions):
+    """List played matches as (division, round, team, rival, td_for, td_against).
+
+    One entry per match, from {division: {round: {team: data}}}, in round
+    order; within a round, divisions and actas keep their input order.
+    """
+    matches = []
+    for division_name, division_data in divisions.items():
+        for round_name, round_data in division_data.items():
+            seen = set()
+            for team, data in round_data.items():
+                rival = data.get("rival")
+                if team in seen or rival not in round_data or round_data[rival].get("rival") != team:
+                    continue
+                seen.update((team, rival))
+                matches.append((division_name, round_name, team, rival, data["touchdowns"],
+                                round_data[rival]["touchdowns"]))
+    matches.sort(key=lambda match: round_key(match[1]))
+    return matches
+
+def _team_keys(matches, seeds):
+    """(division, team) of every seeded or rated team: seeds first, then by first match."""
+    teams = [(name, team) for name, division_teams in seeds.items() for team in division_teams]
+    teams += [(m[0], team) for m in matches for team in (m[2], m[3])]
+    return list(dict.fromkeys(teams))
+
+def _unrated(config):
+    """Record of a team that has not played yet."""
+    return {"rating": float(config["initial"]), "games": 0, "change": 0.0, "last_round": None}
+
+def rating_change(rating, rival_rating, td_for, td_against, config):
+    """Elo points won by a team (and lost by its rival); works on scalars and arrays.
+
+    The usual K * (score - expected score) is scaled by
+    1 + margin_weight * ln(1 + TD margin), so wider wins move ratings more.
+    """
+    expected = 1 / (1 + 10 ** ((rival_rating - rating) / 400))
+    score = np.sign(td_for - td_against) / 2 + 0.5
+    multiplier = 1 + config["margin_weight"] * np.log1p(np.abs(td_for - td_against))
+    return config["k_factor"] * multiplier * (score - expected)
+
+def compute_ratings(matches, seeds, config):
+    """Rate every team from scratch; returns {division: {team: record}}.
+
+    Elo is sequential, but a team's rating only depends on its own earlier
+    matches. Each match is therefore scheduled in the first batch after
+    both teams' previous matches, and every batch (usually one round over
+    all divisions) is applied with one vectorized update. The result is
+    identical to applying the matches one by one in order.
+    """
+    teams = _team_keys(matches, seeds)
+    index = {key: i for i, key in enumerate(teams)}
+    home = np.array([index[(m[0], m[2])] for m in matches], dtype=np.int64)
+    away = np.array([index[(m[0], m[3])] for m in matches], dtype=np.int64)
+    td_home = np.array([m[4] for m in matches], dtype=np.float64)
+    td_away = np.array([m[5] for m in matches], dtype=np.float64)
+
+    batch = np.zeros(len(matches), dtype=np.int64)
+    last_batch = {}
+    last_round = {}
+    for k, (a, b) in enumerate(zip(home.tolist(), away.tolist())):
+        batch[k] = max(last_batch.get(a, -1), last_batch.get(b, -1)) + 1
+        last_batch[a] = last_batch[b] = batch[k]
+        last_round[a] = last_round[b] = matches[k][1]
+
+    ratings = np.full(len(teams), float(config["initial"]))
+    change = np.zeros(len(teams))
+    order = np.argsort(batch, kind="stable")
+    for rows in np.split(order, np.flatnonzero(np.diff(batch[order])) + 1):
+        delta = rating_change(ratings[home[rows]], ratings[away[rows]], td_home[rows], td_away[rows], config)
+        ratings[home[rows]] += delta
+        ratings[away[rows]] -= delta
+        change[home[rows]] = delta
+        change[away[rows]] = -delta
+    games = np.bincount(np.concatenate([home, away]), minlength=len(teams))
+
+    records = {name: {} for name in seeds}
+    for i, (name, team) in enumerate(teams):
+        records.setdefault(name, {})[team] = {"rating": float(ratings[i]), "games": int(games[i]),
+                                              "change": float(change[i]), "last_round": last_round.get(i)}
+    return records
+
+def apply_match(records, match, config):
+    """Apply one new match to the ratings in place, in O(1).
+
+    Returns False, leaving the records untouched, if either team already
+    has a result in the same or a later round; the match would then change
+    ratings that later matches were computed from.
+    """
+    division_name, round_name, team, rival, td_for, td_against = match
+    division = records.setdefault(division_name, {})
+    sides = [division.get(name) or _unrated(config) for name in (team, rival)]
+    if any(side["last_round"] is not None and round_key(side["last_round"]) >= round_key(round_name) for side in sides):
+        return False
+    delta = float(rating_change(sides[0]["rating"], sides[1]["rating"], td_for, td_against, config))
+    for name, side, sign in ((team, sides[0], 1), (rival, sides[1], -1)):
+        side.update(rating=side["rating"] + sign * delta, games=side["games"] + 1, change=sign * delta,
+                    last_round=round_name)
+        division[name] = side
+    return True
+
+def _load_ratings_state(output_folder, config, has_divisions):
+    """Load the previous run's ratings state if still compatible, else None."""
+    try:
+        with open(output_folder / RATINGS_FILE, 'r') as f:
+            snapshot = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if snapshot.get("config") != config or snapshot.get("has_divisions") != has_divisions:
+        return None
+    return snapshot.get("state")
+
+def update_ratings(output_folder, divisions, seeds, has_divisions, config=None):
+    """Bring the ratings up to date with the parsed matches.
+
+    New matches are applied one by one to the ratings stored by the
+    previous run. A changed or removed result, a match older than a team's
+    latest rated match, or a config change triggers a full recompute.
+    Returns the state {"records": {division: {team: record}}, "matches": [...]}.
+    """
+    config = config or load_ratings_config()
+    matches = [list(match) for match in match_list(divisions)]
+    state = _load_ratings_state(output_folder, config, has_divisions)
+    if state is not None:
+        known = {tuple(match) for match in state["matches"]}
+        new_matches = [match for match in matches if tuple(match) not in known]
+        records = state["records"]
+        if len(matches) - len(new_matches) == len(known) and all(apply_match(records, m, config) for m in new_matches):
+            # Same team order as a full recompute; teams gone from the fixtures are dropped
+            previous, records = records, {name: {} for name in seeds}
+            for name, team in _team_keys(matches, seeds):
+                records.setdefault(name, {})[team] = previous.get(name, {}).get(team) or _unrated(config)
+            logging.info(f"Incremental ratings: {len(new_matches)} new matches")
+            return {"records": records, "matches": matches}
+        logging.info("Results changed before the latest rated round; recomputing ratings.")
+    return {"records": compute_ratings(matches, seeds, config), "matches": matches}
+
+def ranked_ratings(records):
+    """Sort each division's teams by rating: {division: [(team, record)]}."""
+    return {name: sorted(teams.items(), key=lambda item: -item[1]["rating"]) for name, teams in records.items()}
+
+def render_ratings(ranked, has_divisions):
+    """Render ratings.md with one table per division."""
+    lines = ["# Power Ratings", ""]
+    for name, teams in ranked.items():
+        if has_divisions:
+            lines += [f"## {name}", ""]
+        lines += ["| Pos | Team | Rating | Played | Last |", "|-----|------|--------|--------|------|"]
+        for pos, (team, record) in enumerate(teams, 1):
+            last = f"{record['change']:+.1f}" if record["games"] else "-"
+            lines.append(f"| {pos} | {team} | {record['rating']:.1f} | {record['games']} | {last} |")
+        lines.append("")
+    return "\n".join(lines)
+
+def write_ratings(state, output_folder, has_divisions, config=None):
+    """Write ratings.md and ratings.json (tables plus the state for incremental runs)."""
+    config = config or load_ratings_config()
+    ranked = ranked_ratings(state["records"])
+    with PROFILER.stage("markdown render"):
+        markdown = render_ratings(ranked, has_divisions)
+
+    markdown_file = output_folder / "ratings.md"
+    json_file = output_folder / RATINGS_FILE
+    with PROFILER.stage("file writes"):
+        with open(markdown_file, 'w') as f:
+            f.write(markdown)
+        with open(json_file, 'w') as f:
+            json.dump({
+                "config": config,
+                "has_divisions": has_divisions,
+                "divisions": {
+                    name: [{"position": pos, "team": team, "rating": round(record["rating"], 1),
+                            "games": record["games"], "change": round(record["change"], 1)}
+                           for pos, (team, record) in enumerate(teams, 1)]
+                    for name, teams in ranked.items()
+                },
+                "state": state
+            }, f, indent=2, ensure_ascii=False)
+        PROFILER.count_write(markdown_file)
+        PROFILER.count_write(json_file)
+
+    logging.info(f"Power ratings saved to: {markdown_file}")
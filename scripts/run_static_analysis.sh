@@ -1,6 +1,6 @@
 #!/bin/bash
 source venv/bin/activate
 echo "Running Pylint..."
-pylint update_classification.py generate_league.py --rcfile=.pylintrc
+pylint update_classification.py generate_league.py acta_reader.py parse_cache.py acta_writer.py profiling.py standings.py star_players.py league_store.py league_lines.py fixtures_manifest.py kwbb.py log_setup.py projection.py ratings.py pairings.py matching.py --rcfile=.pylintrc
 echo "Running Flake8..."
-flake8 update_classification.py generate_league.py --max-line-length=120 --ignore=E501,W503,E203,W293,W292,E302,E305,F401,F841
\ No newline at end of file
+flake8 update_classification.py generate_league.py acta_reader.py parse_cache.py acta_writer.py profiling.py standings.py star_players.py league_store.py league_lines.py fixtures_manifest.py kwbb.py log_setup.py projection.py ratings.py pairings.py matching.py --max-line-length=120 --ignore=E501,W503,E203,W293,W292,E302,E305,F401,F841
\ No newline at end of file
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+import re
+import json
+import logging
+import numpy as np
+import pandas as pd
+from profiling import PROFILER
+
+DEFAULT_SORTING_CRITERIA = [
+    {"field": "points", "order": "desc"},
+    {"field": "touchdowns", "order": "desc"},
+    {"field": "wins", "order": "desc"}
+]
+
+STAT_FIELDS = ("points", "wins", "draws", "losses", "touchdowns", "td_against", "td_diff")
+
+# Result codes used in the matches frame
+RESULT_CODES = {"win": 1, "draw": 0, "lose": -1}
+
+# Sorting fields evaluated among tied teams, and the results matrix they read
+HEAD_TO_HEAD_FIELDS = {"head_to_head": "points", "td_diff_head_to_head": "td_diff"}
+
+def empty_stats():
+    """Return a zeroed per-team stats record."""
+    return {field: 0 for field in STAT_FIELDS}
+
+def _td_against(date_data, data):
+    """Touchdowns scored by the rival in the same match (0 if unknown)."""
+    rival = date_data.get(data.get("rival"))
+    return rival["touchdowns"] if rival else 0
+
+def apply_result(stats, data, td_against=0, sign=1):
+    """Add (sign=1) or remove (sign=-1) one match result from a team's stats."""
+    stats["points"] += sign * data["points"]
+    stats["touchdowns"] += sign * data["touchdowns"]
+    stats["td_against"] += sign * td_against
+    stats["td_diff"] += sign * (data["touchdowns"] - td_against)
+
+    if data["result"] == "win":
+        stats["wins"] += sign
+    elif data["result"] == "draw":
+        stats["draws"] += sign
+    else:
+        stats["losses"] += sign
+
+def matches_frame(divisions):
+    """Flatten {division: {round: {team: data}}} into one row per team and match.
+
+    Columns: division, round, team, rival, td_for, td_against, result
+    (1 win, 0 draw, -1 loss) and points.
+    """
+    rows = [
+        (division, round_name, team, data["touchdowns"], data.get("rival"), RESULT_CODES[data["result"]], data["points"])
+        for division, division_data in divisions.items()
+        for round_name, round_data in division_data.items()
+        for team, data in round_data.items()
+    ]
+    frame = pd.DataFrame(rows, columns=["division", "round", "team", "td_for", "rival", "result", "points"])
+    # Points stay fractional when the configured league points are
+    points_dtype = "float64" if any(isinstance(row[-1], float) for row in rows) else "int64"
+    frame = frame.astype({"td_for": "int64", "result": "int64", "points": points_dtype})
+
+    # Look up the rival's touchdowns in the same round with one join
+    rivals = frame[["division", "round", "team", "td_for"]].rename(columns={"team": "rival", "td_for": "td_against"})
+    frame = frame.merge(rivals, on=["division", "round", "rival"], how="left", sort=False)
+    frame["td_against"] = frame["td_against"].fillna(0).astype("int64")
+    return frame
+
+def stat_columns(frame):
+    """Add one column per STAT_FIELDS entry holding each match's contribution."""
+    result = frame["result"].to_numpy()
+    return frame.assign(wins=result == 1, draws=result == 0, losses=result == -1, touchdowns=frame["td_for"],
+                        td_diff=frame["td_for"] - frame["td_against"])
+
+def aggregate_frame(frame):
+    """Reduce a matches frame to per-(division, team) stats with grouped sums."""
+    totals = stat_columns(frame).groupby(["division", "team"], sort=False)[list(STAT_FIELDS)].sum()
+    return totals.astype({field: "int64" for field in STAT_FIELDS if field != "points"})
+
+def stats_record(values, to_points=int):
+    """Turn a row of STAT_FIELDS totals into a stats dict of plain numbers.
+
+    Points are converted with `to_points` (float for fractional league
+    points), every other stat is an int.
+    """
+    return {field: to_points(value) if field == "points" else int(value) for field, value in zip(STAT_FIELDS, values)}
+
+def points_converter(frame):
+    """Python type of the points column of a matches frame."""
+    return float if frame["points"].dtype.kind == "f" else int
+
+def aggregate_league(divisions, seeds):
+    """Aggregate every division in one pass.
+
+    `divisions` maps division name ("" in legacy mode) to {date: {team: data}}
+    and `seeds` maps it to the teams to list even without results. Returns
+    {division: {team: stats}} with seeded teams first, then the others in
+    order of appearance.
+    """
+    frame = matches_frame(divisions)
+    totals = aggregate_frame(frame)
+    to_points = points_converter(frame)
+
+    played = {name: group.droplevel("division") for name, group in totals.groupby(level="division", sort=False)}
+
+    standings = {}
+    for name in divisions:
+        division_totals = played.get(name, totals.iloc[:0].droplevel("division"))
+        teams = list(dict.fromkeys(list(seeds.get(name) or []) + division_totals.index.tolist()))
+        division_totals = division_totals.reindex(teams, fill_value=0)
+        standings[name] = {team: stats_record(values, to_points)
+                           for team, values in zip(teams, division_totals.to_numpy())}
+    return standings
+
+def aggregate_stats(division_data, teams=None):
+    """Aggregate per-team stats for one division from {date: {team: data}}.
+
+    Teams in `teams` are listed first, with zero stats if they have not played.
+    """
+    return aggregate_league({"": division_data}, {"": teams})[""]
+
+def _empty_head_to_head(size, points_dtype):
+    """Zeroed results matrices for a division of `size` teams."""
+    return {"points": np.zeros((size, size), dtype=points_dtype), "td_diff": np.zeros((size, size), dtype=np.int64)}
+
+def _add_head_to_head(matrices, rows, teams):
+    """Scatter the results of matches-frame `rows` into a division's matrices."""
+    i, j = teams.get_indexer(rows["team"]), teams.get_indexer(rows["rival"])
+    valid = (i >= 0) & (j >= 0)
+    np.add.at(matrices["points"], (i[valid], j[valid]), rows["points"].to_numpy()[valid])
+    np.add.at(matrices["td_diff"], (i[valid], j[valid]), (rows["td_for"] - rows["td_against"]).to_numpy()[valid])
+
+def head_to_head_matrices(divisions, standings):
+    """Build a team x team results matrix per division from the parsed matches.
+
+    Returns {division: {"points": P, "td_diff": D}} where P[i, j] holds the
+    league points team i earned against team j and D[i, j] its touchdown
+    difference against j, with teams indexed in `standings` order.
+    """
+    frame = matches_frame(divisions)
+    matrices = {name: _empty_head_to_head(len(teams_stats), frame["points"].dtype)
+                for name, teams_stats in standings.items()}
+    for name, rows in frame.groupby("division", sort=False):
+        if name in matrices:
+            _add_head_to_head(matrices[name], rows, pd.Index(list(standings[name])))
+    return matrices
+
+def apply_standings_delta(teams_stats, old_division_data, new_division_data):
+    """Update aggregated stats in place with the results that changed.
+
+    Results present only in the old data are subtracted, results present
+    only in the new data are added, and changed results are replaced.
+    Returns the number of (date, team) results that changed.
+    """
+    changed = 0
+    for date in old_division_data.keys() | new_division_data.keys():
+        old_date = old_division_data.get(date, {})
+        new_date = new_division_data.get(date, {})
+        if old_date == new_date:
+            continue
+
+        for team in old_date.keys() | new_date.keys():
+            old, new = old_date.get(team), new_date.get(team)
+            old_against = _td_against(old_date, old) if old is not None else None
+            new_against = _td_against(new_date, new) if new is not None else None
+            if old == new and old_against == new_against:
+                continue
+            changed += 1
+            if old is not None:
+                apply_result(teams_stats.setdefault(team, empty_stats()), old, old_against, -1)
+            if new is not None:
+                apply_result(teams_stats.setdefault(team, empty_stats()), new, new_against)
+
+    return changed
+
+def _tie_groups(keys):
+    """Label rows that are equal on every key with the same group id."""
+    return np.unique(np.column_stack(keys), axis=0, return_inverse=True)[1].ravel()
+
+def _head_to_head_values(matrices, divisions, local, groups):
+    """Sum each team's head-to-head results against the teams in its tie group.
+
+    Groups of 3+ teams are resolved as a mini-league; untied teams get 0.
+    """
+    values = np.zeros(len(groups))
+    order = np.argsort(groups, kind="stable")
+    for rows in np.split(order, np.flatnonzero(np.diff(groups[order])) + 1):
+        if len(rows) < 2:
+            continue
+        idx = local[rows]
+        values[rows] = matrices[divisions[rows[0]]][np.ix_(idx, idx)].sum(axis=1)
+    return values
+
+def rank_standings(standings, settings, divisions=None, matrices=None):
+    """Rank every division of {division: {team: stats}} with one vectorized sort.
+
+    Head-to-head criteria need the parsed `divisions` ({division: {date:
+    {team: data}}}), or their results `matrices` as returned by
+    head_to_head_matrices; the matrices are built once per call and each
+    criterion is evaluated among the teams tied on all previous criteria.
+    Without either they sort as 0. Teams tied on every criterion keep
+    their input order.
+    """
+    sorting_criteria = settings.get("sorting_criteria", DEFAULT_SORTING_CRITERIA)
+    with PROFILER.stage("sort"):
+        items = [(name, team, stats) for name, teams_stats in standings.items() for team, stats in teams_stats.items()]
+        positions = {name: i for i, name in enumerate(standings)}
+        division_names = [name for name, _, _ in items]
+        local = np.array([i for teams_stats in standings.values() for i in range(len(teams_stats))], dtype=np.int64)
+        keys = [np.array([positions[name] for name in division_names], dtype=np.int64)]
+
+        if matrices is None and divisions is not None and any(c["field"] in HEAD_TO_HEAD_FIELDS
+                                                              for c in sorting_criteria):
+            matrices = head_to_head_matrices(divisions, standings)
+
+        for criterion in sorting_criteria:
+            field = criterion["field"]
+            if field in HEAD_TO_HEAD_FIELDS:
+                if matrices is None or not items:
+                    values = np.zeros(len(items), dtype=np.int64)
+                else:
+                    field_matrices = {name: m[HEAD_TO_HEAD_FIELDS[field]] for name, m in matrices.items()}
+                    values = _head_to_head_values(field_matrices, division_names, local, _tie_groups(keys))
+            else:
+                values = np.array([stats.get(field, 0) for _, _, stats in items])
+            keys.append(-values if criterion.get("order", "desc") == "desc" else values)
+
+        ranked = {name: [] for name in standings}
+        # np.lexsort is stable and sorts by the last key first
+        for i in np.lexsort(keys[::-1]):
+            name, team, stats = items[i]
+            ranked[name].append((team, stats))
+        return ranked
+
+def rank_teams(teams_stats, sorting_criteria=None):
+    """Sort {team: stats} into [(team, stats)] using the configured criteria.
+
+    Teams tied on every criterion keep their input order.
+    """
+    return rank_standings({"": teams_stats}, {"sorting_criteria": sorting_criteria or DEFAULT_SORTING_CRITERIA})[""]
+
+def round_key(round_name):
+    """Sort key putting matchday folders in numeric order (J2 before J10)."""
+    match = re.fullmatch(r"J(\d+)", round_name)
+    return (0, int(match.group(1)), "") if match else (1, 0, round_name)
+
+def standings_history(divisions, seeds, settings):
+    """Rank every division as it stood after each played round, in one pass.
+
+    Per-round stat deltas are scattered into a (round, team, stat) array
+    and turned into running totals with a cumulative sum, so each
+    intermediate table costs one ranking instead of a re-aggregation.
+    Head-to-head results matrices are kept as running totals the same way,
+    adding one round's matches at a time. Returns {division: [(round,
+    ranked, changes)]} where `changes` maps team to positions gained since
+    the previous round (None in the first).
+    """
+    frame = stat_columns(matches_frame(divisions))
+    to_points = points_converter(frame)
+    standings = aggregate_league(divisions, seeds)
+    rows_by_division = dict(iter(frame.groupby("division", sort=False)))
+    sorting_criteria = settings.get("sorting_criteria", DEFAULT_SORTING_CRITERIA)
+    head_to_head = any(c["field"] in HEAD_TO_HEAD_FIELDS for c in sorting_criteria)
+
+    history = {}
+    for name in divisions:
+        history[name] = []
+        rows = rows_by_division.get(name)
+        if rows is None:
+            continue
+        teams = pd.Index(list(standings[name]))
+        rounds = sorted(rows["round"].unique(), key=round_key)
+        round_index = pd.Index(rounds).get_indexer(rows["round"])
+        deltas = np.zeros((len(rounds), len(teams), len(STAT_FIELDS)))
+        np.add.at(deltas, (round_index, teams.get_indexer(rows["team"])), rows[list(STAT_FIELDS)].to_numpy(dtype=np.float64))
+        totals = deltas.cumsum(axis=0)
+
+        # Head-to-head criteria only see the rounds played so far
+        matrices = {name: _empty_head_to_head(len(teams), frame["points"].dtype)} if head_to_head else None
+        order = np.argsort(round_index, kind="stable")
+        bounds = np.searchsorted(round_index[order], np.arange(len(rounds) + 1))
+
+        previous = None
+        for k, round_name in enumerate(rounds):
+            teams_stats = {team: stats_record(values, to_points) for team, values in zip(teams, totals[k])}
+            if head_to_head:
+                _add_head_to_head(matrices[name], rows.iloc[order[bounds[k]:bounds[k + 1]]], teams)
+            ranked = rank_standings({name: teams_stats}, settings, matrices=matrices)[name]
+            positions = {team: pos for pos, (team, _) in enumerate(ranked, 1)}
+            changes = {team: previous[team] - pos if previous else None for team, pos in positions.items()}
+            history[name].append((round_name, ranked, changes))
+            previous = positions
+    return history
+
+def _change_arrow(change):
+    """Render a position change as an arrow (or '-' when there is none to show)."""
+    if change is None:
+        return "-"
+    if change > 0:
+        return f"▲{change}"
+    if change < 0:
+        return f"▼{-change}"
+    return "="
+
+def render_table(ranked, changes=None):
+    """Render ranked (team, stats) rows as a markdown table.
+
+    With `changes` ({team: positions gained}), a column of arrows is added.
+    """
+    if changes is None:
+        lines = [
+            "| Pos | Team | Points | W | D | L | TD |",
+            "|-----|------|--------|---|---|---|----|"
+        ]
+    else:
+        lines = [
+            "| Pos | +/- | Team | Points | W | D | L | TD |",
+            "|-----|-----|------|--------|---|---|---|----|"
+        ]
+    for pos, (team, stats) in enumerate(ranked, 1):
+        change = "" if changes is None else f" {_change_arrow(changes.get(team))} |"
+        lines.append(f"| {pos} |{change} {team} | {stats['points']} | {stats['wins']} | {stats['draws']} | {stats['losses']} | {stats['touchdowns']} |")
+    return "\n".join(lines) + "\n"
+
+def render_division(ranked):
+    """Render a single-division classification.md."""
+    return "# League Classification\n\n" + render_table(ranked)
+
+def render_league(ranked_divisions):
+    """Render league_classification.md with one table per division."""
+    markdown = "# League Classification\n\n"
+    for division_name, ranked in ranked_divisions.items():
+        markdown += f"## {division_name}\n\n" + render_table(ranked) + "\n"
+    return markdown
+
+def write_markdown(markdown_file, markdown):
+    """Write a rendered markdown file."""
+    with PROFILER.stage("file writes"):
+        with open(markdown_file, 'w') as f:
+            f.write(markdown)
+        PROFILER.count_write(markdown_file)
+
+def write_classification(ranked_divisions, output_folder, has_divisions, only=None):
+    """Render and write every classification view from one ranked result.
+
+    Writes <division>/classification.md per division (restricted to `only`
+    when given) plus league_classification.md, or a single classification.md
+    in legacy mode.
+    """
+    if not has_divisions:
+        with PROFILER.stage("markdown render"):
+            markdown = render_division(ranked_divisions[""])
+        write_markdown(output_folder / "classification.md", markdown)
+        logging.info(f"Classification table saved to: {output_folder / 'classification.md'}")
+        return
+
+    for division_name, ranked in ranked_divisions.items():
+        if only is not None and division_name not in only:
+            continue
+        division_folder = output_folder / division_name
+        division_folder.mkdir(exist_ok=True)
+        with PROFILER.stage("markdown render"):
+            markdown = render_division(ranked)
+        write_markdown(division_folder / "classification.md", markdown)
+        logging.info(f"Classification table saved to: {division_folder / 'classification.md'}")
+
+    with PROFILER.stage("markdown render"):
+        markdown = render_league(ranked_divisions)
+    write_markdown(output_folder / "league_classification.md", markdown)
+    logging.info(f"League classification saved to: {output_folder / 'league_classification.md'}")
+
+def write_history(history, output_folder, has_divisions):
+    """Write history.json and history/<round>.md for every division.
+
+    Files go to <division>/ or, in legacy mode, straight into output_folder.
+    """
+    for division_name, rounds in history.items():
+        division_folder = output_folder / division_name if has_divisions else output_folder
+        rounds_folder = division_folder / "history"
+        rounds_folder.mkdir(parents=True, exist_ok=True)
+
+        entries = []
+        for round_name, ranked, changes in rounds:
+            with PROFILER.stage("markdown render"):
+                markdown = f"# Classification after {round_name}\n\n" + render_table(ranked, changes)
+            write_markdown(rounds_folder / f"{round_name}.md", markdown)
+            entries.append({
+                "round": round_name,
+                "standings": [dict(position=pos, team=team, change=changes[team], **stats)
+                              for pos, (team, stats) in enumerate(ranked, 1)]
+            })
+
+        history_file = division_folder / "history.json"
+        with PROFILER.stage("file writes"):
+            with open(history_file, 'w') as f:
+                json.dump({"rounds": entries}, f, indent=2)
+            PROFILER.count_write(history_file)
+        logging.info(f"Standings history saved to: {history_file}")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+import json
+import logging
+import numpy as np
+import pandas as pd
+from profiling import PROFILER
+
+STAR_EVENTS = ("touchdown", "casualty", "completion", "interception", "mvp")
+DEFAULT_STAR_POINTS = {"touchdown": 3, "casualty": 2, "completion": 1, "interception": 2, "mvp": 4}
+STAR_PLAYERS_FILE = "star_players.json"
+
+# Column headers of the markdown tables, in STAR_EVENTS order
+EVENT_HEADERS = ("TD", "CAS", "CP", "INT", "MVP")
+
+def load_star_points(config_file="star_points_cfg.json"):
+    """Load the star player point weights, falling back to the defaults."""
+    try:
+        with open(config_file, 'r') as f:
+            star_points = json.load(f)["star_points"]
+    except (FileNotFoundError, KeyError, ValueError):
+        return dict(DEFAULT_STAR_POINTS)
+    return {event: star_points.get(event, 0) for event in STAR_EVENTS}
+
+def count_plays(plays):
+    """Turn (event, player) pairs from an acta into {player: {event: count}}."""
+    counts = {}
+    for event, player in plays:
+        player_counts = counts.setdefault(player, {})
+        player_counts[event] = player_counts.get(event, 0) + 1
+    return counts
+
+def _add_plays(teams_counts, team, players, sign=1):
+    """Add (sign=1) or remove (sign=-1) one match's player plays for a team."""
+    team_counts = teams_counts.setdefault(team, {})
+    for player, events in players.items():
+        counts = team_counts.setdefault(player, [0] * len(STAR_EVENTS))
+        for i, event in enumerate(STAR_EVENTS):
+            counts[i] += sign * events.get(event, 0)
+        if not any(counts):
+            del team_counts[player]
+    if not team_counts:
+        del teams_counts[team]
+
+def count_division(division_data):
+    """Sum player plays of one division into {team: {player: [count per STAR_EVENTS]}}."""
+    teams_counts = {}
+    for date_data in division_data.values():
+        for team, data in date_data.items():
+            if data.get("players"):
+                _add_plays(teams_counts, team, data["players"])
+    return teams_counts
+
+def apply_plays_delta(teams_counts, old_division_data, new_division_data):
+    """Update a division's player counts in place with the matches that changed.
+
+    Returns the number of (date, team) records whose plays changed.
+    """
+    changed = 0
+    for date in old_division_data.keys() | new_division_data.keys():
+        old_date = old_division_data.get(date, {})
+        new_date = new_division_data.get(date, {})
+        for team in old_date.keys() | new_date.keys():
+            old = (old_date.get(team) or {}).get("players") or {}
+            new = (new_date.get(team) or {}).get("players") or {}
+            if old == new:
+                continue
+            changed += 1
+            if old:
+                _add_plays(teams_counts, team, old, -1)
+            if new:
+                _add_plays(teams_counts, team, new)
+    return changed
+
+def leaderboard(counts, star_points):
+    """Weight the play counts into star player points.
+
+    `counts` is {division: {team: {player: [count per STAR_EVENTS]}}}. The
+    weights are applied with one matrix product over all players. Returns
+    (players, teams) DataFrames sorted by points, then touchdowns.
+    """
+    rows = [(division, team, player, *player_counts)
+            for division, teams_counts in counts.items()
+            for team, team_counts in teams_counts.items()
+            for player, player_counts in team_counts.items()]
+    players = pd.DataFrame(rows, columns=["division", "team", "player", *STAR_EVENTS])
+    players[list(STAR_EVENTS)] = players[list(STAR_EVENTS)].astype("int64")
+    weights = np.array([star_points.get(event, 0) for event in STAR_EVENTS])
+    players["spp"] = players[list(STAR_EVENTS)].to_numpy() @ weights
+
+    teams = players.groupby(["division", "team"], sort=False)[[*STAR_EVENTS, "spp"]].sum().reset_index()
+
+    def ranked(frame):
+        # Stable sort: spp desc, then touchdowns desc, then input order
+        order = np.lexsort((-frame["touchdown"].to_numpy(), -frame["spp"].to_numpy()))
+        return frame.iloc[order].reset_index(drop=True)
+
+    return ranked(players), ranked(teams)
+
+def _records(frame):
+    """Convert a leaderboard frame into JSON-ready rows with a position."""
+    return [dict(position=pos, **{key: value.item() if hasattr(value, "item") else value for key, value in row.items()})
+            for pos, row in enumerate(frame.to_dict("records"), 1)]
+
+def render_star_players(players, teams, has_divisions):
+    """Render star_players.md with the player and team leaderboards."""
+    division = "Division | " if has_divisions else ""
+    division_rule = "----------|" if has_divisions else ""
+    events = " | ".join(EVENT_HEADERS)
+    events_rule = "|".join("-" * (len(header) + 2) for header in EVENT_HEADERS)
+
+    lines = ["# Star Players", "",
+             f"| Pos | {division}Team | Player | {events} | SPP |",
+             f"|-----|{division_rule}------|--------|{events_rule}|-----|"]
+    for row in _records(players):
+        cells = " | ".join(str(row[event]) for event in STAR_EVENTS)
+        prefix = f"{row['division']} | " if has_divisions else ""
+        lines.append(f"| {row['position']} | {prefix}{row['team']} | #{row['player']} | {cells} | {row['spp']} |")
+
+    lines += ["", "## Teams", "",
+              f"| Pos | {division}Team | {events} | SPP |",
+              f"|-----|{division_rule}------|{events_rule}|-----|"]
+    for row in _records(teams):
+        cells = " | ".join(str(row[event]) for event in STAR_EVENTS)
+        prefix = f"{row['division']} | " if has_divisions else ""
+        lines.append(f"| {row['position']} | {prefix}{row['team']} | {cells} | {row['spp']} |")
+    return "\n".join(lines) + "\n"
+
+def _load_counts_snapshot(output_folder, has_divisions):
+    """Load the player counts of the previous run if still compatible, else None."""
+    try:
+        with open(output_folder / STAR_PLAYERS_FILE, 'r') as f:
+            snapshot = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if snapshot.get("has_divisions") != has_divisions or snapshot.get("events") != list(STAR_EVENTS):
+        return None
+    return snapshot.get("counts")
+
+def update_star_players(output_folder, divisions, has_divisions, previous_data=None):
+    """Compute per-player play counts for every division.
+
+    With the previous run's league data ({division: {date: {team: data}}}),
+    the stored counts are updated with the changed matches only.
+    """
+    snapshot = _load_counts_snapshot(output_folder, has_divisions) if previous_data is not None else None
+    counts = {}
+    for division_name, division_data in divisions.items():
+        if snapshot is not None and division_name in snapshot:
+            teams_counts = snapshot[division_name]
+            changed = apply_plays_delta(teams_counts, previous_data.get(division_name, {}), division_data)
+            logging.info(f"Incremental star players for {division_name or 'league'}: {changed} records changed")
+        else:
+            teams_counts = count_division(division_data)
+        counts[division_name] = teams_counts
+    return counts
+
+def write_star_players(counts, star_points, output_folder, has_divisions):
+    """Write star_players.md and star_players.json (leaderboards plus the counts snapshot)."""
+    with PROFILER.stage("aggregation"):
+        players, teams = leaderboard(counts, star_points)
+    with PROFILER.stage("markdown render"):
+        markdown = render_star_players(players, teams, has_divisions)
+
+    markdown_file = output_folder / "star_players.md"
+    json_file = output_folder / STAR_PLAYERS_FILE
+    with PROFILER.stage("file writes"):
+        with open(markdown_file, 'w') as f:
+            f.write(markdown)
+        with open(json_file, 'w') as f:
+            json.dump({
+                "star_points": star_points,
+                "players": _records(players),
+                "teams": _records(teams),
+                "has_divisions": has_divisions,
+                "events": list(STAR_EVENTS),
+                "counts": counts
+            }, f, indent=2)
+        PROFILER.count_write(markdown_file)
+        PROFILER.count_write(json_file)
+
+    logging.info(f"Star players saved to: {markdown_file}")
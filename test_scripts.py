@@ -4,17 +4,43 @@ import tempfile
 import shutil
 from pathlib import Path
 import json
+import numpy as np
 import pandas as pd
 from unittest.mock import patch, mock_open, MagicMock, mock_open, MagicMock
 import sys
 import os
+import logging
+import sqlite3
+import subprocess
+import time
+import random
+from logging.handlers import QueueHandler
 import openpyxl
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+CLEAN_ACTA = Path(os.path.dirname(os.path.abspath(__file__))) / "samples" / "clean" / "Hoja limpia Acta.xlsx"
+
 from update_classification import read_excel_files, load_settings, generate_classification_table, process_date_folder
-from generate_league import generate_league
+from update_classification import build_match_index, index_teams, aggregate_stats, apply_standings_delta
+from update_classification import reclassify_changed, snapshot_actas
+from acta_reader import read_acta, read_acta_openpyxl, read_acta_pandas
+from parse_cache import ParseCache
+from acta_writer import ActaTemplate
+from profiling import Profiler, PROFILER
+from standings import rank_teams, rank_standings, standings_history
+from league_store import LeagueStore
+from league_lines import LeagueDataReader
+from fixtures_manifest import scan_fixtures, load_manifest, load_fixtures
+from projection import build_models, remaining_matches, project_league, tie_groups, chunk_sizes
+from pairings import round_robin, swiss_round, pairing_history
+from matching import max_weight_matching
+from ratings import match_list, rating_change, compute_ratings, apply_match, update_ratings, write_ratings
+from generate_league import generate_league, materialize_rounds
+import generate_league as generate_league_module
+import kwbb
+from log_setup import SUMMARY, configure_logging, stop_logging
 
 class TestReadExcelFiles(unittest.TestCase):
     
@@ -203,6 +229,361 @@ class TestGenerateLeague(unittest.TestCase):
         self.assertEqual(expected_matches_per_round, 2)
         self.assertEqual(expected_total_matches, 6)
 
+class TestFixtureMaterialization(unittest.TestCase):
+    """Test acta generation with the real template"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        for division, teams in (("Division 1", "ABCD"), ("Division 2", "EFGHI")):
+            folder = self.league / "Rosters" / division
+            folder.mkdir(parents=True)
+            for team in teams:
+                (folder / f"Team{team}.pdf").touch()
+        self.template_patch = patch('generate_league.TEMPLATE_PATH', str(CLEAN_ACTA))
+        self.template_patch.start()
+    
+    def tearDown(self):
+        self.template_patch.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def actas(self):
+        fixtures = self.league / "Fixtures"
+        return sorted(str(p.relative_to(fixtures)) for p in fixtures.rglob("*.xlsx"))
+    
+    def test_parallel_generation_is_deterministic(self):
+        """Test --jobs writes the same actas and a single fixtures.json"""
+        generate_league(str(self.league), jobs=1)
+        serial = self.actas()
+        generate_league(str(self.league), jobs=4)
+        self.assertEqual(self.actas(), serial)
+        self.assertEqual(len(serial), 6 + 10)
+        
+        with open(self.league / "Fixtures" / "fixtures.json", encoding='utf-8') as f:
+            fixtures = json.load(f)
+        self.assertEqual(sorted(fixtures), ["Division 1", "Division 2"])
+        self.assertEqual(len(fixtures["Division 2"]), 5)
+        
+        record = read_acta(self.league / "Fixtures" / serial[0])
+        self.assertIsNotNone(record.team_b)
+    
+    def test_divisions_without_fixtures(self):
+        """Test no fixtures.json is written when no division can be scheduled"""
+        league = Path(self.temp_dir) / "small"
+        (league / "Rosters" / "Div A").mkdir(parents=True)
+        (league / "Rosters" / "Div A" / "T1.pdf").touch()
+        with self.assertLogs(level="ERROR") as logs:
+            generate_league(str(league))
+        self.assertIn("Need at least 2 teams", logs.output[0])
+        self.assertFalse((league / "Fixtures" / "fixtures.json").exists())
+        
+        with patch('generate_league.TEMPLATE_PATH', "missing.xlsx"), self.assertLogs(level="ERROR"):
+            generate_league(str(self.league))
+        self.assertFalse((self.league / "Fixtures" / "fixtures.json").exists())
+
+class TestPairingsUpdate(unittest.TestCase):
+    """Test --keep-actas only touches the actas whose pairing changed"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        self.fixtures = self.league / "Fixtures"
+        self.league.mkdir()
+        self.template_patch = patch('generate_league.TEMPLATE_PATH', str(CLEAN_ACTA))
+        self.template_patch.start()
+    
+    def tearDown(self):
+        self.template_patch.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def generate(self, pairings, keep_actas):
+        pairings_file = Path(self.temp_dir) / "pairings.json"
+        with open(pairings_file, 'w', encoding='utf-8') as f:
+            json.dump({round_name: {"Division1": [{"home": home, "away": away} for home, away in matches]}
+                       for round_name, matches in pairings.items()}, f)
+        generate_league(str(self.league), pairings_file=str(pairings_file), keep_actas=keep_actas)
+    
+    def actas(self):
+        return sorted(str(p.relative_to(self.fixtures / "Division1")) for p in self.fixtures.rglob("*.xlsx"))
+    
+    def test_only_changed_matches_are_touched(self):
+        """Test kept, moved, created and removed actas after a pairing change"""
+        self.generate({"J1": [("A", "B"), ("C", "D")], "J2": [("A", "C"), ("B", "D")],
+                       "J3": [("A", "D"), ("B", "C")]}, keep_actas=False)
+        played = self.fixtures / "Division1" / "J2" / "Match_2_B_vs_D.xlsx"
+        TestMatchIndex.write_acta(played, "B", "D", 3, 1)
+        untouched = self.fixtures / "Division1" / "J1" / "Match_1_A_vs_B.xlsx"
+        mtime = untouched.stat().st_mtime_ns
+        
+        # J2's matches swap slots and J3 is replaced by a new J4
+        with patch('generate_league.create_match_acta', wraps=generate_league_module.create_match_acta) as create:
+            self.generate({"J1": [("A", "B"), ("C", "D")], "J2": [("B", "D"), ("A", "C")],
+                           "J4": [("D", "A"), ("B", "C")]}, keep_actas=True)
+        
+        self.assertEqual(self.actas(), ["J1/Match_1_A_vs_B.xlsx", "J1/Match_2_C_vs_D.xlsx",
+                                        "J2/Match_1_B_vs_D.xlsx", "J2/Match_2_A_vs_C.xlsx",
+                                        "J4/Match_1_D_vs_A.xlsx", "J4/Match_2_B_vs_C.xlsx"])
+        # Only the reversed venue needed a new acta; J3's empty folder is gone
+        self.assertEqual(create.call_count, 1)
+        self.assertFalse((self.fixtures / "Division1" / "J3").exists())
+        self.assertEqual(untouched.stat().st_mtime_ns, mtime)
+        record = read_acta(self.fixtures / "Division1" / "J2" / "Match_1_B_vs_D.xlsx")
+        self.assertEqual((record.touchdowns_b, record.touchdowns_c), (3, 1))
+        self.assertEqual(load_fixtures(self.fixtures / "fixtures.json")[1]["Division1"]["J4"], [("D", "A"), ("B", "C")])
+
+class TestLazyFixtures(unittest.TestCase):
+    """Test lazy generation and on-demand acta materialization"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_patch = patch('generate_league.TEMPLATE_PATH', str(CLEAN_ACTA))
+        self.template_patch.start()
+    
+    def tearDown(self):
+        self.template_patch.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def make_league(self, name):
+        league = Path(self.temp_dir) / name
+        for division, teams in (("Division 1", "ABCD"), ("Division 2", "EFGHI")):
+            folder = league / "Rosters" / division
+            folder.mkdir(parents=True)
+            for team in teams:
+                (folder / f"Team{team}.pdf").touch()
+        return league
+    
+    def rounds(self, league, division):
+        return sorted(p.name for p in (league / "Fixtures" / division).iterdir())
+    
+    def test_unmaterialized_rounds_count_as_unplayed(self):
+        """Test a lazy league classifies exactly like one with every acta written"""
+        eager, lazy = self.make_league("eager"), self.make_league("lazy")
+        generate_league(str(eager))
+        generate_league(str(lazy), lazy=True)
+        self.assertEqual(self.rounds(lazy, "Division 2"), ["J1"])
+        
+        for league in (eager, lazy):
+            TestMatchIndex.write_acta(league / "Fixtures" / "Division 1" / "J1" / "Match_1_TeamA_vs_TeamD.xlsx",
+                                      "TeamA", "TeamD", 2, 1)
+            with patch('builtins.print'):
+                read_excel_files(str(league))
+        # Everything but the parse cache, which lists the acta paths
+        outputs = sorted(str(p.relative_to(eager / "Classification")) for p in (eager / "Classification").rglob("*.*")
+                         if p.name != "acta_cache.json")
+        self.assertIn("standings.json", outputs)
+        for output in outputs:
+            self.assertEqual((lazy / "Classification" / output).read_text(),
+                             (eager / "Classification" / output).read_text(), output)
+    
+    def test_materialize_rounds(self):
+        """Test auto waits for the previous round and filled actas are never overwritten"""
+        league = self.make_league("league")
+        generate_league(str(league), lazy=True)
+        materialize_rounds(str(league), "auto")
+        self.assertEqual(self.rounds(league, "Division 1"), ["J1"])
+        
+        played = league / "Fixtures" / "Division 1" / "J1"
+        for acta in played.iterdir():
+            record = read_acta(acta)
+            TestMatchIndex.write_acta(acta, record.team_b, record.team_c, 1, 1)
+        materialize_rounds(str(league), "auto")
+        self.assertEqual(self.rounds(league, "Division 1"), ["J1", "J2"])
+        self.assertEqual(self.rounds(league, "Division 2"), ["J1"])
+        self.assertEqual(len(list((league / "Fixtures" / "Division 1" / "J2").iterdir())), 2)
+        
+        materialize_rounds(str(league), "J1")
+        materialize_rounds(str(league), "J5")
+        self.assertEqual(self.rounds(league, "Division 1"), ["J1", "J2"])
+        self.assertEqual(self.rounds(league, "Division 2"), ["J1", "J5"])
+        self.assertTrue(all(read_acta(acta).touchdowns_b == 1 for acta in played.iterdir()))
+    
+    def test_corrupt_acta_keeps_round_open(self):
+        """Test auto logs an unreadable acta and does not open the next round"""
+        league = self.make_league("league")
+        generate_league(str(league), lazy=True)
+        played = league / "Fixtures" / "Division 1" / "J1"
+        actas = sorted(played.iterdir())
+        record = read_acta(actas[0])
+        TestMatchIndex.write_acta(actas[0], record.team_b, record.team_c, 1, 0)
+        actas[1].write_text("not an acta")
+        with self.assertLogs(level="ERROR") as logs:
+            materialize_rounds(str(league), "auto")
+        self.assertTrue([line for line in logs.output if actas[1].name in line])
+        self.assertEqual(self.rounds(league, "Division 1"), ["J1"])
+
+class TestPairings(unittest.TestCase):
+    """Test the round-robin and Swiss pairing engine"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        folder = self.league / "Rosters"
+        folder.mkdir(parents=True)
+        for team in "ABCDE":
+            (folder / f"Team{team}.pdf").touch()
+        self.template_patch = patch('generate_league.TEMPLATE_PATH', str(CLEAN_ACTA))
+        self.template_patch.start()
+    
+    def tearDown(self):
+        self.template_patch.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_round_robin_keeps_circle_order(self):
+        """Test the default schedule is the classic circle rotation"""
+        self.assertEqual(round_robin(["A", "B", "C", "D"]),
+                         [[("A", "D"), ("B", "C")], [("A", "C"), ("D", "B")], [("A", "B"), ("C", "D")]])
+        self.assertEqual(len(round_robin(list("ABCDE"))), 5)
+    
+    def test_balanced_and_double_round_robin(self):
+        """Test balanced venues and a mirrored second half"""
+        teams = [f"T{i}" for i in range(10)]
+        schedule = round_robin(teams, double=True, balanced=True)
+        self.assertEqual(len(schedule), 18)
+        first_half = [match for round_matches in schedule[:9] for match in round_matches]
+        home_games = [sum(home == team for home, _ in first_half) for team in teams]
+        self.assertLessEqual(max(home_games) - min(home_games), 1)
+        second_half = {match for round_matches in schedule[9:] for match in round_matches}
+        self.assertEqual(second_half, {(away, home) for home, away in first_half})
+        self.assertEqual(len({frozenset(match) for match in first_half}), 45)
+    
+    def test_balanced_round_robin_sizes(self):
+        """Test balanced venues and the fewest breaks for odd and even team counts"""
+        for size in range(2, 14):
+            teams = [f"T{i}" for i in range(size)]
+            venues = {team: [] for team in teams}
+            for round_matches in round_robin(teams, balanced=True):
+                for home, away in round_matches:
+                    venues[home].append(1)
+                    venues[away].append(-1)
+            balance = {sum(games) for games in venues.values()}
+            breaks = sum(a == b for games in venues.values() for a, b in zip(games, games[1:]))
+            self.assertLessEqual(max(map(abs, balance)), 1, size)
+            # The circle method's minimum: no breaks with a bye, n - 2 without
+            self.assertEqual(breaks, 0 if size % 2 else size - 2, size)
+    
+    def test_swiss_rounds_avoid_rematches(self):
+        """Test Swiss rounds for hundreds of teams pair quickly without rematches"""
+        teams = [f"T{i:03d}" for i in range(301)]
+        points = dict.fromkeys(teams, 0)
+        rounds = []
+        start = time.perf_counter()
+        for round_num in range(8):
+            history = pairing_history(rounds, teams)
+            matches, bye = swiss_round(sorted(teams, key=lambda t: -points[t]), *history, scores=points)
+            self.assertEqual(len(matches), 150)
+            self.assertNotIn(bye, history[3])
+            self.assertFalse([match for match in matches if frozenset(match) in history[0]])
+            rounds.append(matches)
+            for i, (home, away) in enumerate(matches):
+                points[home if (i + round_num) % 3 else away] += 3
+        self.assertLess(time.perf_counter() - start, 1.0)
+        _, home_balance, _, _ = pairing_history(rounds, teams)
+        self.assertLessEqual(max(abs(balance) for balance in home_balance.values()), 3)
+        self.assertGreater(sum(abs(balance) <= 1 for balance in home_balance.values()), 0.75 * len(teams))
+    
+    def test_swiss_late_rounds(self):
+        """Test late Swiss rounds still avoid rematches, and make the fewest when they cannot"""
+        teams = [f"T{i:02d}" for i in range(41)]
+        points = dict.fromkeys(teams, 0)
+        rounds = []
+        for round_num in range(30):
+            history = pairing_history(rounds, teams)
+            matches, _ = swiss_round(sorted(teams, key=lambda t: -points[t]), *history, scores=points)
+            self.assertFalse([match for match in matches if frozenset(match) in history[0]], round_num)
+            rounds.append(matches)
+            for i, (home, away) in enumerate(matches):
+                points[home if (i + round_num) % 3 else away] += 3
+        
+        played = {frozenset(pair) for pair in ("AB", "AC", "AD", "CD")}
+        with self.assertLogs(level="WARNING"):
+            matches, _ = swiss_round(list("ABCD"), played)
+        self.assertEqual(sorted(map(sorted, matches)), [["A", "C"], ["B", "D"]])
+    
+    def test_max_weight_matching(self):
+        """Test the blossom matching against every matching of small random graphs"""
+        rng = random.Random(7)
+        
+        def best(edges, used=frozenset()):
+            # (cardinality, weight) of the best matching using edges from the list
+            if not edges:
+                return (0, 0)
+            (i, j, weight), rest = edges[0], edges[1:]
+            skip = best(rest, used)
+            if i in used or j in used:
+                return skip
+            cardinality, total = best(rest, used | {i, j})
+            return max(skip, (cardinality + 1, total + weight))
+        
+        for _ in range(200):
+            size = rng.randint(2, 8)
+            pairs = [(i, j) for i in range(size) for j in range(i + 1, size)]
+            edges = [(i, j, rng.randint(-5, 20)) for i, j in rng.sample(pairs, rng.randint(1, len(pairs)))]
+            mate = max_weight_matching(edges, max_cardinality=True)
+            weights = {(i, j): weight for i, j, weight in edges}
+            matched = [(i, j) for i, j in enumerate(mate) if i < j]
+            self.assertTrue(all(mate[j] == i for i, j in matched))
+            self.assertEqual((len(matched), sum(weights[pair] for pair in matched)), best(edges))
+    
+    def test_swiss_generation_adds_rounds(self):
+        """Test --swiss writes one new round per run on top of the existing fixtures"""
+        generate_league(str(self.league), swiss=True)
+        fixtures = self.league / "Fixtures"
+        self.assertEqual(len(list((fixtures / "J1").glob("*.xlsx"))), 2)
+        
+        generate_league(str(self.league), swiss=True)
+        self.assertEqual(len(list((fixtures / "J1").glob("*.xlsx"))), 2)
+        self.assertEqual(len(list((fixtures / "J2").glob("*.xlsx"))), 2)
+        has_divisions, saved = load_fixtures(fixtures / "fixtures.json")
+        self.assertFalse(has_divisions)
+        pairs = [frozenset(match) for matches in saved[""].values() for match in matches]
+        self.assertEqual(len(pairs), len(set(pairs)))
+
+class TestKwbbCli(unittest.TestCase):
+    """Test the unified kwbb entry point"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        folder = self.league / "Rosters"
+        folder.mkdir(parents=True)
+        for team in "ABCD":
+            (folder / f"Team{team}.pdf").touch()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_parser_rejects_bad_arguments(self):
+        """Test argument errors exit before any command runs"""
+        parser = kwbb.build_parser()
+        args = parser.parse_args(["all", "league", "--jobs", "2", "--history"])
+        self.assertEqual((args.command, args.jobs, args.history), ("all", 2, True))
+        with patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                parser.parse_args(["classify", "league", "--jobs", "0"])
+            with self.assertRaises(SystemExit):
+                parser.parse_args(["generate", "league", "--history"])
+            with self.assertRaises(SystemExit):
+                parser.parse_args(["classify", "league", "--watch", "--interval", "0"])
+    
+    def test_help_does_not_import_heavy_modules(self):
+        """Test --help returns without loading pandas or openpyxl"""
+        code = ("import sys, kwbb\n"
+                "try:\n    kwbb.main(['--help'])\nexcept SystemExit:\n    pass\n"
+                "print(sorted(m for m in ('pandas', 'numpy', 'openpyxl') if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "[]")
+    
+    @patch('log_setup.configure_logging')
+    def test_all_generates_and_classifies(self, mock_logging):
+        """Test `all` runs generation and classification in one process"""
+        with patch('generate_league.TEMPLATE_PATH', str(CLEAN_ACTA)):
+            self.assertEqual(kwbb.main(["all", str(self.league), "--jobs", "1"]), 0)
+        
+        self.assertTrue((self.league / "Fixtures" / "fixtures.json").exists())
+        self.assertTrue((self.league / "Classification" / "classification.md").exists())
+        mock_logging.assert_called_once_with("kwbb.log", summary=False)
+
 class TestClassificationGeneration(unittest.TestCase):
     
     def test_classification_table_generation(self):
@@ -234,6 +615,854 @@ class TestClassificationGeneration(unittest.TestCase):
             team_lines = [line for line in lines if '| Team' in line]
             self.assertTrue(len(team_lines) >= 2)
 
+class TestMatchIndex(unittest.TestCase):
+    """Test the single-pass match index shared by all classification stages"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        fixtures = self.league / "Fixtures"
+        self.write_acta(fixtures / "Division1" / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        self.write_acta(fixtures / "Division1" / "J2" / "Match_1.xlsx", "Team B", "Team A", None, None)
+        self.write_acta(fixtures / "Division2" / "J1" / "Match_1.xlsx", "Team C", "Team D", 1, 1)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    @staticmethod
+    def write_acta(path, team_b, team_c, td_b, td_c, players=None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws["B2"], ws["C2"] = team_b, team_c
+        ws["B4"], ws["C4"] = td_b, td_c
+        ws["B5"], ws["C5"] = 10, 20
+        for cell, value in (players or {}).items():
+            ws[cell] = value
+        wb.save(path)
+    
+    def test_build_match_index(self):
+        """Test divisions, dates and unplayed actas are all indexed"""
+        has_divisions, index = build_match_index(self.league / "Fixtures")
+        self.assertTrue(has_divisions)
+        self.assertEqual(sorted(index), ["Division1", "Division2"])
+        self.assertEqual(sorted(index["Division1"]), ["J1", "J2"])
+        self.assertEqual(index_teams(index["Division1"]), ["Team A", "Team B"])
+    
+    def test_each_acta_read_once(self):
+        """Test every match report is parsed exactly once per run"""
+        import update_classification
+        with patch('update_classification.read_acta', wraps=update_classification.read_acta) as mock_read:
+            with patch('builtins.print'):
+                read_excel_files(str(self.league))
+        self.assertEqual(mock_read.call_count, 3)
+        
+        with open(self.league / "Classification" / "league_data.json") as f:
+            league_data = json.load(f)
+        self.assertEqual(league_data["Division1"]["J1"]["Team A"]["result"], "win")
+        self.assertEqual(league_data["Division1"]["J2"], {})
+        
+        content = (self.league / "Classification" / "league_classification.md").read_text()
+        self.assertIn("| 1 | Team A | 3 |", content)
+        self.assertIn("| 2 | Team B | 0 |", content)
+
+    def test_parallel_parse_matches_serial(self):
+        """Test a process pool produces the same league data as a serial run"""
+        output = self.league / "Classification" / "league_data.json"
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), jobs=1)
+            serial = output.read_text()
+            read_excel_files(str(self.league), jobs=2)
+        self.assertEqual(output.read_text(), serial)
+
+    def test_watch_refreshes_only_affected_division(self):
+        """Test a changed acta re-parses and re-renders only its division"""
+        import update_classification
+        classification = self.league / "Classification"
+        with patch('builtins.print'):
+            state = read_excel_files(str(self.league))
+        division1_md = (classification / "Division1" / "classification.md").stat().st_mtime_ns
+        before = snapshot_actas(state["folder"])
+        
+        acta = self.league / "Fixtures" / "Division2" / "J1" / "Match_1.xlsx"
+        self.write_acta(acta, "Team C", "Team D", 0, 2)
+        after = snapshot_actas(state["folder"])
+        changed = {path for path in after if after[path] != before.get(path)}
+        self.assertEqual(changed, {str(acta)})
+        
+        with patch('update_classification.read_acta', wraps=update_classification.read_acta) as mock_read:
+            state = reclassify_changed(state, changed)
+        self.assertEqual(mock_read.call_count, 1)
+        self.assertEqual((classification / "Division1" / "classification.md").stat().st_mtime_ns, division1_md)
+        self.assertIn("| 1 | Team D | 3 |", (classification / "Division2" / "classification.md").read_text())
+        self.assertIn("| 1 | Team D | 3 |", (classification / "league_classification.md").read_text())
+        with open(classification / "league_data.json") as f:
+            self.assertEqual(json.load(f)["Division2"]["J1"]["Team D"]["result"], "win")
+
+class TestActaReader(unittest.TestCase):
+    """Test the targeted acta readers"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.acta = Path(self.temp_dir) / "Match_1.xlsx"
+        TestMatchIndex.write_acta(self.acta, "Team A", "Team B", 3, None)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_readers_agree(self):
+        """Test openpyxl and pandas readers return the same record"""
+        record = read_acta_openpyxl(self.acta)
+        self.assertEqual(record, read_acta_pandas(self.acta))
+        self.assertEqual(record.team_b, "Team A")
+        self.assertEqual(record.touchdowns_b, 3)
+        self.assertIsNone(record.touchdowns_c)
+        self.assertEqual(record.cash_c, 20)
+        self.assertEqual(record.fans_b, 0)
+    
+    def test_text_economy_cells(self):
+        """Test text in the economy cells is kept instead of rejecting the acta"""
+        TestMatchIndex.write_acta(self.acta, "Team A", "Team B", 2, 1, {"B5": "50k", "C5": "50.000", "B6": "-", "C6": "2,5"})
+        with self.assertLogs(level="WARNING") as logs:
+            record = read_acta(self.acta)
+        self.assertEqual((record.touchdowns_b, record.touchdowns_c), (2, 1))
+        self.assertEqual((record.cash_b, record.cash_c), ("50k", "50.000"))
+        self.assertEqual((record.fans_b, record.fans_c), ("-", 2.5))
+        self.assertEqual(len(logs.output), 3)
+    
+    def test_pandas_fallback(self):
+        """Test read_acta falls back to pandas when openpyxl fails"""
+        with patch('acta_reader.read_acta_openpyxl', side_effect=ValueError("broken")):
+            record = read_acta(self.acta)
+        self.assertEqual(record.team_c, "Team B")
+
+class TestParseCache(unittest.TestCase):
+    """Test the persistent acta parse cache"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.acta = self.temp_path / "Match_1.xlsx"
+        TestMatchIndex.write_acta(self.acta, "Team A", "Team B", 1, 0)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_cache_roundtrip(self):
+        """Test stored records are served from disk on the next run"""
+        cache = ParseCache(self.temp_path)
+        self.assertIsNone(cache.lookup(self.acta))
+        cache.store(self.acta, read_acta(self.acta))
+        cache.save()
+        
+        cache = ParseCache(self.temp_path)
+        self.assertEqual(cache.lookup(self.acta), read_acta(self.acta))
+    
+    def test_touched_file_uses_hash(self):
+        """Test a re-saved but identical file is still a cache hit"""
+        cache = ParseCache(self.temp_path)
+        cache.store(self.acta, read_acta(self.acta))
+        stat = os.stat(self.acta)
+        os.utime(self.acta, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(cache.lookup(self.acta))
+    
+    def test_changed_file_invalidated(self):
+        """Test an edited acta is parsed again"""
+        cache = ParseCache(self.temp_path)
+        cache.store(self.acta, read_acta(self.acta))
+        TestMatchIndex.write_acta(self.acta, "Team A", "Team B", 2, 2)
+        stat = os.stat(self.acta)
+        os.utime(self.acta, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.entries[os.path.abspath(self.acta)]["size"] = stat.st_size  # force the hash comparison
+        self.assertIsNone(cache.lookup(self.acta))
+    
+    def test_eviction(self):
+        """Test the cache keeps only the most recently used entries"""
+        other = self.temp_path / "Match_2.xlsx"
+        TestMatchIndex.write_acta(other, "Team C", "Team D", 1, 1)
+        cache = ParseCache(self.temp_path, max_entries=1)
+        cache.store(self.acta, read_acta(self.acta))
+        cache.now += 1
+        cache.store(other, read_acta(other))
+        cache.save()
+        self.assertEqual(list(cache.entries), [os.path.abspath(other)])
+    
+    def test_rerun_parses_only_changed_actas(self):
+        """Test read_excel_files only re-parses modified actas"""
+        league = self.temp_path / "league"
+        TestMatchIndex.write_acta(league / "Fixtures" / "J1" / "Match_1.xlsx", "Team A", "Team B", 1, 0)
+        TestMatchIndex.write_acta(league / "Fixtures" / "J2" / "Match_1.xlsx", "Team B", "Team A", None, None)
+        import update_classification
+        with patch('builtins.print'):
+            read_excel_files(str(league))
+            TestMatchIndex.write_acta(league / "Fixtures" / "J2" / "Match_1.xlsx", "Team B", "Team A", 3, 3)
+            with patch('update_classification.read_acta', wraps=update_classification.read_acta) as mock_read:
+                read_excel_files(str(league))
+        self.assertEqual(mock_read.call_count, 1)
+        self.assertTrue((league / "Classification" / "acta_cache.json").exists())
+
+class TestIncrementalStandings(unittest.TestCase):
+    """Test delta updates of standings against the previous snapshot"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        self.fixtures = self.league / "Fixtures" / "Division1"
+        TestMatchIndex.write_acta(self.fixtures / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        TestMatchIndex.write_acta(self.fixtures / "J1" / "Match_2.xlsx", "Team C", "Team D", 0, 0)
+        TestMatchIndex.write_acta(self.fixtures / "J2" / "Match_1.xlsx", "Team A", "Team C", None, None)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_apply_standings_delta(self):
+        """Test added, changed and removed results are applied as deltas"""
+        old = {"J1": {"Team A": {"touchdowns": 2, "result": "win", "points": 3},
+                      "Team B": {"touchdowns": 1, "result": "lose", "points": 0}}}
+        new = {"J1": {"Team A": {"touchdowns": 1, "result": "draw", "points": 1},
+                      "Team B": {"touchdowns": 1, "result": "draw", "points": 1}},
+               "J2": {"Team C": {"touchdowns": 3, "result": "win", "points": 3}}}
+        stats = aggregate_stats(old)
+        self.assertEqual(apply_standings_delta(stats, old, new), 3)
+        self.assertEqual(stats, aggregate_stats(new))
+        apply_standings_delta(stats, new, {})
+        self.assertEqual(stats["Team C"], {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0,
+                                           "td_against": 0, "td_diff": 0})
+    
+    def test_incremental_run_matches_full_rebuild(self):
+        """Test an incremental rerun produces the same tables as a full run"""
+        classification = self.league / "Classification"
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), incremental=True)
+            TestMatchIndex.write_acta(self.fixtures / "J2" / "Match_1.xlsx", "Team A", "Team C", 0, 4)
+            (self.fixtures / "J1" / "Match_2.xlsx").unlink()
+            read_excel_files(str(self.league), incremental=True)
+            incremental = (classification / "league_classification.md").read_text()
+            read_excel_files(str(self.league), use_cache=False)
+        self.assertEqual((classification / "league_classification.md").read_text(), incremental)
+        self.assertIn("| 1 | Team C | 3 | 1 | 0 | 0 | 4 |", incremental)
+    
+    def test_incremental_keeps_seed_order(self):
+        """Test new teams tied on every criterion rank as in a full rebuild"""
+        classification = self.league / "Classification"
+        TestMatchIndex.write_acta(self.fixtures / "J3" / "Match_1.xlsx", "Team X", "Team Y", None, None)
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), incremental=True)
+            TestMatchIndex.write_acta(self.fixtures / "J1" / "Match_0.xlsx", "Team E", "Team F", None, None)
+            read_excel_files(str(self.league), incremental=True)
+            incremental = (classification / "league_classification.md").read_text()
+            read_excel_files(str(self.league), use_cache=False)
+        self.assertEqual((classification / "league_classification.md").read_text(), incremental)
+
+class TestStandingsEngine(unittest.TestCase):
+    """Test all classification views are rendered from one ranking"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        fixtures = self.league / "Fixtures"
+        TestMatchIndex.write_acta(fixtures / "Division1" / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        TestMatchIndex.write_acta(fixtures / "Division2" / "J1" / "Match_1.xlsx", "Team C", "Team D", 0, 3)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_views_share_one_ranking(self):
+        """Test division tables match their sections of the league table and settings load once"""
+        classification = self.league / "Classification"
+        with patch('builtins.print'), patch('update_classification.load_settings', wraps=load_settings) as settings:
+            read_excel_files(str(self.league), use_cache=False)
+        self.assertEqual(settings.call_count, 1)
+        league = (classification / "league_classification.md").read_text()
+        for division, leader in (("Division1", "Team A"), ("Division2", "Team D")):
+            table = (classification / division / "classification.md").read_text()
+            self.assertIn(f"| 1 | {leader} | 3 | 1 | 0 | 0 |", table)
+            self.assertIn(f"## {division}\n\n" + table.split("\n\n", 1)[1], league)
+    
+    def test_td_against_and_diff(self):
+        """Test TD against and TD diff are aggregated from the rival's touchdowns"""
+        division_data = {
+            "J1": {"Team A": {"touchdowns": 2, "result": "win", "rival": "Team B", "points": 3},
+                   "Team B": {"touchdowns": 1, "result": "lose", "rival": "Team A", "points": 0}},
+            "J2": {"Team A": {"touchdowns": 0, "result": "lose", "rival": "Team C", "points": 0},
+                   "Team C": {"touchdowns": 3, "result": "win", "rival": "Team A", "points": 3}}
+        }
+        stats = aggregate_stats(division_data, ["Team D"])
+        self.assertEqual(list(stats), ["Team D", "Team A", "Team B", "Team C"])
+        self.assertEqual(stats["Team A"], {"points": 3, "wins": 1, "draws": 0, "losses": 1, "touchdowns": 2,
+                                           "td_against": 4, "td_diff": -2})
+        criteria = [{"field": "points", "order": "desc"}, {"field": "td_diff", "order": "desc"}]
+        self.assertEqual([team for team, _ in rank_teams(stats, criteria)], ["Team C", "Team A", "Team D", "Team B"])
+    
+    @staticmethod
+    def division_data(matches, points=None):
+        """Build {date: {team: data}} from (date, home, away, td_home, td_away) tuples"""
+        points = points or {"win": 3, "draw": 1, "lose": 0}
+        data = {}
+        for date, home, away, td_home, td_away in matches:
+            result = "win" if td_home > td_away else "lose" if td_home < td_away else "draw"
+            other = {"win": "lose", "lose": "win", "draw": "draw"}[result]
+            data.setdefault(date, {})[home] = {"touchdowns": td_home, "result": result, "rival": away, "points": points[result]}
+            data.setdefault(date, {})[away] = {"touchdowns": td_away, "result": other, "rival": home, "points": points[other]}
+        return data
+    
+    def test_head_to_head_breaks_two_way_tie(self):
+        """Test head_to_head only counts matches between the tied teams"""
+        data = self.division_data([("J1", "Team A", "Team B", 1, 0), ("J2", "Team B", "Team C", 5, 0)])
+        stats = aggregate_stats(data)
+        criteria = [{"field": "points", "order": "desc"}, {"field": "head_to_head"}, {"field": "td_diff", "order": "desc"}]
+        ranked = rank_standings({"": stats}, {"sorting_criteria": criteria}, {"": data})[""]
+        self.assertEqual([team for team, _ in ranked], ["Team A", "Team B", "Team C"])
+    
+    def test_head_to_head_mini_league(self):
+        """Test a three-way tie is resolved on the results among the tied teams"""
+        data = self.division_data([("J1", "Team A", "Team B", 3, 0), ("J2", "Team B", "Team C", 1, 0),
+                                   ("J3", "Team C", "Team A", 1, 0), ("J4", "Team D", "Team E", 2, 2)])
+        stats = aggregate_stats(data)
+        criteria = [{"field": "points", "order": "desc"}, {"field": "head_to_head", "order": "desc"},
+                    {"field": "td_diff_head_to_head", "order": "desc"}]
+        ranked = rank_standings({"": stats}, {"sorting_criteria": criteria}, {"": data})[""]
+        self.assertEqual([team for team, _ in ranked], ["Team A", "Team C", "Team B", "Team D", "Team E"])
+    
+    def test_fractional_league_points(self):
+        """Test fractional league points are summed without truncation"""
+        points = {"win": 1.5, "draw": 0.5, "lose": 0}
+        data = self.division_data([("J1", "Team A", "Team B", 1, 1), ("J2", "Team C", "Team A", 2, 2),
+                                   ("J3", "Team B", "Team C", 1, 0)], points)
+        stats = aggregate_stats(data)
+        self.assertEqual(stats["Team A"]["points"], 1.0)
+        self.assertEqual(stats["Team B"]["points"], 2.0)
+        self.assertIsInstance(stats["Team A"]["draws"], int)
+        criteria = [{"field": "points", "order": "desc"}, {"field": "head_to_head", "order": "desc"}]
+        ranked = rank_standings({"": stats}, {"sorting_criteria": criteria}, {"": data})[""]
+        self.assertEqual([(team, s["points"]) for team, s in ranked],
+                         [("Team B", 2.0), ("Team A", 1.0), ("Team C", 0.5)])
+        history = standings_history({"": data}, {"": None}, {"sorting_criteria": criteria})[""]
+        self.assertEqual([[s["points"] for _, s in ranked] for _, ranked, _ in history],
+                         [[0.5, 0.5, 0.0], [1.0, 0.5, 0.5], [2.0, 1.0, 0.5]])
+    
+    def test_rank_teams_keeps_order_on_ties(self):
+        """Test teams tied on every criterion keep their seed order"""
+        stats = aggregate_stats({}, ["Team B", "Team A"])
+        self.assertEqual([team for team, _ in rank_teams(stats)], ["Team B", "Team A"])
+
+class TestStandingsHistory(unittest.TestCase):
+    """Test the round-by-round standings history"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        fixtures = self.league / "Fixtures" / "Division1"
+        TestMatchIndex.write_acta(fixtures / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 0)
+        TestMatchIndex.write_acta(fixtures / "J2" / "Match_1.xlsx", "Team B", "Team C", 3, 0)
+        TestMatchIndex.write_acta(fixtures / "J10" / "Match_1.xlsx", "Team C", "Team A", 1, 1)
+        TestMatchIndex.write_acta(fixtures / "J11" / "Match_1.xlsx", "Team A", "Team C", None, None)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_history_tables_and_changes(self):
+        """Test one table per played round, in round order, with position changes"""
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False, history=True)
+        division = self.league / "Classification" / "Division1"
+        with open(division / "history.json") as f:
+            rounds = json.load(f)["rounds"]
+        self.assertEqual([r["round"] for r in rounds], ["J1", "J2", "J10"])
+        self.assertEqual([row["team"] for row in rounds[0]["standings"]], ["Team A", "Team B", "Team C"])
+        self.assertIsNone(rounds[0]["standings"][0]["change"])
+        self.assertEqual([(row["team"], row["change"]) for row in rounds[1]["standings"]],
+                         [("Team B", 1), ("Team A", -1), ("Team C", 0)])
+        self.assertEqual(rounds[2]["standings"][0]["points"], 4)
+        self.assertEqual(rounds[2]["standings"][0]["td_diff"], 2)
+        
+        final = [(row["team"], row["points"]) for row in rounds[-1]["standings"]]
+        table = (division / "classification.md").read_text()
+        for pos, (team, points) in enumerate(final, 1):
+            self.assertIn(f"| {pos} | {team} | {points} |", table)
+        self.assertIn("| 1 | ▲1 | Team B | 3 |", (division / "history" / "J2.md").read_text())
+        self.assertFalse((division / "history" / "J11.md").exists())
+    
+    def test_history_head_to_head_running_totals(self):
+        """Test head-to-head history matches ranking each round prefix, without rebuilding the matrices"""
+        data = TestStandingsEngine.division_data([("J1", "Team A", "Team B", 1, 0), ("J1", "Team C", "Team D", 2, 2),
+                                                  ("J2", "Team B", "Team C", 3, 0), ("J2", "Team D", "Team A", 1, 0),
+                                                  ("J3", "Team C", "Team A", 1, 0), ("J3", "Team B", "Team D", 0, 0)])
+        criteria = [{"field": "points", "order": "desc"}, {"field": "head_to_head", "order": "desc"},
+                    {"field": "td_diff_head_to_head", "order": "desc"}]
+        with patch('standings.head_to_head_matrices') as matrices:
+            history = standings_history({"": data}, {"": None}, {"sorting_criteria": criteria})[""]
+        matrices.assert_not_called()
+        teams = list(aggregate_stats(data))
+        for k, (round_name, ranked, _) in enumerate(history):
+            played = {date: data[date] for date in ["J1", "J2", "J3"][:k + 1]}
+            expected = rank_standings({"": aggregate_stats(played, teams)}, {"sorting_criteria": criteria}, {"": played})[""]
+            self.assertEqual(ranked, expected, round_name)
+
+class TestStarPlayers(unittest.TestCase):
+    """Test the star player points leaderboard"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        self.fixtures = self.league / "Fixtures" / "Division1"
+        # Two TDs by #7, a casualty (Bajas row) by #7 and the MVP #3 of Team B
+        TestMatchIndex.write_acta(self.fixtures / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 0,
+                                  {"B10": "7, 7", "B18": 7, "B22": 4, "C29": 3})
+        TestMatchIndex.write_acta(self.fixtures / "J2" / "Match_1.xlsx", "Team B", "Team A", 1, 1,
+                                  {"B10": 3, "C10": 9, "C26": 9})
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_reader_extracts_plays(self):
+        """Test player plays are read in the same pass, with lists of numbers per cell"""
+        acta = self.fixtures / "J1" / "Match_1.xlsx"
+        record = read_acta_openpyxl(acta)
+        self.assertEqual(record, read_acta_pandas(acta))
+        self.assertEqual(record.players_b, (("touchdown", "7"), ("touchdown", "7"), ("casualty", "7"), ("completion", "4")))
+        self.assertEqual(record.players_c, (("mvp", "3"),))
+    
+    def test_leaderboard(self):
+        """Test star player points use the configured weights"""
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False)
+        with open(self.league / "Classification" / "star_players.json") as f:
+            board = json.load(f)
+        top = board["players"][0]
+        self.assertEqual((top["team"], top["player"], top["touchdown"], top["casualty"], top["spp"]), ("Team A", "7", 2, 1, 8))
+        self.assertEqual([(p["team"], p["player"], p["spp"]) for p in board["players"][1:]],
+                         [("Team B", "3", 7), ("Team A", "9", 5), ("Team A", "4", 1)])
+        self.assertEqual([(t["team"], t["spp"]) for t in board["teams"]], [("Team A", 14), ("Team B", 7)])
+        markdown = (self.league / "Classification" / "star_players.md").read_text()
+        self.assertIn("| 1 | Division1 | Team A | #7 | 2 | 1 | 0 | 0 | 0 | 8 |", markdown)
+    
+    def test_incremental_matches_full(self):
+        """Test the leaderboard updated from changed actas matches a full rebuild"""
+        classification = self.league / "Classification"
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), incremental=True)
+            TestMatchIndex.write_acta(self.fixtures / "J2" / "Match_1.xlsx", "Team B", "Team A", 2, 1,
+                                      {"B10": "3 5", "C10": 9})
+            read_excel_files(str(self.league), incremental=True)
+            incremental = (classification / "star_players.md").read_text()
+            read_excel_files(str(self.league), use_cache=False)
+        self.assertEqual((classification / "star_players.md").read_text(), incremental)
+        self.assertIn("| Team B | #5 | 1 | 0 | 0 | 0 | 0 | 3 |", incremental)
+
+class TestSeasonProjection(unittest.TestCase):
+    """Test the Monte Carlo projection of the remaining fixtures"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings = {"league_points": {"win": 3, "draw": 1, "lose": 0},
+                         "sorting_criteria": [{"field": "points"}, {"field": "head_to_head"}, {"field": "td_diff"}]}
+        self.fixtures = {"": {"J1": [("A", "B"), ("C", "D")], "J2": [("A", "C"), ("B", "D")],
+                              "J3": [("A", "D"), ("B", "C")]}}
+        self.played = {"": {"J1": {
+            "A": {"touchdowns": 3, "result": "win", "rival": "B", "points": 3},
+            "B": {"touchdowns": 0, "result": "lose", "rival": "A", "points": 0},
+            "C": {"touchdowns": 1, "result": "draw", "rival": "D", "points": 1},
+            "D": {"touchdowns": 1, "result": "draw", "rival": "C", "points": 1}}}}
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_load_fixtures_layouts(self):
+        """Test generated, single-league and pairings fixtures load the same way"""
+        layouts = {
+            "generated": ({"Division 1": {"J1": [{"home": "A", "away": "B"}]}}, True),
+            "single": ({"J1": [{"home": "A", "away": "B"}]}, False),
+            "pairings": ({"J1": {"Division 1": [{"home": "A", "away": "B"}]}}, True),
+        }
+        for name, (data, has_divisions) in layouts.items():
+            fixtures_file = Path(self.temp_dir) / f"{name}.json"
+            fixtures_file.write_text(json.dumps(data))
+            division = "Division 1" if has_divisions else ""
+            self.assertEqual(load_fixtures(fixtures_file), (has_divisions, {division: {"J1": [("A", "B")]}}))
+    
+    def test_only_unplayed_matches_are_simulated(self):
+        """Test played fixtures and byes are left out of the simulation"""
+        models = build_models(self.fixtures, self.played, self.settings)
+        self.assertEqual(len(models[""].home), 4)
+        self.assertEqual(remaining_matches({"J4": [("A", "BYE")]}, {}), [])
+    
+    def test_projection_is_reproducible_across_jobs(self):
+        """Test a seeded projection gives the same probabilities for any --jobs"""
+        with patch('projection.CHUNK_SIZE', 500):
+            serial = project_league(self.fixtures, self.played, self.settings, 2000, seed=7, jobs=1)[""]
+            parallel = project_league(self.fixtures, self.played, self.settings, 2000, seed=7, jobs=2)[""]
+        pd.testing.assert_frame_equal(serial, parallel)
+        
+        positions = serial.drop(columns="expected_points")
+        self.assertTrue(((positions.sum(axis=0) - 1).abs() < 1e-9).all())
+        self.assertTrue(((positions.sum(axis=1) - 1).abs() < 1e-9).all())
+        self.assertEqual(serial.index[0], "A")
+    
+    def test_batches_and_tie_groups(self):
+        """Test batch sizes shrink for big divisions and tied teams share a group"""
+        self.assertEqual(chunk_sizes(25000, 6), [10000, 10000, 5000])
+        with patch('projection.CHUNK_CELLS', 1000):
+            self.assertEqual(chunk_sizes(2500, 400), [2] * 1250)
+        keys = [np.array([[3, 1, 3, 1]]), np.array([[0, 2, 0, 1]])]
+        group = tie_groups(keys, 1, 4)[0]
+        self.assertEqual(group[0], group[2])
+        self.assertEqual(len(set(group.tolist())), 3)
+        self.assertEqual(tie_groups([], 2, 3).tolist(), [[0, 0, 0]] * 2)
+    
+    def test_finished_season_is_certain(self):
+        """Test a fully played season projects the actual table"""
+        fixtures = {"": {"J1": self.fixtures[""]["J1"]}}
+        projection = project_league(fixtures, self.played, self.settings, 100, seed=1)[""]
+        self.assertEqual(projection.index.tolist(), ["A", "C", "D", "B"])
+        self.assertEqual(projection.loc["A", 1], 1.0)
+        self.assertEqual(projection.loc["B", 4], 1.0)
+        self.assertEqual(projection.loc["C", 2] + projection.loc["C", 3], 1.0)
+
+class TestRatings(unittest.TestCase):
+    """Test the Elo ratings engine"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output = Path(self.temp_dir)
+        self.config = {"initial": 1500, "k_factor": 20, "margin_weight": 1.0}
+        self.seeds = {"Division1": ["A", "B", "C", "D"]}
+        self.divisions = {"Division1": {"J1": self.round(("A", "B", 3, 1), ("C", "D", 0, 0))}}
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    @staticmethod
+    def round(*matches):
+        round_data = {}
+        for team, rival, td_for, td_against in matches:
+            round_data[team] = {"touchdowns": td_for, "rival": rival}
+            round_data[rival] = {"touchdowns": td_against, "rival": team}
+        return round_data
+    
+    def test_vectorized_recompute_matches_sequential(self):
+        """Test batched updates give the same ratings as one match at a time"""
+        self.divisions["Division1"]["J2"] = self.round(("A", "C", 1, 2), ("B", "D", 2, 2))
+        self.divisions["Division1"]["J10"] = self.round(("A", "D", 0, 1))
+        matches = match_list(self.divisions)
+        self.assertEqual([m[1] for m in matches], ["J1", "J1", "J2", "J2", "J10"])
+        
+        records = compute_ratings(matches, self.seeds, self.config)
+        sequential = {}
+        for match in matches:
+            self.assertTrue(apply_match(sequential, match, self.config))
+        for team in "ABCD":
+            self.assertAlmostEqual(records["Division1"][team]["rating"], sequential["Division1"][team]["rating"])
+        self.assertAlmostEqual(sum(r["rating"] for r in records["Division1"].values()), 6000)
+        self.assertEqual(records["Division1"]["A"]["games"], 3)
+    
+    def test_margin_multiplier(self):
+        """Test wider wins move ratings more, and draws between equals not at all"""
+        small = rating_change(1500, 1500, 1, 0, self.config)
+        large = rating_change(1500, 1500, 4, 0, self.config)
+        self.assertGreater(large, small)
+        self.assertEqual(rating_change(1500, 1500, 2, 2, self.config), 0)
+    
+    def test_incremental_updates_and_recompute(self):
+        """Test new rounds are applied incrementally and edits trigger a recompute"""
+        write_ratings(update_ratings(self.output, self.divisions, self.seeds, True, self.config), self.output, True,
+                      self.config)
+        self.divisions["Division1"]["J2"] = self.round(("A", "C", 1, 2), ("B", "D", 2, 2))
+        with self.assertLogs(level='INFO') as logs:
+            state = update_ratings(self.output, self.divisions, self.seeds, True, self.config)
+        self.assertIn("Incremental ratings: 2 new matches", "\n".join(logs.output))
+        full = compute_ratings(match_list(self.divisions), self.seeds, self.config)
+        self.assertEqual(list(state["records"]["Division1"]), list(full["Division1"]))
+        for team in "ABCD":
+            self.assertAlmostEqual(state["records"]["Division1"][team]["rating"], full["Division1"][team]["rating"])
+        write_ratings(state, self.output, True, self.config)
+        
+        self.divisions["Division1"]["J1"] = self.round(("A", "B", 0, 1), ("C", "D", 0, 0))
+        with self.assertLogs(level='INFO') as logs:
+            state = update_ratings(self.output, self.divisions, self.seeds, True, self.config)
+        self.assertIn("recomputing ratings", "\n".join(logs.output))
+        self.assertEqual(state["records"], compute_ratings(match_list(self.divisions), self.seeds, self.config))
+        
+        ratings = json.loads((self.output / "ratings.json").read_text())
+        self.assertEqual([row["team"] for row in ratings["divisions"]["Division1"]][0], "C")
+        self.assertIn("| 1 | C |", (self.output / "ratings.md").read_text())
+
+class TestLeagueStore(unittest.TestCase):
+    """Test the SQLite league store"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        self.fixtures = self.league / "Fixtures" / "Division1"
+        TestMatchIndex.write_acta(self.fixtures / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        TestMatchIndex.write_acta(self.fixtures / "J1" / "Match_2.xlsx", "Team C", "Team D", 0, 0)
+        TestMatchIndex.write_acta(self.fixtures / "J2" / "Match_1.xlsx", "Team A", "Team C", None, None)
+        self.db = self.league / "Classification" / "league.db"
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_views_match_markdown(self):
+        """Test the standings view agrees with the classification table"""
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False, sqlite=True)
+        store = LeagueStore(self.db)
+        try:
+            rows = store.standings("Division1")
+            self.assertEqual([(r["team"], r["points"], r["td_diff"]) for r in rows],
+                             [("Team A", 3, 1), ("Team C", 1, 0), ("Team D", 1, 0), ("Team B", 0, -1)])
+            history = store.team_history("Team A")
+            self.assertEqual([(h["round"], h["rival"], h["result"]) for h in history], [("J1", "Team B", "win")])
+            results = store.round_results("Division1", "J2")
+            self.assertEqual([(r["home"], r["away"], r["played"]) for r in results], [("Team A", "Team C", 0)])
+        finally:
+            store.close()
+    
+    def test_views_are_replaced(self):
+        """Test an existing database gets the current view definitions"""
+        self.db.parent.mkdir(parents=True)
+        conn = sqlite3.connect(str(self.db))
+        conn.execute("CREATE VIEW round_results AS SELECT 1 AS outdated")
+        conn.close()
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False, sqlite=True)
+        store = LeagueStore(self.db)
+        try:
+            self.assertEqual(len(store.round_results("Division1", "J1")), 2)
+        finally:
+            store.close()
+    
+    def test_sync_writes_only_changes(self):
+        """Test a rerun only writes changed matches and deletes removed actas"""
+        settings = load_settings()
+        _, index = build_match_index(self.league / "Fixtures")
+        self.db.parent.mkdir(parents=True)
+        store = LeagueStore(self.db)
+        try:
+            self.assertEqual(store.sync(index, settings), 3)
+            self.assertEqual(store.sync(index, settings), 0)
+            TestMatchIndex.write_acta(self.fixtures / "J2" / "Match_1.xlsx", "Team A", "Team C", 1, 3)
+            (self.fixtures / "J1" / "Match_2.xlsx").unlink()
+            _, index = build_match_index(self.league / "Fixtures")
+            self.assertEqual(store.sync(index, settings), 2)
+            self.assertEqual([r["team"] for r in store.standings("Division1")], ["Team A", "Team C", "Team B"])
+        finally:
+            store.close()
+
+class TestLeagueLines(unittest.TestCase):
+    """Test the JSON Lines copy of league_data.json and its offset index"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        fixtures = self.league / "Fixtures"
+        TestMatchIndex.write_acta(fixtures / "Division1" / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        TestMatchIndex.write_acta(fixtures / "Division1" / "J2" / "Match_1.xlsx", "Team B", "Team A", 0, 0)
+        TestMatchIndex.write_acta(fixtures / "Division1" / "J3" / "Match_1.xlsx", "Team A", "Team B", None, None)
+        TestMatchIndex.write_acta(fixtures / "Division2" / "J1" / "Match_1.xlsx", "Team C", "Team D", 1, 3)
+        with patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False)
+        self.classification = self.league / "Classification"
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_reader_matches_league_data(self):
+        """Test divisions and rounds read by offset equal the full JSON"""
+        with open(self.classification / "league_data.json") as f:
+            league_data = json.load(f)
+        reader = LeagueDataReader(self.classification)
+        self.assertEqual(reader.divisions(), ["Division1", "Division2"])
+        self.assertEqual(reader.rounds("Division1"), ["J1", "J2", "J3"])
+        for division in reader.divisions():
+            self.assertEqual(reader.read_division(division), league_data[division])
+        self.assertEqual(reader.read_round("Division1", "J2"), league_data["Division1"]["J2"])
+        self.assertEqual(reader.read_round("Division1", "J3"), {})
+        self.assertEqual(len(list(reader.iter_matches("Division1"))), 2)
+    
+    def test_reader_only_reads_requested_range(self):
+        """Test a round is read by seeking, without touching other lines"""
+        reader = LeagueDataReader(self.classification)
+        with open(reader.lines_file, 'r+b') as f:
+            f.seek(0)
+            f.write(b"#")  # corrupt the first line, which belongs to Division1
+        self.assertEqual(reader.read_round("Division2", "J1")["Team D"]["result"], "win")
+
+class TestFixturesManifest(unittest.TestCase):
+    """Test the single-walk Fixtures manifest"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        self.fixtures = self.league / "Fixtures"
+        TestMatchIndex.write_acta(self.fixtures / "Division1" / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        TestMatchIndex.write_acta(self.fixtures / "Division1" / "J2" / "Match_1.xlsx", "Team B", "Team A", None, None)
+        TestMatchIndex.write_acta(self.fixtures / "Division2" / "J1" / "Match_1.xlsx", "Team C", "Team D", 0, 0)
+        (self.fixtures / "Division1" / "J1" / "~$Match_1.xlsx").touch()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_scan_fixtures(self):
+        """Test the manifest layout, entry stats and lock-file filtering"""
+        manifest = scan_fixtures(self.fixtures)
+        self.assertTrue(manifest.has_divisions)
+        self.assertEqual({name: list(rounds) for name, rounds in manifest.divisions.items()},
+                         {"Division1": ["J1", "J2"], "Division2": ["J1"]})
+        entry = manifest.divisions["Division1"]["J1"][0]
+        self.assertEqual(os.path.basename(entry.path), "Match_1.xlsx")
+        self.assertEqual(entry.size, os.path.getsize(entry.path))
+        self.assertEqual(len(list(manifest.entries())), 3)
+    
+    def test_one_listing_per_directory(self):
+        """Test a full run lists each directory exactly once"""
+        with patch('builtins.print'), patch('fixtures_manifest.os.scandir', wraps=os.scandir) as scandir:
+            read_excel_files(str(self.league), save_fixtures_manifest=True)
+        # Fixtures, two divisions and three rounds
+        self.assertEqual(scandir.call_count, 6)
+        manifest_file = self.league / "Classification" / "fixtures_manifest.json"
+        self.assertEqual(load_manifest(manifest_file), scan_fixtures(self.fixtures))
+
+class TestActaTemplate(unittest.TestCase):
+    """Test the in-memory bulk acta writer"""
+    
+    def test_write_team_names(self):
+        """Test stamped actas keep the template and carry the team names"""
+        template = ActaTemplate(CLEAN_ACTA)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            match_file = Path(temp_dir) / "Match_1.xlsx"
+            template.write(match_file, "Orcs & <Co>", "Elves")
+            
+            record = read_acta(match_file)
+            self.assertEqual((record.team_b, record.team_c), ("Orcs & <Co>", "Elves"))
+            self.assertIsNone(record.touchdowns_b)
+            ws = openpyxl.load_workbook(match_file).active
+            self.assertEqual(ws["A4"].value, "Marcador")
+    
+    def test_invalid_template_raises(self):
+        """Test a non-xlsx template is rejected so callers can fall back"""
+        with tempfile.NamedTemporaryFile(suffix=".xlsx") as f:
+            with self.assertRaises(Exception):
+                ActaTemplate(f.name)
+
+class TestProfiler(unittest.TestCase):
+    """Test per-stage timing instrumentation"""
+    
+    def test_disabled_profiler_records_nothing(self):
+        """Test stages are ignored until the profiler is started"""
+        profiler = Profiler()
+        with profiler.stage("acta parse"):
+            pass
+        profiler.count_read(__file__)
+        self.assertEqual(profiler.stages, {})
+        self.assertEqual(profiler.counters["files_read"], 0)
+    
+    def test_nested_stages_not_double_counted(self):
+        """Test a stage opened inside another is only counted for the inner stage"""
+        profiler = Profiler()
+        profiler.start()
+        with profiler.stage("aggregation"):
+            time.sleep(0.02)
+            with profiler.stage("file writes"):
+                time.sleep(0.05)
+        profiler.stop()
+        stages = profiler.stages
+        self.assertGreaterEqual(stages["file writes"]["wall_s"], 0.05)
+        self.assertLess(stages["aggregation"]["wall_s"], 0.05)
+        self.assertLessEqual(stages["aggregation"]["wall_s"] + stages["file writes"]["wall_s"], profiler.total[0])
+    
+    def test_classification_stages_recorded(self):
+        """Test a classification run records stages, I/O counters and metrics.json"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            league = Path(temp_dir) / "league"
+            TestMatchIndex.write_acta(league / "Fixtures" / "J1" / "Match_1.xlsx", "Team A", "Team B", 1, 0)
+            PROFILER.start(str(Path(temp_dir) / "run.pstats"))
+            try:
+                with patch('builtins.print'):
+                    read_excel_files(str(league))
+            finally:
+                PROFILER.stop()
+            PROFILER.save(league / "Classification" / "metrics.json")
+            
+            with open(league / "Classification" / "metrics.json") as f:
+                metrics = json.load(f)
+            for stage in ("directory scan", "acta parse", "aggregation", "sort", "markdown render", "file writes"):
+                self.assertIn(stage, metrics["stages"])
+            self.assertEqual(metrics["counters"]["files_read"], 1)
+            self.assertGreater(metrics["counters"]["bytes_written"], 0)
+            self.assertTrue((Path(temp_dir) / "run.pstats").exists())
+            self.assertIn("| acta parse | 1 |", PROFILER.summary())
+
+class TestLogging(unittest.TestCase):
+    """Test queued logging and the per-division summary mode"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.league = Path(self.temp_dir) / "league"
+        fixtures = self.league / "Fixtures" / "Division1"
+        TestMatchIndex.write_acta(fixtures / "J1" / "Match_1.xlsx", "Team A", "Team B", 2, 1)
+        TestMatchIndex.write_acta(fixtures / "J1" / "Match_2.xlsx", "Team C", "Team D", None, None)
+        (fixtures / "J2").mkdir()
+        (fixtures / "J2" / "Match_1.xlsx").write_text("not an acta")
+    
+    def tearDown(self):
+        SUMMARY.enabled = False
+        shutil.rmtree(self.temp_dir)
+    
+    def test_summary_logs_one_line_per_division(self):
+        """Test summary mode replaces per-file lines with a division line"""
+        SUMMARY.enabled = True
+        with self.assertLogs(level='INFO') as logs, patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False)
+        
+        self.assertFalse([line for line in logs.output if "Processed: " in line or "Error reading" in line])
+        summary = [line for line in logs.output if "Processed Division1:" in line]
+        self.assertEqual(len(summary), 1)
+        self.assertIn("1 processed, 1 not played, 1 errors (Match_1.xlsx)", summary[0])
+    
+    def test_per_file_lines_without_summary(self):
+        """Test each acta is still logged when summary mode is off"""
+        with self.assertLogs(level='INFO') as logs, patch('builtins.print'):
+            read_excel_files(str(self.league), use_cache=False)
+        self.assertEqual(len([line for line in logs.output if "Processed: Division1/J1/Match_1.xlsx" in line]), 1)
+        self.assertEqual(len([line for line in logs.output if "Error reading Match_1.xlsx" in line]), 1)
+    
+    def test_queued_logging_writes_file(self):
+        """Test queued records reach the log file once the listener stops"""
+        root = logging.getLogger()
+        saved = root.handlers[:]
+        root.handlers = []
+        log_file = Path(self.temp_dir) / "run.log"
+        try:
+            with patch('sys.stderr'):
+                configure_logging(str(log_file))
+                self.assertIsInstance(root.handlers[0], QueueHandler)
+                logging.info("queued message")
+                stop_logging()
+        finally:
+            root.handlers = saved
+        self.assertIn("INFO - queued message", log_file.read_text())
+    
+    def test_reconfigured_logging_keeps_writing(self):
+        """Test a second configure_logging call replaces the queue handler and its writer"""
+        root = logging.getLogger()
+        saved = root.handlers[:]
+        root.handlers = []
+        first, second = Path(self.temp_dir) / "first.log", Path(self.temp_dir) / "second.log"
+        try:
+            with patch('sys.stderr'):
+                configure_logging(str(first))
+                logging.info("first message")
+                configure_logging(str(second))
+                self.assertEqual(len(root.handlers), 1)
+                logging.info("second message")
+                stop_logging()
+        finally:
+            root.handlers = saved
+        self.assertIn("first message", first.read_text())
+        self.assertIn("second message", second.read_text())
+        self.assertNotIn("second message", first.read_text())
+
 class TestEdgeCases(unittest.TestCase):
     """Test edge cases and error conditions"""
     
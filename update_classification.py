@@ -1,19 +1,26 @@
 #!/usr/bin/env python3
 import logging
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('update_classification.log'),
-        logging.StreamHandler()
-    ]
-)
+import os
 import sys
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import pandas as pd
+from acta_reader import read_acta
+from log_setup import SUMMARY, configure_logging
+from fixtures_manifest import (MANIFEST_FILE, FIXTURES_FILE, FixturesManifest, scan_fixtures, list_actas, save_manifest,
+                               load_fixtures)
+from parse_cache import ParseCache, DEFAULT_MAX_ENTRIES
+from profiling import PROFILER
+from standings import (DEFAULT_SORTING_CRITERIA, STAT_FIELDS, empty_stats, aggregate_stats, aggregate_league, apply_standings_delta,
+                       rank_standings, render_division, render_league, write_markdown, write_classification,
+                       standings_history, write_history)
+from league_lines import write_league_lines
+from league_store import LEAGUE_DB, save_league_store
+from star_players import count_plays, count_division, load_star_points, update_star_players, write_star_players
+from ratings import load_ratings_config, update_ratings, write_ratings
+
+STANDINGS_FILE = "standings.json"
 
 def load_settings():
     """Load point settings from league_points_cfg.json"""
@@ -23,41 +30,172 @@ def load_settings():
     except FileNotFoundError:
         return {
             "league_points": {"win": 3, "draw": 1, "lose": 0},
-            "sorting_criteria": [
-                {"field": "points", "order": "desc"},
-                {"field": "touchdowns", "order": "desc"},
-                {"field": "wins", "order": "desc"}
-            ]
+            "sorting_criteria": DEFAULT_SORTING_CRITERIA
+        }
+
+def _safe_read_acta(file_path):
+    """Read one acta, returning (acta, error message, seconds) so workers never raise."""
+    start = time.perf_counter()
+    try:
+        return read_acta(file_path), None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+def _read_actas(excel_files, jobs=1, sizes=None):
+    """Parse a list of match reports, mapping file path to acta (None on error).
+    
+    With jobs > 1 the files are spread over a process pool; results keep the
+    order of `excel_files` so the output does not depend on scheduling.
+    `sizes` ({path: bytes}) avoids a stat per file for the I/O counters.
+    """
+    jobs = min(jobs or 1, len(excel_files))
+    with PROFILER.stage("acta parse"):
+        if jobs > 1:
+            chunksize = max(1, len(excel_files) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_safe_read_acta, excel_files, chunksize=chunksize))
+        else:
+            results = [_safe_read_acta(file_path) for file_path in excel_files]
+    
+    
+    actas = {}
+    for file_path, (acta, error, seconds) in zip(excel_files, results):
+        PROFILER.count_read(file_path, sizes.get(file_path) if sizes else None)
+        SUMMARY.add_time(file_path.parent.parent.name, seconds)
+        if error is not None:
+            SUMMARY.error(file_path.parent.parent.name, file_path.name, f"Error reading {file_path.name}: {error}")
+        actas[file_path] = acta
+    return actas
+
+def build_match_index(folder, jobs=1, cache=None, manifest=None):
+    """Parse every match report under a fixtures folder in a single pass.
+    
+    Returns a tuple (has_divisions, index) where index maps division name
+    (None in legacy mode) to date name to {file name: acta}. When a
+    ParseCache is given, only actas missing from it are parsed. The folder
+    is walked once with scan_fixtures unless its `manifest` is given.
+    """
+    if manifest is None:
+        with PROFILER.stage("directory scan"):
+            manifest = scan_fixtures(folder)
+    
+    entries = {Path(entry.path): entry for entry in manifest.entries()}
+    if cache is None:
+        actas = _read_actas(list(entries), jobs, {path: entry.size for path, entry in entries.items()})
+    else:
+        with PROFILER.stage("cache lookup"):
+            actas = {path: cache.lookup(path, entry.size, entry.mtime_ns) for path, entry in entries.items()}
+        parsed = _read_actas([path for path, acta in actas.items() if acta is None], jobs,
+                             {path: entry.size for path, entry in entries.items()})
+        for path, acta in parsed.items():
+            if acta is not None:
+                cache.store(path, acta, entries[path].size, entries[path].mtime_ns)
+        actas.update(parsed)
+    
+    index = {
+        division_name: {
+            date_name: {os.path.basename(entry.path): actas[Path(entry.path)] for entry in actas_in_round}
+            for date_name, actas_in_round in rounds.items()
         }
+        for division_name, rounds in manifest.divisions.items()
+    }
+    return manifest.has_divisions, index
+
+def index_teams(division_index):
+    """List every team appearing in a division's match reports, played or not."""
+    teams = []
+    seen = set()
+    for actas in division_index.values():
+        for acta in actas.values():
+            if acta is None:
+                continue
+            for team in (acta.team_b, acta.team_c):
+                if team and team not in seen:
+                    seen.add(team)
+                    teams.append(team)
+    return teams
+
+def division_teams(division_index, scheduled_rounds=None):
+    """List a division's teams: those in its match reports, then those only in fixtures.json."""
+    teams = index_teams(division_index)
+    seen = set(teams)
+    for matches in (scheduled_rounds or {}).values():
+        for match in matches:
+            for team in match:
+                if team not in seen:
+                    seen.add(team)
+                    teams.append(team)
+    return teams
+
+def load_schedule(folder):
+    """Load the fixtures.json of a Fixtures folder (see load_fixtures), or None."""
+    fixtures_file = Path(folder) / FIXTURES_FILE
+    try:
+        return load_fixtures(fixtures_file)
+    except FileNotFoundError:
+        return None
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable {fixtures_file}: {e}")
+        return None
 
-def process_date_folder(date_folder, date_data, settings):
-    """Process Excel files in a date folder."""
-    excel_files = list(date_folder.glob("*.xlsx")) + list(date_folder.glob("*.xls"))
+def add_scheduled_rounds(division_index, scheduled_rounds):
+    """Add the rounds of fixtures.json that have no actas on disk, as unplayed rounds."""
+    rounds = {round_name: {} for round_name in scheduled_rounds}
+    rounds.update(division_index)
+    return dict(sorted(rounds.items()))
+
+def apply_schedule(has_divisions, match_index, schedule):
+    """Complete a match index with the rounds only listed in fixtures.json.
+    
+    Lazily generated leagues materialize actas round by round, so the rest
+    of the season is read from `schedule` (load_schedule's result) without
+    touching the disk. Until a round is materialized, the fixtures.json
+    layout is used. Returns (has_divisions, match_index, scheduled), where
+    `scheduled` maps each match index key to its fixtures.json rounds.
+    """
+    if schedule is None:
+        return has_divisions, match_index, {}
+    scheduled_divisions, fixtures = schedule
+    if not any(match_index.values()):
+        has_divisions, match_index = scheduled_divisions, {}
+    elif scheduled_divisions != has_divisions:
+        logging.warning("fixtures.json and the Fixtures folders use different layouts; ignoring fixtures.json.")
+        return has_divisions, match_index, {}
+    
+    scheduled = {name if has_divisions else None: rounds for name, rounds in fixtures.items()}
+    keys = sorted(set(match_index) | set(scheduled), key=str)
+    match_index = {key: add_scheduled_rounds(match_index.get(key, {}), scheduled.get(key, {})) for key in keys}
+    return has_divisions, match_index, scheduled
+
+def process_date_folder(date_folder, date_data, settings, actas=None):
+    """Process Excel files in a date folder.
+    
+    Pre-parsed actas from build_match_index can be passed to avoid reading
+    the files again.
+    """
+    if actas is None:
+        sizes = {Path(entry.path): entry.size for entry in list_actas(date_folder)}
+        actas = {file_path.name: acta for file_path, acta in _read_actas(list(sizes), sizes=sizes).items()}
     
-    for file_path in excel_files:
+    division = date_folder.parent.name
+    for file_name, acta in actas.items():
+        if acta is None:
+            continue
         try:
-            df = pd.read_excel(file_path, header=None)
-            
-            # Team B (column B)
-            team_b = str(df.iloc[1, 1]) if len(df) > 1 and len(df.columns) > 1 else "Unknown_B"
-            touchdowns_b = df.iloc[3, 1] if len(df) > 3 else None
+            team_b = acta.team_b
+            team_c = acta.team_c
+            touchdowns_b = acta.touchdowns_b
+            touchdowns_c = acta.touchdowns_c
             
-            # Team C (column C)
-            team_c = str(df.iloc[1, 2]) if len(df) > 1 and len(df.columns) > 2 else "Unknown_C"
-            touchdowns_c = df.iloc[3, 2] if len(df) > 3 else None
-            
-            # Check if touchdowns are empty
-            td_b_empty = pd.isna(touchdowns_b) or str(touchdowns_b).strip() == ''
-            td_c_empty = pd.isna(touchdowns_c) or str(touchdowns_c).strip() == ''
-            
-            # If both empty, skip this match (not played)
-            if td_b_empty and td_c_empty:
+            # If both touchdowns are empty, skip this match (not played)
+            if touchdowns_b is None and touchdowns_c is None:
+                SUMMARY.event(division, "not played")
                 continue
             
             # If one is empty, treat as 0
-            if td_b_empty:
+            if touchdowns_b is None:
                 touchdowns_b = 0
-            if td_c_empty:
+            if touchdowns_c is None:
                 touchdowns_c = 0
             
             # Determine match result
@@ -68,34 +206,61 @@ def process_date_folder(date_folder, date_data, settings):
             else:
                 result_b = result_c = "draw"
             
-            if team_b != "nan":
+            if team_b is not None:
                 date_data[team_b] = {
                     "touchdowns": touchdowns_b,
-                    "cash": df.iloc[4, 1] if len(df) > 4 else 0,
-                    "fans": df.iloc[5, 1] if len(df) > 5 else 0,
-                    "attendants": df.iloc[6, 1] if len(df) > 6 else 0,
+                    "cash": acta.cash_b,
+                    "fans": acta.fans_b,
+                    "attendants": acta.attendants_b,
                     "result": result_b,
                     "rival": team_c,
-                    "points": settings["league_points"][result_b]
+                    "points": settings["league_points"][result_b],
+                    "players": count_plays(acta.players_b)
                 }
             
-            if team_c != "nan":
+            if team_c is not None:
                 date_data[team_c] = {
                     "touchdowns": touchdowns_c,
-                    "cash": df.iloc[4, 2] if len(df) > 4 else 0,
-                    "fans": df.iloc[5, 2] if len(df) > 5 else 0,
-                    "attendants": df.iloc[6, 2] if len(df) > 6 else 0,
+                    "cash": acta.cash_c,
+                    "fans": acta.fans_c,
+                    "attendants": acta.attendants_c,
                     "result": result_c,
                     "rival": team_b,
-                    "points": settings["league_points"][result_c]
+                    "points": settings["league_points"][result_c],
+                    "players": count_plays(acta.players_c)
                 }
             
-            logging.info(f"Processed: {date_folder.parent.name}/{date_folder.name}/{file_path.name} - {team_b} vs {team_c}")
+            SUMMARY.event(division, "processed",
+                          f"Processed: {division}/{date_folder.name}/{file_name} - {team_b} vs {team_c}")
         except Exception as e:
-            logging.error(f"Error reading {file_path.name}: {e}")
+            SUMMARY.error(division, file_name, f"Error reading {file_name}: {e}")
 
-def read_excel_files(folder_path):
-    """Read Excel files from division and date subfolders and extract team data to JSON."""
+def build_division_data(division_folder, division_index, settings):
+    """Turn a division's parsed actas into {date: {team: result data}}."""
+    division_data = {}
+    with PROFILER.stage("aggregation"), SUMMARY.timed(division_folder.name):
+        for date_name, actas in division_index.items():
+            division_data[date_name] = {}
+            process_date_folder(division_folder / date_name, division_data[date_name], settings, actas)
+    return division_data
+
+def read_excel_files(folder_path, jobs=1, use_cache=True, cache_dir=None, cache_size=DEFAULT_MAX_ENTRIES,
+                     incremental=False, history=False, sqlite=False, save_fixtures_manifest=False):
+    """Read Excel files from division and date subfolders and extract team data to JSON.
+    
+    `jobs` is the number of worker processes used to parse the actas. Parsed
+    actas are cached in `cache_dir` (default: the Classification folder) so
+    reruns only parse the files that changed. With `incremental`, standings
+    are updated from the previous run's snapshot instead of rebuilt. With
+    `history`, the table after every played round is written as well. With
+    `sqlite`, the parsed actas are also synced into Classification/league.db.
+    The Fixtures tree is walked once; with `save_fixtures_manifest` the
+    resulting manifest is written to Classification/fixtures_manifest.json.
+    
+    Rounds listed in fixtures.json without actas on disk count as unplayed.
+    
+    Returns the run state used by watch mode to refresh single divisions.
+    """
     folder = Path(folder_path)
     
     if not folder.exists():
@@ -110,214 +275,419 @@ def read_excel_files(folder_path):
     settings = load_settings()
     league_data = {}
     
-    # Check if there are division folders or direct date folders
-    has_divisions = any(d.is_dir() and any(sub.is_dir() and sub.name.startswith('J') for sub in d.iterdir()) for d in folder.iterdir())
+    # Output to Classification folder in the original folder_path (not Fixtures)
+    output_folder = Path(folder_path) / "Classification"
+    cache = ParseCache(cache_dir or output_folder, cache_size) if use_cache else None
+    
+    # Walk the tree and parse every acta once; all later stages reuse this index
+    with PROFILER.stage("directory scan"):
+        manifest = scan_fixtures(folder)
+    has_divisions, match_index = build_match_index(folder, jobs, cache, manifest)
+    has_divisions, match_index, scheduled = apply_schedule(has_divisions, match_index, load_schedule(folder))
+    if cache is not None:
+        with PROFILER.stage("file writes"):
+            cache.save()
+        PROFILER.count_write(cache.path)
     
     if has_divisions:
         # Process divisions
-        for division_folder in folder.iterdir():
-            if not division_folder.is_dir():
-                continue
-            
-            division_name = division_folder.name
-            league_data[division_name] = {}
-            
-            for date_folder in division_folder.iterdir():
-                if not date_folder.is_dir():
-                    continue
-                    
-                date_name = date_folder.name
-                league_data[division_name][date_name] = {}
-                
-                process_date_folder(date_folder, league_data[division_name][date_name], settings)
+        for division_name, division_index in match_index.items():
+            league_data[division_name] = build_division_data(folder / division_name, division_index, settings)
     else:
         # Process direct date folders (legacy mode)
-        for date_folder in folder.iterdir():
-            if not date_folder.is_dir():
-                continue
-                
-            date_name = date_folder.name
-            league_data[date_name] = {}
-            
-            process_date_folder(date_folder, league_data[date_name], settings)
+        league_data = build_division_data(folder, match_index[None], settings)
+    SUMMARY.flush("Processed")
     
-    # Output to Classification folder in the original folder_path (not Fixtures)
-    output_folder = Path(folder_path) / "Classification"
     output_folder.mkdir(parents=True, exist_ok=True)
     output_file = output_folder / "league_data.json"
+    if save_fixtures_manifest:
+        with PROFILER.stage("file writes"):
+            save_manifest(manifest, output_folder / MANIFEST_FILE)
     
-    with open(output_file, 'w') as f:
-        json.dump(league_data, f, indent=2)
-    
-    # Generate classification tables
+    # Aggregate standings before league_data.json is replaced, since
+    # incremental mode diffs against the previous run's data
     if has_divisions:
-        # Generate division-specific tables
-        for division_name, division_data in league_data.items():
-            if isinstance(division_data, dict):
-                division_output_folder = output_folder / division_name
-                division_output_folder.mkdir(exist_ok=True)
-                division_fixtures_folder = folder / division_name
-                generate_classification_table(division_data, division_output_folder, division_fixtures_folder)
-        
-        # Generate overall league classification
-        generate_overall_classification(league_data, output_folder, folder)
+        divisions = league_data
+        seeds = {name: division_teams(match_index.get(name, {}), scheduled.get(name)) for name in league_data}
     else:
-        # No divisions
-        generate_classification_table(league_data, output_folder, folder)
+        divisions = {"": league_data}
+        seeds = {"": division_teams(match_index[None], scheduled.get(None))}
+    previous_data = load_previous_league_data(output_folder, has_divisions) if incremental else None
+    with PROFILER.stage("aggregation"):
+        standings = update_standings(output_folder, divisions, seeds, settings, has_divisions, incremental, previous_data)
+        star_counts = update_star_players(output_folder, divisions, has_divisions, previous_data)
+        ratings_config = load_ratings_config()
+        ratings = update_ratings(output_folder, divisions, seeds, has_divisions, ratings_config)
+    
+    with PROFILER.stage("file writes"):
+        with open(output_file, 'w') as f:
+            json.dump(league_data, f, indent=2)
+        PROFILER.count_write(output_file)
+    write_league_lines(league_data, output_folder, has_divisions)
+    if sqlite:
+        with PROFILER.stage("file writes"):
+            save_league_store(output_folder / LEAGUE_DB, match_index, settings)
+    
+    # Rank once and render every classification view from the same result
+    write_classification(rank_standings(standings, settings, divisions), output_folder, has_divisions)
+    if history:
+        write_history(standings_history(divisions, seeds, settings), output_folder, has_divisions)
+    star_points = load_star_points()
+    write_star_players(star_counts, star_points, output_folder, has_divisions)
+    write_ratings(ratings, output_folder, has_divisions, ratings_config)
     
     print(f"\nData saved to: {output_file}")
+    
+    return {
+        "folder": folder,
+        "output_folder": output_folder,
+        "settings": settings,
+        "cache": cache,
+        "jobs": jobs,
+        "history": history,
+        "sqlite": sqlite,
+        "save_fixtures_manifest": save_fixtures_manifest,
+        "manifest": manifest,
+        "has_divisions": has_divisions,
+        "match_index": match_index,
+        "scheduled": scheduled,
+        "league_data": league_data,
+        "standings": standings,
+        "star_points": star_points,
+        "star_counts": star_counts
+    }
 
-def generate_classification_table(league_data, output_folder, fixtures_folder=None):
-    """Generate classification table in markdown format"""
-    settings = load_settings()
-    teams_stats = {}
-    
-    # Initialize all teams from fixtures if provided
-    if fixtures_folder:
-        for date_folder in fixtures_folder.iterdir():
-            if date_folder.is_dir():
-                for excel_file in date_folder.glob("*.xlsx"):
-                    try:
-                        df = pd.read_excel(excel_file, header=None)
-                        team_b = str(df.iloc[1, 1]) if len(df) > 1 and len(df.columns) > 1 else None
-                        team_c = str(df.iloc[1, 2]) if len(df) > 1 and len(df.columns) > 2 else None
-                        if team_b and team_b != "nan":
-                            if team_b not in teams_stats:
-                                teams_stats[team_b] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0}
-                        if team_c and team_c != "nan":
-                            if team_c not in teams_stats:
-                                teams_stats[team_c] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0}
-                    except:
-                        pass
-    
-    # Calculate total stats for each team
-    for date, teams in league_data.items():
-        for team, data in teams.items():
-            if team not in teams_stats:
-                teams_stats[team] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0}
-            
-            teams_stats[team]["points"] += data["points"]
-            teams_stats[team]["touchdowns"] += data["touchdowns"]
-            
-            if data["result"] == "win":
-                teams_stats[team]["wins"] += 1
-            elif data["result"] == "draw":
-                teams_stats[team]["draws"] += 1
-            else:
-                teams_stats[team]["losses"] += 1
+def load_previous_league_data(output_folder, has_divisions):
+    """Load the previous run's league_data.json as {division: data}, or None."""
+    try:
+        with open(output_folder / "league_data.json", 'r') as f:
+            previous_data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return previous_data if has_divisions else {"": previous_data}
+
+def _load_standings_snapshot(output_folder, settings, has_divisions, previous_data):
+    """Return the previous standings with their league data if still compatible, else None."""
+    if previous_data is None:
+        return None
+    try:
+        with open(output_folder / STANDINGS_FILE, 'r') as f:
+            snapshot = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
     
-    # Sort teams using configurable criteria
-    sorting_criteria = settings.get("sorting_criteria", [
-        {"field": "points", "order": "desc"},
-        {"field": "touchdowns", "order": "desc"},
-        {"field": "wins", "order": "desc"}
-    ])
+    if snapshot.get("league_points") != settings["league_points"] or snapshot.get("has_divisions") != has_divisions:
+        logging.info("Scoring or layout changed since last run; rebuilding standings from scratch.")
+        return None
+    if any(set(stats) != set(STAT_FIELDS) for teams_stats in snapshot.get("standings", {}).values() for stats in teams_stats.values()):
+        logging.info("Standings fields changed since last run; rebuilding standings from scratch.")
+        return None
     
-    def sort_key(item):
-        team_stats = item[1]
-        return tuple(
-            team_stats.get(criterion["field"], 0) * (-1 if criterion["order"] == "desc" else 1)
-            for criterion in sorting_criteria
-        )
+    snapshot["league_data"] = previous_data
+    return snapshot
+
+def update_standings(output_folder, divisions, seeds, settings, has_divisions, incremental=False, previous_data=None):
+    """Compute per-division team stats and persist them to standings.json.
     
-    sorted_teams = sorted(teams_stats.items(), key=sort_key)
+    `divisions` maps division name ("" in legacy mode) to {date: {team: data}}
+    and `seeds` maps it to the teams to list even without results. In
+    incremental mode, the previous snapshot is updated with the changed
+    results only instead of re-aggregating the whole season; the previous
+    league data is loaded unless `previous_data` is given.
+    """
+    if incremental and previous_data is None:
+        previous_data = load_previous_league_data(output_folder, has_divisions)
+    snapshot = _load_standings_snapshot(output_folder, settings, has_divisions, previous_data) if incremental else None
+    if snapshot is None:
+        standings = aggregate_league(divisions, seeds)
+        save_standings(output_folder, settings, has_divisions, standings)
+        return standings
     
-    # Generate markdown table
-    markdown = "# League Classification\n\n"
-    markdown += "| Pos | Team | Points | W | D | L | TD |\n"
-    markdown += "|-----|------|--------|---|---|---|----|\n"
+    standings = {}
+    for division_name, division_data in divisions.items():
+        teams = seeds.get(division_name, [])
+        if division_name in snapshot["standings"]:
+            teams_stats = snapshot["standings"][division_name]
+            changed = apply_standings_delta(teams_stats, snapshot["league_data"].get(division_name, {}), division_data)
+            logging.info(f"Incremental standings for {division_name or 'league'}: {changed} results changed")
+            
+            # Same team order as a full rebuild (seeded teams, then the others by first result):
+            # new teams start at zero and teams that left the fixtures without results are dropped
+            played = dict.fromkeys(team for date_data in division_data.values() for team in date_data)
+            teams_stats = {team: teams_stats.get(team) or empty_stats() for team in dict.fromkeys([*teams, *played])}
+        else:
+            teams_stats = aggregate_stats(division_data, teams)
+        standings[division_name] = teams_stats
     
-    for pos, (team, stats) in enumerate(sorted_teams, 1):
-        markdown += f"| {pos} | {team} | {stats['points']} | {stats['wins']} | {stats['draws']} | {stats['losses']} | {stats['touchdowns']} |\n"
+    save_standings(output_folder, settings, has_divisions, standings)
+    return standings
+
+def save_standings(output_folder, settings, has_divisions, standings):
+    """Persist per-division team stats to standings.json."""
+    with PROFILER.stage("file writes"):
+        with open(output_folder / STANDINGS_FILE, 'w') as f:
+            json.dump({
+                "league_points": settings["league_points"],
+                "has_divisions": has_divisions,
+                "standings": standings
+            }, f, indent=2)
+        PROFILER.count_write(output_folder / STANDINGS_FILE)
+
+def generate_classification_table(league_data, output_folder, fixtures_folder=None, teams=None, teams_stats=None,
+                                  settings=None):
+    """Generate classification table in markdown format.
     
-    # Save markdown file
+    Teams listed in `teams` (or found in `fixtures_folder`) are included
+    even if they have not played yet. Precomputed `teams_stats` skip the
+    aggregation step.
+    """
+    settings = settings or load_settings()
+    
+    if teams_stats is None:
+        # Initialize all teams from fixtures if provided
+        if teams is None and fixtures_folder:
+            _, match_index = build_match_index(fixtures_folder)
+            teams = [team for division_index in match_index.values() for team in index_teams(division_index)]
+        
+        # Calculate total stats for each team
+        teams_stats = aggregate_stats(league_data, teams)
+    
+    ranked = rank_standings({"": teams_stats}, settings, {"": league_data})[""]
     markdown_file = output_folder / "classification.md"
-    with open(markdown_file, 'w') as f:
-        f.write(markdown)
+    write_markdown(markdown_file, render_division(ranked))
     
     logging.info(f"Classification table saved to: {markdown_file}")
 
-def generate_overall_classification(league_data, output_folder, fixtures_folder):
+def generate_overall_classification(league_data, output_folder, fixtures_folder, match_index=None, division_stats=None,
+                                    settings=None):
     """Generate league classification with separate tables for each division"""
-    settings = load_settings()
-    markdown = "# League Classification\n\n"
+    settings = settings or load_settings()
+    if division_stats is None:
+        if match_index is None:
+            _, match_index = build_match_index(fixtures_folder)
+        seeds = {name: index_teams(match_index.get(name, {})) for name in league_data}
+        division_stats = aggregate_league(league_data, seeds)
     
-    # Generate table for each division
-    for division_name, division_data in league_data.items():
-        teams_stats = {}
-        
-        # Initialize all teams from fixtures
-        division_fixtures_folder = fixtures_folder / division_name
-        if division_fixtures_folder.exists():
-            for date_folder in division_fixtures_folder.iterdir():
-                if date_folder.is_dir():
-                    for excel_file in date_folder.glob("*.xlsx"):
-                        try:
-                            df = pd.read_excel(excel_file, header=None)
-                            team_b = str(df.iloc[1, 1]) if len(df) > 1 and len(df.columns) > 1 else None
-                            team_c = str(df.iloc[1, 2]) if len(df) > 1 and len(df.columns) > 2 else None
-                            if team_b and team_b != "nan":
-                                if team_b not in teams_stats:
-                                    teams_stats[team_b] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0}
-                            if team_c and team_c != "nan":
-                                if team_c not in teams_stats:
-                                    teams_stats[team_c] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0}
-                        except:
-                            pass
-        
-        # Calculate stats for this division
-        for date, teams in division_data.items():
-            for team, data in teams.items():
-                if team not in teams_stats:
-                    teams_stats[team] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "touchdowns": 0}
-                
-                teams_stats[team]["points"] += data["points"]
-                teams_stats[team]["touchdowns"] += data["touchdowns"]
-                
-                if data["result"] == "win":
-                    teams_stats[team]["wins"] += 1
-                elif data["result"] == "draw":
-                    teams_stats[team]["draws"] += 1
-                else:
-                    teams_stats[team]["losses"] += 1
-        
-        # Sort teams using configurable criteria
-        sorting_criteria = settings.get("sorting_criteria", [
-            {"field": "points", "order": "desc"},
-            {"field": "touchdowns", "order": "desc"},
-            {"field": "wins", "order": "desc"}
-        ])
-        
-        def sort_key(item):
-            team_stats = item[1]
-            return tuple(
-                team_stats.get(criterion["field"], 0) * (-1 if criterion["order"] == "desc" else 1)
-                for criterion in sorting_criteria
-            )
-        
-        sorted_teams = sorted(teams_stats.items(), key=sort_key)
-        
-        # Add division header and table
-        markdown += f"## {division_name}\n\n"
-        markdown += "| Pos | Team | Points | W | D | L | TD |\n"
-        markdown += "|-----|------|--------|---|---|---|----|\n"
-        
-        for pos, (team, stats) in enumerate(sorted_teams, 1):
-            markdown += f"| {pos} | {team} | {stats['points']} | {stats['wins']} | {stats['draws']} | {stats['losses']} | {stats['touchdowns']} |\n"
-        
-        markdown += "\n"
-    
-    # Save markdown file
+    ranked = rank_standings({name: division_stats[name] for name in league_data}, settings, league_data)
     markdown_file = output_folder / "league_classification.md"
-    with open(markdown_file, 'w') as f:
-        f.write(markdown)
+    write_markdown(markdown_file, render_league(ranked))
     
     logging.info(f"League classification saved to: {markdown_file}")
 
+def manifest_snapshot(manifest):
+    """Map every acta of a manifest to its (mtime_ns, size)."""
+    return {entry.path: (entry.mtime_ns, entry.size) for entry in manifest.entries()}
+
+def snapshot_actas(folder):
+    """Map every acta under a fixtures folder to its (mtime_ns, size)."""
+    return manifest_snapshot(scan_fixtures(folder))
+
+def reclassify_changed(state, changed_paths, manifest=None):
+    """Refresh only the divisions touched by the changed acta paths.
+    
+    Returns the updated state; falls back to a full run when the folder
+    layout changed (e.g. a new division appeared). A fresh `manifest` of
+    the Fixtures tree avoids listing the affected divisions again.
+    """
+    folder = state["folder"]
+    output_folder = state["output_folder"]
+    settings = state["settings"]
+    
+    affected = set()
+    for path in changed_paths:
+        parts = Path(path).relative_to(folder).parts
+        if state["has_divisions"]:
+            if len(parts) != 3 or parts[0] not in state["match_index"]:
+                affected = None
+                break
+            affected.add(parts[0])
+        elif len(parts) != 2:
+            affected = None
+            break
+        else:
+            affected.add(None)
+    
+    if affected is None:
+        logging.info("Fixtures layout changed; re-running full classification.")
+        cache = state["cache"]
+        return read_excel_files(output_folder.parent, state["jobs"], True, cache.path.parent, cache.max_entries,
+                                history=state["history"], sqlite=state["sqlite"],
+                                save_fixtures_manifest=state["save_fixtures_manifest"])
+    
+    for division_name in sorted(affected, key=str):
+        division_folder = folder / division_name if division_name else folder
+        division_manifest = None
+        if manifest is not None:
+            division_manifest = FixturesManifest(False, {None: manifest.divisions.get(division_name, {})})
+        _, division_index = build_match_index(division_folder, state["jobs"], state["cache"], division_manifest)
+        scheduled_rounds = state["scheduled"].get(division_name)
+        division_index = add_scheduled_rounds(division_index.get(None, {}), scheduled_rounds or {})
+        division_data = build_division_data(division_folder, division_index, settings)
+        teams_stats = aggregate_stats(division_data, division_teams(division_index, scheduled_rounds))
+        
+        state["star_counts"][division_name or ""] = count_division(division_data)
+        if division_name:
+            state["match_index"][division_name] = division_index
+            state["league_data"][division_name] = division_data
+            state["standings"][division_name] = teams_stats
+        else:
+            state["match_index"][None] = division_index
+            state["league_data"] = division_data
+            state["standings"][""] = teams_stats
+    
+    SUMMARY.flush("Re-processed")
+    if manifest is not None:
+        state["manifest"] = manifest
+    
+    with PROFILER.stage("file writes"):
+        state["cache"].save()
+        with open(output_folder / "league_data.json", 'w') as f:
+            json.dump(state["league_data"], f, indent=2)
+        if state["save_fixtures_manifest"] and manifest is not None:
+            save_manifest(manifest, output_folder / MANIFEST_FILE)
+    write_league_lines(state["league_data"], output_folder, state["has_divisions"])
+    with PROFILER.stage("file writes"):
+        if state["sqlite"]:
+            save_league_store(output_folder / LEAGUE_DB, state["match_index"], settings)
+    save_standings(output_folder, settings, state["has_divisions"], state["standings"])
+    divisions = state["league_data"] if state["has_divisions"] else {"": state["league_data"]}
+    write_classification(rank_standings(state["standings"], settings, divisions), output_folder, state["has_divisions"],
+                         affected)
+    if state["history"]:
+        key = {name: name or "" for name in affected}
+        seeds = {key[name]: division_teams(state["match_index"][name], state["scheduled"].get(name)) for name in affected}
+        write_history(standings_history({key[name]: divisions[key[name]] for name in affected}, seeds, settings),
+                      output_folder, state["has_divisions"])
+    write_star_players(state["star_counts"], state["star_points"], output_folder, state["has_divisions"])
+    seeds = {name or "": division_teams(division_index, state["scheduled"].get(name))
+             for name, division_index in state["match_index"].items()}
+    ratings_config = load_ratings_config()
+    with PROFILER.stage("aggregation"):
+        ratings = update_ratings(output_folder, divisions, seeds, state["has_divisions"], ratings_config)
+    write_ratings(ratings, output_folder, state["has_divisions"], ratings_config)
+    
+    logging.info(f"Re-classified after {len(changed_paths)} acta change(s): {', '.join(sorted(d or 'league' for d in affected))}")
+    return state
+
+def watch_league(folder_path, interval=1.0, debounce=2.0, jobs=1, cache_dir=None, cache_size=DEFAULT_MAX_ENTRIES,
+                 history=False, sqlite=False, save_fixtures_manifest=False):
+    """Keep classification up to date by polling the Fixtures tree for acta changes.
+    
+    Changes are collected until the tree has been quiet for `debounce`
+    seconds, so a burst of saves triggers a single refresh. Polling is used
+    instead of OS file notifications so it also works on network shares.
+    """
+    state = read_excel_files(folder_path, jobs, True, cache_dir, cache_size, history=history, sqlite=sqlite,
+                             save_fixtures_manifest=save_fixtures_manifest)
+    if state is None:
+        return
+    
+    logging.info(f"Watching {state['folder']} for acta changes (Ctrl+C to stop)...")
+    previous = manifest_snapshot(state["manifest"])
+    pending = set()
+    last_change = 0.0
+    try:
+        while True:
+            time.sleep(interval)
+            manifest = scan_fixtures(state["folder"])
+            current = manifest_snapshot(manifest)
+            changed = {path for path in current.keys() | previous.keys() if current.get(path) != previous.get(path)}
+            previous = current
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+            elif pending and time.monotonic() - last_change >= debounce:
+                state = reclassify_changed(state, pending, manifest)
+                pending = set()
+    except KeyboardInterrupt:
+        logging.info("Stopped watching.")
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        logging.error("Usage: python update_classification.py <league_folder_path>")
+    configure_logging('update_classification.log', summary="--log-summary" in sys.argv)
+    if len(sys.argv) < 2:
+        logging.error("Usage: python update_classification.py <league_folder_path> [--jobs N] [--cache-dir DIR] [--cache-size N] [--no-cache] [--incremental] [--history] [--sqlite] [--manifest] [--watch [--interval S] [--debounce S]] [--log-summary] [--profile [--profile-out FILE]]")
         sys.exit(1)
     
     folder_path = sys.argv[1]
-    read_excel_files(folder_path)
\ No newline at end of file
+    jobs = os.cpu_count() or 1
+    cache_dir = None
+    cache_size = DEFAULT_MAX_ENTRIES
+    use_cache = "--no-cache" not in sys.argv
+    incremental = "--incremental" in sys.argv
+    history = "--history" in sys.argv
+    sqlite = "--sqlite" in sys.argv
+    save_fixtures_manifest = "--manifest" in sys.argv
+    profile = "--profile" in sys.argv
+    profile_out = None
+    
+    # Parse --jobs parameter
+    if "--jobs" in sys.argv:
+        idx = sys.argv.index("--jobs")
+        try:
+            jobs = int(sys.argv[idx + 1])
+            if jobs <= 0:
+                raise ValueError
+        except (IndexError, ValueError):
+            logging.error("jobs must be a positive integer.")
+            sys.exit(1)
+    
+    # Parse --cache-dir parameter
+    if "--cache-dir" in sys.argv:
+        idx = sys.argv.index("--cache-dir")
+        if idx + 1 < len(sys.argv):
+            cache_dir = sys.argv[idx + 1]
+    
+    # Parse --cache-size parameter
+    if "--cache-size" in sys.argv:
+        idx = sys.argv.index("--cache-size")
+        try:
+            cache_size = int(sys.argv[idx + 1])
+            if cache_size <= 0:
+                raise ValueError
+        except (IndexError, ValueError):
+            logging.error("cache-size must be a positive integer.")
+            sys.exit(1)
+    
+    # Parse --profile-out parameter
+    if "--profile-out" in sys.argv:
+        idx = sys.argv.index("--profile-out")
+        if idx + 1 < len(sys.argv):
+            profile_out = sys.argv[idx + 1]
+            profile = True
+    
+    if profile:
+        PROFILER.start(profile_out)
+    
+    if "--watch" in sys.argv:
+        interval = 1.0
+        debounce = 2.0
+        
+        # Parse --interval and --debounce parameters
+        for option in ("--interval", "--debounce"):
+            if option in sys.argv:
+                idx = sys.argv.index(option)
+                try:
+                    value = float(sys.argv[idx + 1])
+                    # A zero interval would re-scan the tree in a busy loop
+                    if value < 0 or (value == 0 and option == "--interval"):
+                        raise ValueError
+                except (IndexError, ValueError):
+                    kind = "positive" if option == "--interval" else "non-negative"
+                    logging.error(f"{option[2:]} must be a {kind} number of seconds.")
+                    sys.exit(1)
+                if option == "--interval":
+                    interval = value
+                else:
+                    debounce = value
+        
+        watch_league(folder_path, interval, debounce, jobs, cache_dir, cache_size, history, sqlite, save_fixtures_manifest)
+    else:
+        read_excel_files(folder_path, jobs, use_cache, cache_dir, cache_size, incremental, history, sqlite,
+                         save_fixtures_manifest)
+    
+    if profile:
+        PROFILER.stop()
+        print("\n" + PROFILER.summary())
+        output_folder = Path(folder_path) / "Classification"
+        if output_folder.exists():
+            PROFILER.save(output_folder / "metrics.json")